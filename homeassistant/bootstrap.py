@@ -27,6 +27,8 @@ from homeassistant.const import EVENT_COMPONENT_LOADED, PLATFORM_FORMAT
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import (
     event_decorators, service, config_per_platform, extract_domain_configs)
+from homeassistant.helpers.setup_profile import (
+    PHASE_REQUIREMENTS, PHASE_SETUP, PHASE_VALIDATION, get_profile)
 from homeassistant.helpers.signal import async_register_signal_handling
 
 _LOGGER = logging.getLogger(__name__)
@@ -35,8 +37,21 @@ ATTR_COMPONENT = 'component'
 
 ERROR_LOG_FILENAME = 'home-assistant.log'
 DATA_PERSISTENT_ERRORS = 'bootstrap_persistent_errors'
+DATA_SETUP_TASKS = 'bootstrap_setup_tasks'
 HA_COMPONENT_URL = '[{}](https://home-assistant.io/components/{}/)'
 
+# Components set up at the same time during startup. Setups that are not
+# async occupy an executor thread and may wait for platform setups that
+# need one too, so stay well below the executor pool size.
+SETUP_CONCURRENCY = 4
+
+# Seconds a component may take to set up during startup
+SETUP_TIMEOUT = 300
+
+# Components that are set up before any other
+SETUP_FIRST = ('logger', 'introduction', 'recorder', 'mqtt',
+               'mqtt_eventstream')
+
 
 def setup_component(hass: core.HomeAssistant, domain: str,
                     config: Optional[Dict]=None) -> bool:
@@ -79,6 +94,76 @@ def async_setup_component(hass: core.HomeAssistant, domain: str,
     return True
 
 
+@asyncio.coroutine
+def _async_setup_components(hass: core.HomeAssistant, load_order,
+                            config) -> None:
+    """Set up components, each as soon as its dependencies are set up.
+
+    Up to SETUP_CONCURRENCY components are set up at the same time. The
+    components of SETUP_FIRST are set up before all others and components
+    that depend on group after all that do not, like the load order.
+
+    This method is a coroutine.
+    """
+    first = [domain for domain in load_order if domain in SETUP_FIRST]
+    no_group = [domain for domain in load_order if domain not in first and
+                'group' not in loader.load_order_component(domain)]
+
+    semaphore = asyncio.Semaphore(SETUP_CONCURRENCY, loop=hass.loop)
+    profile = get_profile(hass)
+    tasks = OrderedDict()
+
+    @asyncio.coroutine
+    def async_setup(domain, waiting):
+        """Set up a component once the components it waits for are done."""
+        if waiting:
+            yield from asyncio.wait(waiting.values(), loop=hass.loop)
+
+        with (yield from semaphore), profile.timed_setup(domain, waiting):
+            try:
+                result = yield from asyncio.wait_for(
+                    _async_setup_component(hass, domain, config),
+                    SETUP_TIMEOUT, loop=hass.loop)
+            except asyncio.TimeoutError:
+                _LOGGER.error('Setup of %s timed out after %s seconds',
+                              domain, SETUP_TIMEOUT)
+                _async_persistent_notification(hass, domain, True)
+                result = False
+
+        _LOGGER.info('Setup of %s took %.2f seconds', domain,
+                     profile.setup_time(domain))
+        return result
+
+    for domain in load_order:
+        dependencies = loader.get_dependencies(domain) or []
+        if domain in first:
+            waiting = first[:first.index(domain)]
+        elif domain in no_group:
+            waiting = first + dependencies
+        else:
+            waiting = first + no_group + dependencies
+        tasks[domain] = hass.loop.create_task(async_setup(
+            domain, {dep: tasks[dep] for dep in waiting if dep in tasks}))
+
+    hass.data[DATA_SETUP_TASKS] = set(tasks.values())
+    try:
+        if tasks:
+            yield from asyncio.wait(tasks.values(), loop=hass.loop)
+    finally:
+        hass.data[DATA_SETUP_TASKS] = set()
+
+    for task in tasks.values():
+        # Raise errors like a dependency that is not allowed
+        task.result()
+
+    slowest = sorted(tasks, key=profile.setup_time, reverse=True)[:5]
+    _LOGGER.info('Slowest component setups: %s', ', '.join(
+        '{} ({:.2f}s)'.format(domain, profile.setup_time(domain))
+        for domain in slowest))
+    _LOGGER.info('Critical path of the setup: %s',
+                 ' -> '.join(profile.critical_path()))
+
+
 def _handle_requirements(hass: core.HomeAssistant, component,
                          name: str) -> bool:
     """Install the requirements for a component.
@@ -115,7 +200,21 @@ def _async_setup_component(hass: core.HomeAssistant,
 
     setup_progress = hass.data.get('setup_progress')
     if setup_progress is None:
-        setup_progress = hass.data['setup_progress'] = []
+        setup_progress = hass.data['setup_progress'] = {}
+    # domain -> task that set up the domain in setup_progress
+    setup_owners = hass.data.get('setup_owners')
+    if setup_owners is None:
+        setup_owners = hass.data['setup_owners'] = {}
+
+    current_task = asyncio.Task.current_task(loop=hass.loop)
+    if (domain in setup_progress and
+            current_task in hass.data.get(DATA_SETUP_TASKS, ()) and
+            setup_owners.get(domain) is not current_task):
+        # Another startup setup got here first, wait for it to finish.
+        # Re-entry from the setup itself would wait on itself.
+        yield from asyncio.wait([setup_progress[domain]],
+                                timeout=SETUP_TIMEOUT, loop=hass.loop)
+        return domain in hass.config.components
 
     if domain in setup_progress:
         _LOGGER.error('Attempt made to setup %s during setup of %s',
@@ -127,11 +226,13 @@ def _async_setup_component(hass: core.HomeAssistant,
         # Used to indicate to discovery that a setup is ongoing and allow it
         # to wait till it is done.
         did_lock = False
+        executor_job = None
         if not setup_lock.locked():
             yield from setup_lock.acquire()
             did_lock = True
 
-        setup_progress.append(domain)
+        setup_progress[domain] = asyncio.Future(loop=hass.loop)
+        setup_owners[domain] = current_task
         config = yield from async_prepare_setup_component(hass, config, domain)
 
         if config is None:
@@ -146,11 +247,21 @@ def _async_setup_component(hass: core.HomeAssistant,
 
         try:
             _LOGGER.info("Setting up %s", domain)
-            if async_comp:
-                result = yield from component.async_setup(hass, config)
-            else:
-                result = yield from hass.loop.run_in_executor(
-                    None, component.setup, hass, config)
+            with get_profile(hass).timed(domain, PHASE_SETUP):
+                if async_comp:
+                    result = yield from component.async_setup(hass, config)
+                else:
+                    executor_job = hass.loop.run_in_executor(
+                        None, component.setup, hass, config)
+                    # Shielded, so the job is still tracked when cancelled
+                    result = yield from asyncio.shield(
+                        executor_job, loop=hass.loop)
+        except asyncio.CancelledError:
+            if executor_job is not None:
+                _LOGGER.warning('Setup of %s can not be cancelled in the '
+                                'executor, it stays in progress until the '
+                                'setup returns', domain)
+            raise
         except Exception:  # pylint: disable=broad-except
             _LOGGER.exception('Error during setup of component %s', domain)
             _async_persistent_notification(hass, domain, True)
@@ -175,7 +286,16 @@ def _async_setup_component(hass: core.HomeAssistant,
 
         return True
     finally:
-        setup_progress.remove(domain)
+        def finish_progress(*_):
+            """Allow the next setup of the domain."""
+            setup_owners.pop(domain, None)
+            setup_progress.pop(domain).set_result(None)
+
+        if executor_job is None or executor_job.done():
+            finish_progress()
+        else:
+            # A second setup must not start while the first one still runs
+            executor_job.add_done_callback(finish_progress)
         if did_lock:
             setup_lock.release()
 
@@ -197,6 +317,7 @@ def async_prepare_setup_component(hass: core.HomeAssistant, config: dict,
     """
     # pylint: disable=too-many-return-statements
     component = loader.get_component(domain)
+    profile = get_profile(hass)
     missing_deps = [dep for dep in getattr(component, 'DEPENDENCIES', [])
                     if dep not in hass.config.components]
 
@@ -208,7 +329,8 @@ def async_prepare_setup_component(hass: core.HomeAssistant, config: dict,
 
     if hasattr(component, 'CONFIG_SCHEMA'):
         try:
-            config = component.CONFIG_SCHEMA(config)
+            with profile.timed(domain, PHASE_VALIDATION):
+                config = component.CONFIG_SCHEMA(config)
         except vol.Invalid as ex:
             async_log_exception(ex, domain, config, hass)
             return None
@@ -218,7 +340,8 @@ def async_prepare_setup_component(hass: core.HomeAssistant, config: dict,
         for p_name, p_config in config_per_platform(config, domain):
             # Validate component specific platform schema
             try:
-                p_validated = component.PLATFORM_SCHEMA(p_config)
+                with profile.timed(domain, PHASE_VALIDATION):
+                    p_validated = component.PLATFORM_SCHEMA(p_config)
             except vol.Invalid as ex:
                 async_log_exception(ex, domain, config, hass)
                 continue
@@ -239,8 +362,9 @@ def async_prepare_setup_component(hass: core.HomeAssistant, config: dict,
             # Validate platform specific schema
             if hasattr(platform, 'PLATFORM_SCHEMA'):
                 try:
-                    # pylint: disable=no-member
-                    p_validated = platform.PLATFORM_SCHEMA(p_validated)
+                    with profile.timed(domain, PHASE_VALIDATION):
+                        # pylint: disable=no-member
+                        p_validated = platform.PLATFORM_SCHEMA(p_validated)
                 except vol.Invalid as ex:
                     async_log_exception(ex, '{}.{}'.format(domain, p_name),
                                         p_validated, hass)
@@ -255,8 +379,9 @@ def async_prepare_setup_component(hass: core.HomeAssistant, config: dict,
                   if key not in filter_keys}
         config[domain] = platforms
 
-    res = yield from hass.loop.run_in_executor(
-        None, _handle_requirements, hass, component, domain)
+    with profile.timed(domain, PHASE_REQUIREMENTS):
+        res = yield from hass.loop.run_in_executor(
+            None, _handle_requirements, hass, component, domain)
     if not res:
         return None
 
@@ -312,8 +437,9 @@ def async_prepare_setup_platform(hass: core.HomeAssistant, config, domain: str,
             _async_persistent_notification(hass, platform_path, True)
             return None
 
-    res = yield from hass.loop.run_in_executor(
-        None, _handle_requirements, hass, platform, platform_path)
+    with get_profile(hass).timed(platform_path, PHASE_REQUIREMENTS):
+        res = yield from hass.loop.run_in_executor(
+            None, _handle_requirements, hass, platform, platform_path)
     if not res:
         return None
 
@@ -435,15 +561,18 @@ def async_from_config_dict(config: Dict[str, Any],
 
     # Setup the components
     dependency_blacklist = loader.DEPENDENCY_BLACKLIST - set(components)
+    load_order = loader.load_order_components(components)
+    yield from hass.loop.run_in_executor(None, loader.save_component_index)
 
-    for domain in loader.load_order_components(components):
+    for domain in load_order:
         if domain in dependency_blacklist:
             raise HomeAssistantError(
                 '{} is not allowed to be a dependency'.format(domain))
 
-        yield from _async_setup_component(hass, domain, config)
-
-    setup_lock.release()
+    try:
+        yield from _async_setup_components(hass, load_order, config)
+    finally:
+        setup_lock.release()
 
     yield from hass.async_stop_track_tasks()
 
@@ -503,7 +632,8 @@ def async_from_config_file(config_path: str,
 
     try:
         config_dict = yield from hass.loop.run_in_executor(
-            None, conf_util.load_yaml_config_file, config_path)
+            None, conf_util.load_hass_config_file, config_path,
+            config_dir)
     except HomeAssistantError:
         return None
     finally:
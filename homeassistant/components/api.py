@@ -19,12 +19,15 @@ from homeassistant.const import (
     HTTP_BAD_REQUEST, HTTP_CREATED, HTTP_NOT_FOUND,
     HTTP_UNPROCESSABLE_ENTITY, MATCH_ALL, URL_API, URL_API_COMPONENTS,
     URL_API_CONFIG, URL_API_DISCOVERY_INFO, URL_API_ERROR_LOG,
-    URL_API_EVENT_FORWARD, URL_API_EVENTS, URL_API_SERVICES,
-    URL_API_STATES, URL_API_STATES_ENTITY, URL_API_STREAM, URL_API_TEMPLATE,
-    __version__)
+    URL_API_EVENT_FORWARD, URL_API_EVENTS, URL_API_RECORDER_QUEUE,
+    URL_API_SERVICES, URL_API_STARTUP_PROFILE, URL_API_STATES,
+    URL_API_STATES_ENTITY,
+    URL_API_STREAM, URL_API_TEMPLATE, URL_API_TEMPLATE_STATS, __version__)
 from homeassistant.exceptions import TemplateError
 from homeassistant.helpers.state import AsyncTrackStates
 from homeassistant.helpers import template
+from homeassistant.helpers.setup_profile import get_profile
+from homeassistant.components import recorder
 from homeassistant.components.http import HomeAssistantView
 
 DOMAIN = 'api'
@@ -52,6 +55,9 @@ def setup(hass, config):
     hass.http.register_view(APIComponentsView)
     hass.http.register_view(APIErrorLogView)
     hass.http.register_view(APITemplateView)
+    hass.http.register_view(APITemplateStatsView)
+    hass.http.register_view(APIStartupProfileView)
+    hass.http.register_view(APIRecorderQueueView)
 
     return True
 
@@ -432,6 +438,45 @@ class APITemplateView(HomeAssistantView):
                                      HTTP_BAD_REQUEST)
 
 
+class APITemplateStatsView(HomeAssistantView):
+    """View to handle TemplateStats requests."""
+
+    url = URL_API_TEMPLATE_STATS
+    name = "api:template-stats"
+
+    @ha.callback
+    def get(self, request):
+        """Get how often templates were compiled and rendered."""
+        return self.json(template.render_stats())
+
+
+class APIStartupProfileView(HomeAssistantView):
+    """View to handle StartupProfile requests."""
+
+    url = URL_API_STARTUP_PROFILE
+    name = "api:startup-profile"
+
+    @ha.callback
+    def get(self, request):
+        """Get the time spent setting up components."""
+        return self.json(get_profile(request.app['hass']).report())
+
+
+class APIRecorderQueueView(HomeAssistantView):
+    """View to handle RecorderQueue requests."""
+
+    url = URL_API_RECORDER_QUEUE
+    name = "api:recorder-queue"
+
+    @ha.callback
+    def get(self, request):
+        """Get the depth of the recorder queue and its overflow counts."""
+        event_queue = request.app['hass'].data.get(recorder.DATA_QUEUE)
+        if event_queue is None:
+            return self.json_message('Recorder not running', HTTP_NOT_FOUND)
+        return self.json(event_queue.stats())
+
+
 def async_services_json(hass):
     """Generate services data to JSONify."""
     return [{"domain": key, "services": value}
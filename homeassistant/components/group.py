@@ -18,7 +18,8 @@ from homeassistant.const import (
 from homeassistant.core import callback
 from homeassistant.helpers.entity import Entity, async_generate_entity_id
 from homeassistant.helpers.entity_component import EntityComponent
-from homeassistant.helpers.event import async_track_state_change
+from homeassistant.helpers.event import (
+    async_track_domain_state_change, async_track_state_change)
 import homeassistant.helpers.config_validation as cv
 from homeassistant.util.async import run_coroutine_threadsafe
 
@@ -26,6 +27,8 @@ DOMAIN = 'group'
 
 ENTITY_ID_FORMAT = DOMAIN + '.{}'
 
+DATA_EXPANDED_GROUPS = 'group_expanded'
+
 CONF_ENTITIES = 'entities'
 CONF_VIEW = 'view'
 CONF_CONTROL = 'control'
@@ -46,6 +49,7 @@ SERVICE_RELOAD = 'reload'
 RELOAD_SERVICE_SCHEMA = vol.Schema({})
 
 _LOGGER = logging.getLogger(__name__)
+_SENTINEL = object()
 
 
 def _conf_preprocess(value):
@@ -118,6 +122,7 @@ def expand_entity_ids(hass, entity_ids):
     Async friendly.
     """
     found_ids = []
+    found = set()
 
     for entity_id in entity_ids:
         if not isinstance(entity_id, str):
@@ -125,23 +130,95 @@ def expand_entity_ids(hass, entity_ids):
 
         entity_id = entity_id.lower()
 
-        try:
-            # If entity_id points at a group, expand it
-            domain, _ = ha.split_entity_id(entity_id)
+        # If entity_id points at a group, expand it
+        if ha.split_entity_id(entity_id)[0] == DOMAIN:
+            members = _expand_group(hass, entity_id)
+        else:
+            members = (entity_id,)
 
-            if domain == DOMAIN:
-                found_ids.extend(
-                    ent_id for ent_id
-                    in expand_entity_ids(hass, get_entity_ids(hass, entity_id))
-                    if ent_id not in found_ids)
+        for member in members:
+            if member not in found:
+                found.add(member)
+                found_ids.append(member)
 
-            else:
-                if entity_id not in found_ids:
-                    found_ids.append(entity_id)
+    return found_ids
+
+
+def _group_members(hass, entity_id):
+    """Return the entity_id attribute of a group, None if not a group."""
+    group = hass.states.get(entity_id)
+    if group is None or ATTR_ENTITY_ID not in group.attributes:
+        return None
+    return tuple(group.attributes[ATTR_ENTITY_ID])
+
+
+@callback
+def _async_cache_expanded_groups(hass):
+    """Cache group expansions until the members of a group change.
+
+    This method must be run in the event loop.
+    """
+    if DATA_EXPANDED_GROUPS in hass.data:
+        return
+
+    hass.data[DATA_EXPANDED_GROUPS] = {}
+
+    def members(state):
+        """Return the entity_id attribute of a group state."""
+        return None if state is None else \
+            state.attributes.get(ATTR_ENTITY_ID)
+
+    @callback
+    def async_group_changed(entity_id, old_state, new_state):
+        """Drop all cached expansions if the members of a group changed."""
+        if members(old_state) != members(new_state):
+            # Expansions running in other threads fill the old dict
+            hass.data[DATA_EXPANDED_GROUPS] = {}
+
+    async_track_domain_state_change(hass, DOMAIN, async_group_changed)
+
+
+def _expand_group(hass, group_id):
+    """Return the members of a group with nested groups expanded.
+
+    Expansions are only cached once the group component tracks changes
+    of group members.
+
+    Async friendly.
+    """
+    expanded_groups = hass.data.get(DATA_EXPANDED_GROUPS)
+    if expanded_groups is not None and group_id in expanded_groups:
+        return expanded_groups[group_id]
+
+    found_ids = []
+    found = set()
+    visited = set()
+    stack = [iter((group_id,))]
+
+    while stack:
+        entity_id = next(stack[-1], _SENTINEL)
+
+        if entity_id is _SENTINEL:
+            stack.pop()
+            continue
+        elif not isinstance(entity_id, str):
+            continue
+
+        entity_id = entity_id.lower()
+
+        if ha.split_entity_id(entity_id)[0] == DOMAIN:
+            if entity_id not in visited:
+                visited.add(entity_id)
+                stack.append(iter(_group_members(hass, entity_id) or ()))
+
+        elif entity_id not in found:
+            found.add(entity_id)
+            found_ids.append(entity_id)
 
-        except AttributeError:
-            # Raised by split_entity_id if entity_id is not a string
-            pass
+    found_ids = tuple(found_ids)
+    if expanded_groups is not None and \
+            _group_members(hass, group_id) is not None:
+        expanded_groups[group_id] = found_ids
 
     return found_ids
 
@@ -171,6 +248,7 @@ def get_entity_ids(hass, entity_id, domain_filter=None):
 def async_setup(hass, config):
     """Setup all groups found definded in the configuration."""
     component = EntityComponent(_LOGGER, DOMAIN, hass)
+    _async_cache_expanded_groups(hass)
 
     yield from _async_process_config(hass, config, component)
 
@@ -249,6 +327,10 @@ class Group(Entity):
         self.group_on = None
         self.group_off = None
         self._assumed_state = False
+        # The member states counted in the group state
+        self._member_states = {}
+        self._on_count = 0
+        self._assumed_count = 0
         self._async_unsub_state_changed = None
         self._visible = True
         self._control = control
@@ -271,6 +353,8 @@ class Group(Entity):
 
         This method must be run in the event loop.
         """
+        _async_cache_expanded_groups(hass)
+
         group = Group(
             hass, name,
             order=len(hass.states.async_entity_ids(DOMAIN)),
@@ -438,58 +522,53 @@ class Group(Entity):
         """Update group state.
 
         Optionally you can provide the only state changed since last update
-        allowing this method to take shortcuts.
+        allowing this method to only count that member again.
 
         This method must be run in the event loop.
         """
-        # To store current states of group entities. Might not be needed.
-        states = None
-        gr_state = self._state
         gr_on = self.group_on
-        gr_off = self.group_off
 
         # We have not determined type of group yet
         if gr_on is None:
             if tr_state is None:
-                states = self._tracking_states
-
-                for state in states:
-                    gr_on, gr_off = \
-                        _get_group_on_off(state.state)
+                for state in self._tracking_states:
+                    gr_on, gr_off = _get_group_on_off(state.state)
                     if gr_on is not None:
                         break
             else:
                 gr_on, gr_off = _get_group_on_off(tr_state.state)
 
-            if gr_on is not None:
-                self.group_on, self.group_off = gr_on, gr_off
-
-        # We cannot determine state of the group
-        if gr_on is None:
-            return
-
-        if tr_state is None or ((gr_state == gr_on and
-                                 tr_state.state == gr_off) or
-                                tr_state.state not in (gr_on, gr_off)):
-            if states is None:
-                states = self._tracking_states
-
-            if any(state.state == gr_on for state in states):
-                self._state = gr_on
-            else:
-                self._state = gr_off
+            # We cannot determine state of the group
+            if gr_on is None:
+                return
 
-        elif tr_state.state in (gr_on, gr_off):
-            self._state = tr_state.state
+            self.group_on, self.group_off = gr_on, gr_off
+            # Count all members now that the type of group is known
+            tr_state = None
 
-        if tr_state is None or self._assumed_state and \
-           not tr_state.attributes.get(ATTR_ASSUMED_STATE):
-            if states is None:
-                states = self._tracking_states
+        if tr_state is None:
+            self._member_states = {}
+            self._on_count = 0
+            self._assumed_count = 0
+            for state in self._tracking_states:
+                self._async_count_member(state)
+        else:
+            self._async_count_member(tr_state)
 
-            self._assumed_state = any(
-                state.attributes.get(ATTR_ASSUMED_STATE) for state
-                in states)
+        self._state = gr_on if self._on_count else self.group_off
+        self._assumed_state = self._assumed_count > 0
 
-        elif tr_state.attributes.get(ATTR_ASSUMED_STATE):
-            self._assumed_state = True
+    @callback
+    def _async_count_member(self, state):
+        """Replace the counted state of a member by its new state."""
+        counted = self._member_states.pop(state.entity_id, None)
+
+        for member_state, change in ((counted, -1), (state, 1)):
+            if member_state is None:
+                continue
+            if member_state.state == self.group_on:
+                self._on_count += change
+            if member_state.attributes.get(ATTR_ASSUMED_STATE):
+                self._assumed_count += change
+
+        self._member_states[state.entity_id] = state
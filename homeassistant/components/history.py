@@ -8,7 +8,9 @@ import asyncio
 from collections import defaultdict
 from datetime import timedelta
 from itertools import groupby
+import json
 import logging
+import math
 import time
 
 import voluptuous as vol
@@ -16,10 +18,12 @@ import voluptuous as vol
 from homeassistant.const import (
     HTTP_BAD_REQUEST, CONF_DOMAINS, CONF_ENTITIES, CONF_EXCLUDE, CONF_INCLUDE)
 import homeassistant.util.dt as dt_util
+from homeassistant.core import State
 from homeassistant.components import recorder, script
 from homeassistant.components.frontend import register_built_in_panel
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.const import ATTR_HIDDEN
+from homeassistant.remote import JSONEncoder
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -33,6 +37,16 @@ CONFIG_SCHEMA = vol.Schema({
 SIGNIFICANT_DOMAINS = ('thermostat', 'climate')
 IGNORE_DOMAINS = ('zone', 'scene',)
 
+# Rows fetched from the database at a time when streaming history
+STREAM_BATCH_SIZE = 1000
+# States serialized per chunk written to a streamed response
+STREAM_CHUNK_STATES = 500
+
+# Number of buckets returned by the aggregate view if none is requested
+DEFAULT_AGGREGATE_POINTS = 300
+# Most buckets the aggregate view returns per entity
+MAX_AGGREGATE_POINTS = 5000
+
 
 def last_recorder_run():
     """Retireve the last closed recorder run from the DB."""
@@ -55,6 +69,184 @@ def get_significant_states(start_time, end_time=None, entity_id=None,
     as well as all states from certain domains (for instance
     thermostat so that we get current temperature in our graphs).
     """
+    cached = _cached_states(start_time, entity_id)
+    if cached is not None:
+        entity_ids = (entity_id.lower(), ) if entity_id is not None else None
+
+        def include(state):
+            """Return True if the state is a significant change."""
+            return (
+                (not filters or filters.matches(state.entity_id, entity_ids))
+                and (state.domain in SIGNIFICANT_DOMAINS or
+                     state.last_changed == state.last_updated) and
+                _is_significant(state) and
+                not state.attributes.get(ATTR_HIDDEN, False))
+
+        return _cached_states_to_json(
+            cached, start_time, end_time, entity_id, include, filters)
+
+    query = _significant_states_query(start_time, end_time, entity_id, filters)
+
+    states = (
+        state for state in recorder.execute(query)
+        if (_is_significant(state) and
+            not state.attributes.get(ATTR_HIDDEN, False)))
+
+    return states_to_json(states, start_time, entity_id, filters)
+
+
+def stream_significant_states(start_time, end_time=None, entity_id=None,
+                              filters=None):
+    """Yield the JSON of get_significant_states in chunks of text.
+
+    Rows are fetched in batches and converted one at a time, so memory use
+    does not depend on the length of the period.
+    """
+    entity_ids = [entity_id] if entity_id is not None else None
+
+    # Get the states at the start time
+    initial_states = {}
+    for state in get_states(start_time, entity_ids, filters=filters):
+        state.last_changed = start_time
+        state.last_updated = start_time
+        initial_states[state.entity_id] = state
+
+    query = _significant_states_query(start_time, end_time, entity_id, filters)
+    chunk = []
+    count = 0
+    yield '['
+
+    with recorder.session_scope():
+        rows = (row.to_native() for row in query.yield_per(STREAM_BATCH_SIZE))
+        states = (
+            state for state in rows
+            if (state is not None and _is_significant(state) and
+                not state.attributes.get(ATTR_HIDDEN, False)))
+
+        for ent_id, group in groupby(states, lambda state: state.entity_id):
+            initial_state = initial_states.pop(ent_id, None)
+            if initial_state is not None:
+                group = _prepend(initial_state, group)
+
+            chunk.append('[' if count == 0 else ',[')
+            for idx, state in enumerate(group):
+                if idx:
+                    chunk.append(',')
+                chunk.append(json.dumps(state, cls=JSONEncoder))
+                count += 1
+                if count % STREAM_CHUNK_STATES == 0:
+                    yield ''.join(chunk)
+                    chunk = []
+            chunk.append(']')
+
+    # Entities without changes in the period only have their start state
+    for state in initial_states.values():
+        chunk.append('[' if count == 0 else ',[')
+        chunk.append(json.dumps(state, cls=JSONEncoder))
+        chunk.append(']')
+        count += 1
+
+    chunk.append(']')
+    yield ''.join(chunk)
+
+
+def get_aggregated_states(start_time, end_time, bucket_width, entity_id=None,
+                          filters=None):
+    """Return min, mean and max of numeric states per time bucket.
+
+    Returns {'entity_id': [bucket, ...]} where each bucket is a dict with the
+    start of the bucket, the number of samples and their min, mean and max.
+    Buckets without samples and states that are not numbers are left out.
+    Aggregates that are NaN or infinite are None.
+    """
+    entity_ids = [entity_id.lower()] if entity_id is not None else None
+    states = recorder.get_model('States')
+    width = bucket_width.total_seconds()
+    result = {}
+
+    def add_sample(buckets, timestamp, value):
+        """Add a value to the bucket covering timestamp."""
+        try:
+            value = float(value)
+        except ValueError:
+            return
+
+        index = max(int((timestamp - start_time).total_seconds() // width), 0)
+        bucket = buckets.get(index)
+        if bucket is None:
+            buckets[index] = [value, value, value, 1]
+        else:
+            bucket[0] = min(bucket[0], value)
+            bucket[1] = max(bucket[1], value)
+            bucket[2] += value
+            bucket[3] += 1
+
+    def finite(value):
+        """Return value, or None for NaN and infinity."""
+        return value if math.isfinite(value) else None
+
+    def bucket_list(buckets):
+        """Convert the collected buckets to the result format."""
+        return [{
+            'start': start_time + timedelta(seconds=index * width),
+            'min': finite(bucket[0]),
+            'max': finite(bucket[1]),
+            'mean': finite(bucket[2] / bucket[3]),
+            'count': bucket[3],
+        } for index, bucket in sorted(buckets.items())]
+
+    # The state at the start time is the first sample of each entity
+    start_values = {
+        state.entity_id: state.state for state in
+        get_states(start_time, entity_ids, filters=filters)}
+
+    with recorder.session_scope() as session:
+        # Only fetch the columns needed, attributes are never decoded
+        query = session.query(
+            states.entity_id, states.state, states.last_updated).filter(
+                (states.last_changed == states.last_updated) &
+                (states.last_updated > start_time) &
+                (states.last_updated < end_time))
+        if filters:
+            query = filters.apply(query, entity_ids)
+        elif entity_ids is not None:
+            query = query.filter(states.entity_id.in_(entity_ids))
+        query = query.order_by(states.entity_id, states.last_updated)
+
+        rows = query.yield_per(STREAM_BATCH_SIZE)
+        for ent_id, group in groupby(rows, lambda row: row[0]):
+            buckets = {}
+            if ent_id in start_values:
+                add_sample(buckets, start_time, start_values.pop(ent_id))
+            for _, value, last_updated in group:
+                add_sample(buckets, _process_timestamp(last_updated), value)
+            if buckets:
+                result[ent_id] = bucket_list(buckets)
+
+    for ent_id, value in start_values.items():
+        buckets = {}
+        add_sample(buckets, start_time, value)
+        if buckets:
+            result[ent_id] = bucket_list(buckets)
+
+    return result
+
+
+def _process_timestamp(timestamp):
+    """Return a timestamp read from the database as UTC datetime."""
+    if timestamp.tzinfo is None:
+        return dt_util.UTC.localize(timestamp)
+    return dt_util.as_utc(timestamp)
+
+
+def _prepend(item, iterable):
+    """Yield item followed by the items of iterable."""
+    yield item
+    yield from iterable
+
+
+def _significant_states_query(start_time, end_time, entity_id, filters):
+    """Return the query for significant states ordered by entity."""
     entity_ids = (entity_id.lower(), ) if entity_id is not None else None
     states = recorder.get_model('States')
     query = recorder.query(states).filter(
@@ -67,17 +259,22 @@ def get_significant_states(start_time, end_time=None, entity_id=None,
     if end_time is not None:
         query = query.filter(states.last_updated < end_time)
 
-    states = (
-        state for state in recorder.execute(
-            query.order_by(states.entity_id, states.last_updated))
-        if (_is_significant(state) and
-            not state.attributes.get(ATTR_HIDDEN, False)))
-
-    return states_to_json(states, start_time, entity_id, filters)
+    return query.order_by(states.entity_id, states.last_updated)
 
 
 def state_changes_during_period(start_time, end_time=None, entity_id=None):
     """Return states changes during UTC period start_time - end_time."""
+    cached = _cached_states(start_time, entity_id)
+    if cached is not None:
+        def include(state):
+            """Return True if the state is a change of entity_id."""
+            return ((entity_id is None or
+                     state.entity_id == entity_id.lower()) and
+                    state.last_changed == state.last_updated)
+
+        return _cached_states_to_json(
+            cached, start_time, end_time, entity_id, include)
+
     states = recorder.get_model('States')
     query = recorder.query(states).filter(
         (states.last_changed == states.last_updated) &
@@ -104,6 +301,13 @@ def get_states(utc_point_in_time, entity_ids=None, run=None, filters=None):
         if run is None:
             return []
 
+    if entity_ids is not None:
+        for state in get_last_states(utc_point_in_time, entity_ids, run):
+            if (state.domain not in IGNORE_DOMAINS and
+                    not state.attributes.get(ATTR_HIDDEN, False)):
+                yield state
+        return
+
     from sqlalchemy import and_, func
 
     states = recorder.get_model('States')
@@ -154,6 +358,90 @@ def states_to_json(states, start_time, entity_id, filters=None):
     return result
 
 
+def _cached_states(start_time, entity_id=None):
+    """Return the states cached by the recorder if they cover start_time.
+
+    Only returns the states of entity_id if given.
+    """
+    cache = recorder.get_instance().history_cache
+    if cache is None or not cache.covers(start_time):
+        return None
+    return cache.snapshot(
+        entity_id.lower() if entity_id is not None else None)
+
+
+def _cached_states_to_json(cached, start_time, end_time, entity_id, include,
+                           filters=None):
+    """Return the result of states_to_json from the recorder cache.
+
+    include decides which states in the period are returned. The state at
+    start_time is selected like get_states does.
+    """
+    result = defaultdict(list)
+    entity_ids = [entity_id] if entity_id is not None else None
+
+    for ent_id in sorted(cached):
+        states = cached[ent_id]
+        changes = [
+            state for state in states
+            if (state.last_updated > start_time and
+                (end_time is None or state.last_updated < end_time) and
+                include(state))]
+
+        initial = None
+        for state in states:
+            if state.last_updated >= start_time:
+                break
+            initial = state
+
+        if (initial is not None and
+                initial.domain not in IGNORE_DOMAINS and
+                (not filters or filters.matches(ent_id, entity_ids)) and
+                not initial.attributes.get(ATTR_HIDDEN, False)):
+            result[ent_id].append(State(
+                initial.entity_id, initial.state, initial.attributes,
+                start_time, start_time))
+
+        if changes:
+            result[ent_id].extend(changes)
+
+    return result
+
+
+def get_last_states(utc_point_in_time, entity_ids, run=None):
+    """Return the last state of each entity before utc_point_in_time.
+
+    All entities are looked up in a single query. The last update of every
+    entity is found with a seek in the entity_id, last_updated index
+    instead of a scan of all states. Pass run to only return states
+    recorded during that run.
+    """
+    from sqlalchemy import and_, func
+
+    if not entity_ids:
+        return []
+
+    states = recorder.get_model('States')
+    recorded = (
+        states.entity_id.in_([entity_id.lower() for entity_id in entity_ids]) &
+        (states.last_updated < utc_point_in_time))
+    if run is not None:
+        recorded &= states.created >= run.start
+
+    last_updated = recorder.query(states.entity_id).add_columns(
+        func.max(states.last_updated).label('max_last_updated')
+    ).filter(recorded).group_by(states.entity_id).subquery()
+
+    query = recorder.query(states).join(last_updated, and_(
+        states.entity_id == last_updated.c.entity_id,
+        states.last_updated == last_updated.c.max_last_updated)).filter(
+            recorded).order_by(states.state_id)
+
+    # States with the same last_updated resolve to the last recorded one
+    return list({state.entity_id: state
+                 for state in recorder.execute(query)}.values())
+
+
 def get_state(utc_point_in_time, entity_id, run=None):
     """Return a state at a specific point in time."""
     states = list(get_states(utc_point_in_time, (entity_id,), run))
@@ -175,6 +463,7 @@ def setup(hass, config):
 
     recorder.get_instance()
     hass.http.register_view(HistoryPeriodView(filters))
+    hass.http.register_view(HistoryAggregateView(filters))
     register_built_in_panel(hass, 'history', 'History', 'mdi:poll-box')
 
     return True
@@ -222,6 +511,14 @@ class HistoryPeriodView(HomeAssistantView):
             end_time = start_time + one_day
         entity_id = request.GET.get('filter_entity_id')
 
+        if 'stream' in request.GET:
+            response = yield from self._async_stream(
+                request, start_time, end_time, entity_id)
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                elapsed = time.perf_counter() - timer_start
+                _LOGGER.debug('Streamed history in %fs', elapsed)
+            return response
+
         result = yield from request.app['hass'].loop.run_in_executor(
             None, get_significant_states, start_time, end_time, entity_id,
             self.filters)
@@ -232,6 +529,89 @@ class HistoryPeriodView(HomeAssistantView):
                 'Extracted %d states in %fs', sum(map(len, result)), elapsed)
         return self.json(result)
 
+    @asyncio.coroutine
+    def _async_stream(self, request, start_time, end_time, entity_id):
+        """Write the history to the response while it is read from the db."""
+        response = yield from self.stream(request, stream_significant_states(
+            start_time, end_time, entity_id, self.filters))
+        return response
+
+
+class HistoryAggregateView(HomeAssistantView):
+    """Handle requests for numeric history aggregated per time bucket."""
+
+    url = '/api/history/aggregate'
+    name = 'api:history:view-aggregate'
+    extra_urls = ['/api/history/aggregate/{datetime}']
+
+    def __init__(self, filters):
+        """Initilalize the history aggregate view."""
+        self.filters = filters
+
+    @asyncio.coroutine
+    def get(self, request, datetime=None):
+        """Return min, mean and max per bucket over a period of time."""
+        timer_start = time.perf_counter()
+        if datetime:
+            datetime = dt_util.parse_datetime(datetime)
+
+            if datetime is None:
+                return self.json_message('Invalid datetime', HTTP_BAD_REQUEST)
+
+        now = dt_util.utcnow()
+
+        one_day = timedelta(days=1)
+        if datetime:
+            start_time = dt_util.as_utc(datetime)
+        else:
+            start_time = now - one_day
+
+        if start_time > now:
+            return self.json([])
+
+        end_time = request.GET.get('end_time')
+        if end_time:
+            end_time = dt_util.parse_datetime(end_time)
+            if end_time is None:
+                return self.json_message('Invalid end_time', HTTP_BAD_REQUEST)
+            end_time = dt_util.as_utc(end_time)
+        else:
+            end_time = start_time + one_day
+
+        if end_time <= start_time:
+            return self.json_message('Invalid end_time', HTTP_BAD_REQUEST)
+
+        period = end_time - start_time
+        try:
+            if 'bucket' in request.GET:
+                bucket_width = timedelta(seconds=int(request.GET['bucket']))
+                points = period / bucket_width
+            else:
+                points = int(request.GET.get(
+                    'points', DEFAULT_AGGREGATE_POINTS))
+            # Also rejects buckets longer than the period
+            if not 1 <= points <= MAX_AGGREGATE_POINTS:
+                raise ValueError
+            if 'bucket' not in request.GET:
+                bucket_width = period / points
+        except (ValueError, ZeroDivisionError, OverflowError):
+            return self.json_message('Invalid bucket or points',
+                                     HTTP_BAD_REQUEST)
+
+        bucket_width = max(bucket_width, timedelta(seconds=1))
+        entity_id = request.GET.get('filter_entity_id')
+
+        result = yield from request.app['hass'].loop.run_in_executor(
+            None, get_aggregated_states, start_time, end_time, bucket_width,
+            entity_id, self.filters)
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            elapsed = time.perf_counter() - timer_start
+            _LOGGER.debug('Aggregated %d entities in %fs', len(result),
+                          elapsed)
+        return self.json([
+            {'entity_id': ent_id, 'buckets': buckets}
+            for ent_id, buckets in result.items()])
+
 
 class Filters(object):
     """Container for the configured include and exclude filters."""
@@ -291,6 +671,30 @@ class Filters(object):
             query = query.filter(~states.entity_id.in_(self.excluded_entities))
         return query
 
+    def matches(self, entity_id, entity_ids=None):
+        """Return True if apply would keep the states of entity_id."""
+        if entity_ids is not None:
+            return entity_id in entity_ids
+
+        domain = entity_id.split('.', 1)[0]
+        if domain in IGNORE_DOMAINS or entity_id in self.excluded_entities:
+            return False
+
+        if self.excluded_domains and not self.included_domains:
+            return (domain not in self.excluded_domains and
+                    (not self.included_entities or
+                     entity_id in self.included_entities))
+        elif not self.excluded_domains and self.included_domains:
+            return (domain in self.included_domains or
+                    entity_id in self.included_entities)
+        elif self.excluded_domains and self.included_domains:
+            return (domain not in self.excluded_domains and
+                    (domain in self.included_domains or
+                     entity_id in self.included_entities))
+        elif self.included_entities:
+            return entity_id in self.included_entities
+        return True
+
 
 def _is_significant(state):
     """Test if state is significant for history charts.
@@ -8,6 +8,7 @@ import asyncio
 import json
 import logging
 import ssl
+import threading
 from ipaddress import ip_network
 from pathlib import Path
 
@@ -23,6 +24,7 @@ from homeassistant.const import (
     SERVER_PORT, CONTENT_TYPE_JSON, ALLOWED_CORS_HEADERS,
     EVENT_HOMEASSISTANT_STOP, EVENT_HOMEASSISTANT_START)
 from homeassistant.core import is_callback
+from homeassistant.util.async import run_coroutine_threadsafe
 from homeassistant.util.logging import HideSensitiveDataFilter
 
 from .auth import auth_middleware
@@ -37,6 +39,9 @@ from .util import get_real_ip
 DOMAIN = 'http'
 REQUIREMENTS = ('aiohttp_cors==0.5.0',)
 
+# Number of chunks a streamed response reads ahead of the client
+STREAM_QUEUE_SIZE = 4
+
 CONF_API_PASSWORD = 'api_password'
 CONF_SERVER_HOST = 'server_host'
 CONF_SERVER_PORT = 'server_port'
@@ -360,6 +365,58 @@ class HomeAssistantView(object):
         """Return a JSON message response."""
         return self.json({'message': error}, status_code)
 
+    @asyncio.coroutine
+    # pylint: disable=no-self-use
+    def stream(self, request, chunks):
+        """Return a JSON response written while chunks produces it.
+
+        The chunks generator yields text and runs in the executor, so it may
+        block on I/O. It is closed early if the client goes away.
+        """
+        hass = request.app['hass']
+        queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE, loop=hass.loop)
+        stop = threading.Event()
+
+        def put(chunk):
+            """Hand a chunk to the event loop, wait if the queue is full."""
+            run_coroutine_threadsafe(queue.put(chunk), hass.loop).result()
+
+        def produce():
+            """Run the generator in the executor."""
+            try:
+                for chunk in chunks:
+                    if stop.is_set():
+                        break
+                    put(chunk)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception('Error while streaming %s', request.path)
+            finally:
+                # Release resources like database sessions if stopped early
+                chunks.close()
+                put(None)
+
+        response = web.StreamResponse()
+        response.content_type = CONTENT_TYPE_JSON
+        yield from response.prepare(request)
+
+        producer = hass.loop.run_in_executor(None, produce)
+
+        try:
+            while True:
+                chunk = yield from queue.get()
+                if chunk is None:
+                    break
+                response.write(chunk.encode('UTF-8'))
+                yield from response.drain()
+        finally:
+            stop.set()
+            # Unblock the producer if it is waiting for room in the queue
+            while not queue.empty():
+                queue.get_nowait()
+
+        yield from producer
+        return response
+
     @asyncio.coroutine
     # pylint: disable=no-self-use
     def file(self, request, fil):
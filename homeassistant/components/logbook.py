@@ -5,9 +5,10 @@ For more details about this component, please refer to the documentation at
 https://home-assistant.io/components/logbook/
 """
 import asyncio
+import json
 import logging
 from datetime import timedelta
-from itertools import groupby
+from itertools import groupby, islice
 
 import voluptuous as vol
 
@@ -21,7 +22,9 @@ from homeassistant.const import (EVENT_HOMEASSISTANT_START,
                                  EVENT_HOMEASSISTANT_STOP, EVENT_STATE_CHANGED,
                                  STATE_NOT_HOME, STATE_OFF, STATE_ON,
                                  ATTR_HIDDEN, HTTP_BAD_REQUEST)
-from homeassistant.core import State, split_entity_id, DOMAIN as HA_DOMAIN
+from homeassistant.core import (
+    Event, State, split_entity_id, DOMAIN as HA_DOMAIN)
+from homeassistant.remote import JSONEncoder
 
 DOMAIN = "logbook"
 DEPENDENCIES = ['recorder', 'frontend']
@@ -52,6 +55,11 @@ EVENT_LOGBOOK_ENTRY = 'logbook_entry'
 
 GROUP_BY_MINUTES = 15
 
+# Rows fetched from the database at a time
+STREAM_BATCH_SIZE = 1000
+# Entries serialized per chunk written to the response
+STREAM_CHUNK_ENTRIES = 200
+
 ATTR_NAME = 'name'
 ATTR_MESSAGE = 'message'
 ATTR_DOMAIN = 'domain'
@@ -133,33 +141,107 @@ class LogbookView(HomeAssistantView):
         start_day = dt_util.as_utc(datetime)
         end_day = start_day + timedelta(days=1)
 
-        def get_results():
-            """Query DB for results."""
-            events = recorder.get_model('Events')
-            query = recorder.query('Events').order_by(
-                events.time_fired).filter(
-                    (events.time_fired > start_day) &
-                    (events.time_fired < end_day))
-            events = recorder.execute(query)
-            return _exclude_events(events, self.config)
+        try:
+            after = int(request.GET.get('after', 0)) or None
+        except ValueError:
+            return self.json_message('Invalid after', HTTP_BAD_REQUEST)
+
+        try:
+            limit = int(request.GET.get('limit', 0)) or None
+        except ValueError:
+            return self.json_message('Invalid limit', HTTP_BAD_REQUEST)
+
+        if limit is not None and limit < 0:
+            return self.json_message('Invalid limit', HTTP_BAD_REQUEST)
+
+        entity_id = request.GET.get('entity_id')
+
+        response = yield from self.stream(request, stream_logbook(
+            start_day, end_day, self.config, after, limit, entity_id))
+        return response
+
+
+def stream_logbook(start_day, end_day, config, after=None, limit=None,
+                   entity_id=None):
+    """Yield the JSON of the logbook entries in chunks of text.
+
+    Entries carry the event_id they were created from. Pass the event_id of
+    the last entry as after to continue with the next page of limit entries.
+    Pass entity_id to only return the entries of a single entity.
+    """
+    events = _recorded_events(start_day, end_day, config, after, entity_id)
+    entries = humanify(_exclude_events(events, config))
+    if limit is not None:
+        entries = islice(entries, limit)
+
+    chunk = ['[']
+    for idx, entry in enumerate(entries):
+        if idx:
+            chunk.append(',')
+        chunk.append(json.dumps(entry.as_dict(), sort_keys=True,
+                                cls=JSONEncoder))
+        if len(chunk) >= 2 * STREAM_CHUNK_ENTRIES:
+            yield ''.join(chunk)
+            chunk = []
+
+    chunk.append(']')
+    yield ''.join(chunk)
+
+
+class _RecordedEvent(Event):
+    """An event read from the database."""
+
+    __slots__ = ['event_id']
+
+
+def _recorded_events(start_day, end_day, config, after=None,
+                     entity_id=None):
+    """Yield the recorded events of a period, ordered by event_id.
+
+    Events of filtered out entities are skipped by the database using the
+    entity columns of the events table.
+    """
+    events = recorder.get_model('Events')
+
+    query = recorder.query('Events').filter(
+        (events.time_fired > start_day) & (events.time_fired < end_day))
+
+    if entity_id is not None:
+        query = query.filter(events.entity_id == entity_id)
+
+    if after is not None:
+        query = query.filter(events.event_id > after)
 
-        events = yield from request.app['hass'].loop.run_in_executor(
-            None, get_results)
+    keep = _entity_filter(config, events)
+    if keep is not None:
+        query = query.filter(
+            (events.entity_id.is_(None) & events.domain.is_(None)) | keep)
 
-        return self.json(humanify(events))
+    query = query.order_by(events.event_id)
+
+    with recorder.session_scope():
+        for row in query.yield_per(STREAM_BATCH_SIZE):
+            event = row.to_native()
+            if event is None:
+                continue
+            recorded = _RecordedEvent(event.event_type, event.data,
+                                      event.origin, event.time_fired)
+            recorded.event_id = row.event_id
+            yield recorded
 
 
 class Entry(object):
     """A human readable version of the log."""
 
     def __init__(self, when=None, name=None, message=None, domain=None,
-                 entity_id=None):
+                 entity_id=None, event_id=None):
         """Initialize the entry."""
         self.when = when
         self.name = name
         self.message = message
         self.domain = domain
         self.entity_id = entity_id
+        self.event_id = event_id
 
     def as_dict(self):
         """Convert entry to a dict to be used within JSON."""
@@ -169,6 +251,7 @@ class Entry(object):
             'message': self.message,
             'domain': self.domain,
             'entity_id': self.entity_id,
+            'event_id': self.event_id,
         }
 
 
@@ -247,7 +330,8 @@ def humanify(events):
                     name=to_state.name,
                     message=_entry_message_from_state(domain, to_state),
                     domain=domain,
-                    entity_id=to_state.entity_id)
+                    entity_id=to_state.entity_id,
+                    event_id=_event_id(event))
 
             elif event.event_type == EVENT_HOMEASSISTANT_START:
                 if start_stop_events.get(event.time_fired.minute) == 2:
@@ -255,7 +339,7 @@ def humanify(events):
 
                 yield Entry(
                     event.time_fired, "Home Assistant", "started",
-                    domain=HA_DOMAIN)
+                    domain=HA_DOMAIN, event_id=_event_id(event))
 
             elif event.event_type == EVENT_HOMEASSISTANT_STOP:
                 if start_stop_events.get(event.time_fired.minute) == 2:
@@ -265,7 +349,7 @@ def humanify(events):
 
                 yield Entry(
                     event.time_fired, "Home Assistant", action,
-                    domain=HA_DOMAIN)
+                    domain=HA_DOMAIN, event_id=_event_id(event))
 
             elif event.event_type == EVENT_LOGBOOK_ENTRY:
                 domain = event.data.get(ATTR_DOMAIN)
@@ -279,11 +363,16 @@ def humanify(events):
                 yield Entry(
                     event.time_fired, event.data.get(ATTR_NAME),
                     event.data.get(ATTR_MESSAGE), domain,
-                    entity_id)
+                    entity_id, _event_id(event))
 
 
-def _exclude_events(events, config):
-    """Get lists of excluded entities and platforms."""
+def _event_id(event):
+    """Return the event_id of a recorded event."""
+    return getattr(event, 'event_id', None)
+
+
+def _filter_config(config):
+    """Return excluded entities and domains, then included ones."""
     excluded_entities = []
     excluded_domains = []
     included_entities = []
@@ -296,8 +385,53 @@ def _exclude_events(events, config):
     if include:
         included_entities = include[CONF_ENTITIES]
         included_domains = include[CONF_DOMAINS]
+    return (excluded_entities, excluded_domains,
+            included_entities, included_domains)
+
+
+def _entity_filter(config, events):
+    """Return the filter of _exclude_events as a criterion on events.
+
+    Returns None if nothing is filtered.
+    """
+    from sqlalchemy import func, true
+
+    excluded_entities, excluded_domains, included_entities, \
+        included_domains = _filter_config(config)
+
+    # Compare like _exclude_events does, where a missing value is no match
+    entity_id = func.coalesce(events.entity_id, '')
+    domain = func.coalesce(events.domain, '')
+
+    if included_entities:
+        not_included = entity_id.notin_(included_entities)
+    else:
+        not_included = true()
+
+    if excluded_domains and not included_domains:
+        drop = domain.in_(excluded_domains) & not_included
+    elif included_domains and not excluded_domains:
+        drop = domain.notin_(included_domains) & not_included
+    elif excluded_domains and included_domains:
+        drop = domain.in_(excluded_domains) | \
+            (domain.notin_(included_domains) & not_included)
+    elif included_entities:
+        drop = not_included
+    else:
+        drop = None
+
+    if excluded_entities:
+        excluded = entity_id.in_(excluded_entities)
+        drop = excluded if drop is None else drop | excluded
+
+    return None if drop is None else ~drop
+
+
+def _exclude_events(events, config):
+    """Generator that skips events of excluded entities and platforms."""
+    excluded_entities, excluded_domains, included_entities, \
+        included_domains = _filter_config(config)
 
-    filtered_events = []
     for event in events:
         domain, entity_id = None, None
 
@@ -320,8 +454,10 @@ def _exclude_events(events, config):
             entity_id = to_state.entity_id
 
         elif event.event_type == EVENT_LOGBOOK_ENTRY:
-            domain = event.data.get(ATTR_DOMAIN)
-            entity_id = event.data.get(ATTR_ENTITY_ID)
+            # Like the columns _entity_filter compares, the domain of
+            # entries without one is the domain of their entity_id
+            entity_id, domain = recorder.get_model(
+                'Events').entity_columns(event.data)
 
         if domain or entity_id:
             # filter if only excluded is configured for this domain
@@ -350,8 +486,7 @@ def _exclude_events(events, config):
             # check if logbook entry is excluded for this entity
             if entity_id in excluded_entities:
                 continue
-        filtered_events.append(event)
-    return filtered_events
+        yield event
 
 
 # pylint: disable=too-many-return-statements
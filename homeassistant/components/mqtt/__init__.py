@@ -31,6 +31,7 @@ _LOGGER = logging.getLogger(__name__)
 DOMAIN = 'mqtt'
 
 DATA_MQTT = 'mqtt'
+DATA_MQTT_SUBSCRIPTIONS = 'mqtt_subscriptions'
 
 SERVICE_PUBLISH = 'publish'
 SIGNAL_MQTT_MESSAGE_RECEIVED = 'mqtt_message_received'
@@ -196,16 +197,26 @@ def publish_template(hass, topic, payload_template, qos=None, retain=None):
 @asyncio.coroutine
 def async_subscribe(hass, topic, msg_callback, qos=DEFAULT_QOS):
     """Subscribe to an MQTT topic."""
-    @callback
-    def async_mqtt_topic_subscriber(dp_topic, dp_payload, dp_qos):
-        """Match subscribed MQTT topic."""
-        if not _match_topic(topic, dp_topic):
-            return
+    subscriptions = hass.data.get(DATA_MQTT_SUBSCRIPTIONS)
+
+    if subscriptions is None:
+        subscriptions = hass.data[DATA_MQTT_SUBSCRIPTIONS] = TopicTrie()
+
+        @callback
+        def async_mqtt_message_received(dp_topic, dp_payload, dp_qos):
+            """Route a received message to the matching subscriptions."""
+            for subscriber in subscriptions.match(dp_topic):
+                hass.async_run_job(subscriber, dp_topic, dp_payload, dp_qos)
 
-        hass.async_run_job(msg_callback, dp_topic, dp_payload, dp_qos)
+        async_dispatcher_connect(
+            hass, SIGNAL_MQTT_MESSAGE_RECEIVED, async_mqtt_message_received)
 
-    async_remove = async_dispatcher_connect(
-        hass, SIGNAL_MQTT_MESSAGE_RECEIVED, async_mqtt_topic_subscriber)
+    subscriptions.add(topic, msg_callback)
+
+    @callback
+    def async_remove():
+        """Remove the subscription."""
+        subscriptions.remove(topic, msg_callback)
 
     yield from hass.data[DATA_MQTT].async_subscribe(topic, qos)
     return async_remove
@@ -609,14 +620,80 @@ def _raise_on_error(result):
             'Error talking to MQTT: {}'.format(mqtt.error_string(result)))
 
 
-def _match_topic(subscription, topic):
-    """Test if topic matches subscription."""
-    if subscription.endswith('#'):
-        return (subscription[:-2] == topic or
-                topic.startswith(subscription[:-1]))
+class _TopicNode(object):
+    """A level of a subscription topic in the topic trie."""
+
+    __slots__ = ['children', 'subscribers']
+
+    def __init__(self):
+        """Initialize the node."""
+        self.children = {}
+        self.subscribers = []
 
-    sub_parts = subscription.split('/')
-    topic_parts = topic.split('/')
 
-    return (len(sub_parts) == len(topic_parts) and
-            all(a == b for a, b in zip(sub_parts, topic_parts) if a != '+'))
+class TopicTrie(object):
+    """Subscriptions stored in a trie keyed by topic level.
+
+    Supports the MQTT wildcards: `+` matches a single level and `#` matches
+    the parent level and every level below it.
+    """
+
+    def __init__(self):
+        """Initialize the trie."""
+        self._root = _TopicNode()
+
+    def add(self, subscription, subscriber):
+        """Add a subscriber for a subscription topic."""
+        node = self._root
+        for level in subscription.split('/'):
+            child = node.children.get(level)
+            if child is None:
+                child = node.children[level] = _TopicNode()
+            node = child
+        node.subscribers.append(subscriber)
+
+    def remove(self, subscription, subscriber):
+        """Remove a subscriber and prune levels that became empty."""
+        path = [self._root]
+        levels = subscription.split('/')
+        for level in levels:
+            node = path[-1].children.get(level)
+            if node is None:
+                return
+            path.append(node)
+
+        try:
+            path[-1].subscribers.remove(subscriber)
+        except ValueError:
+            return
+
+        for idx in range(len(levels), 0, -1):
+            if path[idx].subscribers or path[idx].children:
+                break
+            del path[idx - 1].children[levels[idx - 1]]
+
+    def match(self, topic):
+        """Return the subscribers with a subscription matching topic."""
+        matches = []
+        nodes = [self._root]
+
+        for level in topic.split('/'):
+            next_nodes = []
+            for node in nodes:
+                children = node.children
+                if '#' in children:
+                    matches.extend(children['#'].subscribers)
+                if level in children:
+                    next_nodes.append(children[level])
+                if '+' in children:
+                    next_nodes.append(children['+'])
+            if not next_nodes:
+                return matches
+            nodes = next_nodes
+
+        for node in nodes:
+            matches.extend(node.subscribers)
+            if '#' in node.children:
+                matches.extend(node.children['#'].subscribers)
+
+        return matches
@@ -104,6 +104,8 @@ class Proximity(Entity):
         self.tolerance = tolerance
         self.proximity_zone = proximity_zone
         self._unit_of_measurement = unit_of_measurement
+        # device -> (zone and device coordinates, distance in meters)
+        self._distances = {}
 
     @property
     def name(self):
@@ -189,10 +191,10 @@ class Proximity(Entity):
                 continue
 
             # Calculate the distance to the proximity zone.
-            dist_to_zone = distance(proximity_latitude,
-                                    proximity_longitude,
-                                    device_state.attributes['latitude'],
-                                    device_state.attributes['longitude'])
+            dist_to_zone = self._device_distance(
+                device, proximity_latitude, proximity_longitude,
+                device_state.attributes['latitude'],
+                device_state.attributes['longitude'])
 
             # Add the device and distance to a dictionary.
             distances_to_zone[device] = round(
@@ -233,9 +235,10 @@ class Proximity(Entity):
         old_distance = distance(proximity_latitude, proximity_longitude,
                                 old_state.attributes['latitude'],
                                 old_state.attributes['longitude'])
-        new_distance = distance(proximity_latitude, proximity_longitude,
-                                new_state.attributes['latitude'],
-                                new_state.attributes['longitude'])
+        new_distance = self._device_distance(
+            entity, proximity_latitude, proximity_longitude,
+            new_state.attributes['latitude'],
+            new_state.attributes['longitude'])
         distance_travelled = round(new_distance - old_distance, 1)
 
         # Check for tolerance
@@ -256,3 +259,16 @@ class Proximity(Entity):
                       direction_of_travel, entity_name)
 
         _LOGGER.info('%s: proximity calculation complete', entity_name)
+
+    def _device_distance(self, device, *coordinates):
+        """Return the distance of a device to the zone in meters.
+
+        Only calculated again when the device or the zone moved.
+        """
+        cached = self._distances.get(device)
+        if cached is not None and cached[0] == coordinates:
+            return cached[1]
+
+        dist = distance(*coordinates)
+        self._distances[device] = (coordinates, dist)
+        return dist
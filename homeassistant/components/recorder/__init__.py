@@ -8,6 +8,9 @@ For more details about this component, please refer to the documentation at
 https://home-assistant.io/components/recorder/
 """
 import asyncio
+from collections import OrderedDict
+from functools import partial
+import json
 import logging
 import queue
 import threading
@@ -18,6 +21,9 @@ from contextlib import contextmanager
 
 import voluptuous as vol
 
+from homeassistant.components.recorder.event_queue import (
+    EventQueue, OVERFLOW_POLICIES, POLICY_DROP)
+from homeassistant.components.recorder.history_cache import HistoryCache
 from homeassistant.core import HomeAssistant, callback, split_entity_id
 from homeassistant.const import (
     ATTR_ENTITY_ID, CONF_ENTITIES, CONF_EXCLUDE, CONF_DOMAINS,
@@ -31,13 +37,43 @@ import homeassistant.util.dt as dt_util
 
 DOMAIN = 'recorder'
 
+DATA_QUEUE = 'recorder_queue'
+
 REQUIREMENTS = ['sqlalchemy==1.1.5']
 
 DEFAULT_URL = 'sqlite:///{hass_config_path}'
 DEFAULT_DB_FILE = 'home-assistant_v2.db'
+DEFAULT_SPILL_FILE = 'home-assistant_v2.spill'
 
 CONF_DB_URL = 'db_url'
 CONF_PURGE_DAYS = 'purge_days'
+CONF_COMMIT_INTERVAL = 'commit_interval'
+CONF_MAX_BATCH = 'max_batch'
+CONF_MAX_QUEUE_SIZE = 'max_queue_size'
+CONF_OVERFLOW_POLICY = 'overflow_policy'
+CONF_CACHE_HOURS = 'cache_hours'
+CONF_CACHE_STATES = 'cache_states'
+
+DEFAULT_COMMIT_INTERVAL = 0
+DEFAULT_MAX_BATCH = 100
+DEFAULT_MAX_QUEUE_SIZE = 30000
+DEFAULT_CACHE_HOURS = 0
+DEFAULT_CACHE_STATES = 500
+
+# Number of serialized attributes -> attributes_id mappings kept in memory
+ATTRIBUTES_CACHE_SIZE = 2048
+
+# Rows deleted per purge transaction, by primary key range
+PURGE_BATCH_SIZE = 1000
+# Free SQLite pages released per incremental vacuum step
+VACUUM_PAGES = 1024
+SQLITE_AUTO_VACUUM_INCREMENTAL = 2
+
+# Events updated per transaction when filling in new columns
+MIGRATION_BATCH_SIZE = 1000
+
+# Queued to run a purge on the recorder thread
+PURGE_TASK = object()
 
 RETRIES = 3
 CONNECT_RETRY_WAIT = 10
@@ -62,6 +98,18 @@ CONFIG_SCHEMA = vol.Schema({
         vol.Optional(CONF_PURGE_DAYS):
             vol.All(vol.Coerce(int), vol.Range(min=1)),
         vol.Optional(CONF_DB_URL): cv.string,
+        vol.Optional(CONF_COMMIT_INTERVAL, default=DEFAULT_COMMIT_INTERVAL):
+            vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(CONF_MAX_BATCH, default=DEFAULT_MAX_BATCH):
+            vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(CONF_MAX_QUEUE_SIZE, default=DEFAULT_MAX_QUEUE_SIZE):
+            vol.All(vol.Coerce(int), vol.Range(min=0)),
+        vol.Optional(CONF_OVERFLOW_POLICY, default=POLICY_DROP):
+            vol.In(OVERFLOW_POLICIES),
+        vol.Optional(CONF_CACHE_HOURS, default=DEFAULT_CACHE_HOURS):
+            vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(CONF_CACHE_STATES, default=DEFAULT_CACHE_STATES):
+            vol.All(vol.Coerce(int), vol.Range(min=1)),
     })
 }, extra=vol.ALLOW_EXTRA)
 
@@ -163,6 +211,17 @@ def setup(hass: HomeAssistant, config: ConfigType) -> bool:
         return False
 
     purge_days = config.get(DOMAIN, {}).get(CONF_PURGE_DAYS)
+    commit_interval = config.get(DOMAIN, {}).get(
+        CONF_COMMIT_INTERVAL, DEFAULT_COMMIT_INTERVAL)
+    max_batch = config.get(DOMAIN, {}).get(CONF_MAX_BATCH, DEFAULT_MAX_BATCH)
+    max_queue_size = config.get(DOMAIN, {}).get(
+        CONF_MAX_QUEUE_SIZE, DEFAULT_MAX_QUEUE_SIZE)
+    overflow_policy = config.get(DOMAIN, {}).get(
+        CONF_OVERFLOW_POLICY, POLICY_DROP)
+    cache_hours = config.get(DOMAIN, {}).get(
+        CONF_CACHE_HOURS, DEFAULT_CACHE_HOURS)
+    cache_states = config.get(DOMAIN, {}).get(
+        CONF_CACHE_STATES, DEFAULT_CACHE_STATES)
 
     db_url = config.get(DOMAIN, {}).get(CONF_DB_URL, None)
     if not db_url:
@@ -172,7 +231,11 @@ def setup(hass: HomeAssistant, config: ConfigType) -> bool:
     include = config.get(DOMAIN, {}).get(CONF_INCLUDE, {})
     exclude = config.get(DOMAIN, {}).get(CONF_EXCLUDE, {})
     _INSTANCE = Recorder(hass, purge_days=purge_days, uri=db_url,
-                         include=include, exclude=exclude)
+                         include=include, exclude=exclude,
+                         commit_interval=commit_interval, max_batch=max_batch,
+                         max_queue_size=max_queue_size,
+                         overflow_policy=overflow_policy,
+                         cache_hours=cache_hours, cache_states=cache_states)
     _INSTANCE.start()
 
     return True
@@ -202,33 +265,60 @@ class Recorder(threading.Thread):
     """A threaded recorder class."""
 
     def __init__(self, hass: HomeAssistant, purge_days: int, uri: str,
-                 include: Dict, exclude: Dict) -> None:
+                 include: Dict, exclude: Dict,
+                 commit_interval: float=DEFAULT_COMMIT_INTERVAL,
+                 max_batch: int=DEFAULT_MAX_BATCH,
+                 max_queue_size: int=0,
+                 overflow_policy: str=POLICY_DROP,
+                 cache_hours: float=DEFAULT_CACHE_HOURS,
+                 cache_states: int=DEFAULT_CACHE_STATES) -> None:
         """Initialize the recorder."""
         threading.Thread.__init__(self)
 
         self.hass = hass
         self.purge_days = purge_days
-        self.queue = queue.Queue()  # type: Any
+        self.commit_interval = commit_interval
+        self.max_batch = max_batch
+        self.last_batch_size = 0
+        self.last_batch_time = 0.0
+        # Serialized attributes -> attributes_id, least recently used first
+        self._attributes_ids = OrderedDict()  # type: OrderedDict
+        # Attributes inserted by the batch that is being committed
+        self._pending_attributes_ids = {}  # type: Dict[str, int]
+        self.queue = EventQueue(
+            max_queue_size, overflow_policy,
+            hass.config.path(DEFAULT_SPILL_FILE))  # type: Any
+        hass.data[DATA_QUEUE] = self.queue
         self.recording_start = dt_util.utcnow()
         self.db_url = uri
         self.db_ready = threading.Event()
         self.async_db_ready = asyncio.Event(loop=hass.loop)
         self.engine = None  # type: Any
         self._run = None  # type: Any
+        self._purge_task = None  # type: Any
 
         self.include_e = include.get(CONF_ENTITIES, [])
         self.include_d = include.get(CONF_DOMAINS, [])
         self.exclude = exclude.get(CONF_ENTITIES, []) + \
             exclude.get(CONF_DOMAINS, [])
 
+        self.history_cache = None  # type: Optional[HistoryCache]
+        if cache_hours:
+            self.history_cache = HistoryCache(
+                timedelta(hours=cache_hours), cache_states)
+
         hass.bus.listen_once(EVENT_HOMEASSISTANT_STOP, self.shutdown)
         hass.bus.listen(MATCH_ALL, self.event_listener)
 
+        if self.history_cache is not None:
+            self.history_cache.seed(
+                state for state in hass.states.all()
+                if self._should_record_entity(state.entity_id))
+
         self.get_session = None
 
     def run(self):
         """Start processing events to save."""
-        from homeassistant.components.recorder.models import Events, States
         from sqlalchemy.exc import SQLAlchemyError
 
         while True:
@@ -245,60 +335,220 @@ class Recorder(threading.Thread):
 
         if self.purge_days is not None:
             async_track_time_interval(
-                self.hass, self._purge_old_data, timedelta(days=2))
+                self.hass, self.async_purge, timedelta(days=2))
 
         while True:
-            event = self.queue.get()
+            # Spill file I/O happens here instead of in the event loop
+            self.queue.read_spill()
+            if self._purge_task is None:
+                event = self.queue.get()
+            else:
+                # Keep purging while there is nothing to write
+                try:
+                    event = self.queue.get_nowait()
+                except queue.Empty:
+                    self._purge_step()
+                    continue
 
-            if event is None:
+            if event is PURGE_TASK:
+                self._start_purge()
+                self.queue.task_done()
+                continue
+
+            batch = []
+            stop = event is None
+            if not stop:
+                batch.append(event)
+                stop = self._fill_batch(batch)
+
+            self._save_batch(batch)
+            self.queue.write_spill()
+
+            for _ in batch:
+                self.queue.task_done()
+
+            if self._purge_task is not None and not stop:
+                self._purge_step()
+
+            if stop:
                 self._close_run()
                 self._close_connection()
                 self.queue.task_done()
                 return
 
-            if event.event_type == EVENT_TIME_CHANGED:
-                self.queue.task_done()
-                continue
+    def _save_batch(self, events):
+        """Write a batch of events in a single transaction."""
+        if not events:
+            return
 
-            if ATTR_ENTITY_ID in event.data:
-                entity_id = event.data[ATTR_ENTITY_ID]
-                domain = split_entity_id(entity_id)[0]
+        start = time.monotonic()
+        with session_scope() as session:
+            if self._commit(session, self._batch_writer(events)):
+                self._cache_attributes_ids(self._pending_attributes_ids)
+        self.last_batch_size = len(events)
+        self.last_batch_time = time.monotonic() - start
+        _LOGGER.debug("Committed batch of %s events in %.3f seconds, "
+                      "%s events queued", self.last_batch_size,
+                      self.last_batch_time, self.queue.stats()['depth'])
+
+    def _fill_batch(self, batch):
+        """Drain the queue into batch until it is full or the interval ends.
+
+        Return True if the shutdown marker was dequeued.
+        """
+        deadline = time.monotonic() + self.commit_interval
 
-                # Exclude entities OR
-                # Exclude domains, but include specific entities
-                if (entity_id in self.exclude) or \
-                        (domain in self.exclude and
-                         entity_id not in self.include_e):
-                    self.queue.task_done()
-                    continue
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                if timeout > 0:
+                    event = self.queue.get(timeout=timeout)
+                else:
+                    event = self.queue.get_nowait()
+            except queue.Empty:
+                return False
 
-                # Included domains only (excluded entities above) OR
-                # Include entities only, but only if no excludes
-                if (self.include_d and domain not in self.include_d) or \
-                        (self.include_e and entity_id not in self.include_e
-                         and not self.exclude):
-                    self.queue.task_done()
-                    continue
+            if event is None:
+                return True
 
-            with session_scope() as session:
-                dbevent = Events.from_event(event)
-                self._commit(session, dbevent)
+            if event is PURGE_TASK:
+                self._start_purge()
+                self.queue.task_done()
+                continue
+
+            batch.append(event)
 
+        return False
+
+    def _should_record(self, event):
+        """Return True if the event passes the include/exclude filters."""
+        if event.event_type == EVENT_TIME_CHANGED:
+            return False
+
+        if ATTR_ENTITY_ID in event.data:
+            return self._should_record_entity(event.data[ATTR_ENTITY_ID])
+
+        return True
+
+    def _should_record_entity(self, entity_id):
+        """Return True if the entity passes the include/exclude filters."""
+        domain = split_entity_id(entity_id)[0]
+
+        # Exclude entities OR
+        # Exclude domains, but include specific entities
+        if (entity_id in self.exclude) or \
+                (domain in self.exclude and
+                 entity_id not in self.include_e):
+            return False
+
+        # Included domains only (excluded entities above) OR
+        # Include entities only, but only if no excludes
+        if (self.include_d and domain not in self.include_d) or \
+                (self.include_e and entity_id not in self.include_e
+                 and not self.exclude):
+            return False
+
+        return True
+
+    def _batch_writer(self, events):
+        """Return work that writes events and their states in bulk."""
+        from homeassistant.components.recorder.models import (
+            Events, States, StateAttributes)
+
+        def write_batch(session):
+            """Insert the events, then the states that reference them."""
+            dbevents = [Events.from_event(event) for event in events]
+            # Primary keys are needed to back-fill States.event_id
+            session.bulk_save_objects(dbevents, return_defaults=True)
+
+            # Work out the attributes rows first so they can be inserted
+            # together before the states that reference them.
+            self._pending_attributes_ids = {}
+            new_attributes = OrderedDict()
+            dbstates = []
+            for event, dbevent in zip(events, dbevents):
                 if event.event_type != EVENT_STATE_CHANGED:
-                    self.queue.task_done()
                     continue
-
                 dbstate = States.from_event(event)
                 dbstate.event_id = dbevent.event_id
-                self._commit(session, dbstate)
+                shared_attrs = StateAttributes.shared_attrs_from_event(event)
+                dbstate.attributes_id = self._find_attributes_id(
+                    session, shared_attrs)
+                if dbstate.attributes_id is None:
+                    new_attributes.setdefault(shared_attrs, []).append(
+                        dbstate)
+                dbstates.append(dbstate)
+
+            if new_attributes:
+                dbattributes = [
+                    StateAttributes(
+                        hash=StateAttributes.hash_shared_attrs(shared_attrs),
+                        shared_attrs=shared_attrs)
+                    for shared_attrs in new_attributes]
+                session.bulk_save_objects(dbattributes, return_defaults=True)
+
+                for dbattr, referencing in zip(
+                        dbattributes, new_attributes.values()):
+                    self._pending_attributes_ids[dbattr.shared_attrs] = \
+                        dbattr.attributes_id
+                    for dbstate in referencing:
+                        dbstate.attributes_id = dbattr.attributes_id
+
+            if dbstates:
+                session.bulk_save_objects(dbstates)
+
+        return write_batch
+
+    def _find_attributes_id(self, session, shared_attrs):
+        """Return the id of stored attributes or None if not stored yet."""
+        from homeassistant.components.recorder.models import StateAttributes
+
+        attributes_id = self._attributes_ids.get(shared_attrs)
+        if attributes_id is not None:
+            self._attributes_ids.move_to_end(shared_attrs)
+            return attributes_id
+
+        attributes_id = self._pending_attributes_ids.get(shared_attrs)
+        if attributes_id is not None:
+            return attributes_id
+
+        res = session.query(StateAttributes.attributes_id).filter(
+            (StateAttributes.hash ==
+             StateAttributes.hash_shared_attrs(shared_attrs)) &
+            (StateAttributes.shared_attrs == shared_attrs)).first()
+        if res is None:
+            return None
+
+        self._pending_attributes_ids[shared_attrs] = res[0]
+        return res[0]
+
+    def _cache_attributes_ids(self, attributes_ids):
+        """Remember committed attributes ids, evicting the least used."""
+        for shared_attrs, attributes_id in attributes_ids.items():
+            self._attributes_ids[shared_attrs] = attributes_id
+            self._attributes_ids.move_to_end(shared_attrs)
+
+        while len(self._attributes_ids) > ATTRIBUTES_CACHE_SIZE:
+            self._attributes_ids.popitem(last=False)
 
-            self.queue.task_done()
+    @callback
+    def async_purge(self, now=None):
+        """Schedule a purge of old data on the recorder thread."""
+        self.queue.put(PURGE_TASK)
 
     @callback
     def event_listener(self, event):
         """Listen for new events and put them in the process queue."""
+        # Filtered here so unrecorded events never take up queue space
+        if not self._should_record(event):
+            return
+
         self.queue.put(event)
 
+        if (self.history_cache is not None and
+                event.event_type == EVENT_STATE_CHANGED):
+            self.history_cache.add(event)
+
     def shutdown(self, event):
         """Tell the recorder to shut down."""
         global _INSTANCE  # pylint: disable=global-statement
@@ -331,10 +581,42 @@ class Recorder(threading.Thread):
         else:
             self.engine = create_engine(self.db_url, echo=False)
 
+        if self.engine.dialect.name == 'sqlite':
+            # Only takes effect for new databases, see
+            # _enable_incremental_vacuum
+            self.engine.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
         models.Base.metadata.create_all(self.engine)
         session_factory = sessionmaker(bind=self.engine)
         self.get_session = scoped_session(session_factory)
         self._migrate_schema()
+        self._enable_incremental_vacuum()
+
+    def _enable_incremental_vacuum(self):
+        """Switch an existing SQLite database over to incremental vacuum.
+
+        Existing databases only switch with a full VACUUM, which blocks
+        the database for a while. It runs once here at startup instead of
+        during a purge.
+        """
+        from sqlalchemy.exc import SQLAlchemyError
+
+        if self.engine.dialect.name != 'sqlite':
+            return
+
+        auto_vacuum = self.engine.execute("PRAGMA auto_vacuum").scalar()
+        if auto_vacuum == SQLITE_AUTO_VACUUM_INCREMENTAL:
+            return
+
+        _LOGGER.warning("Vacuuming SQLite once to enable incremental "
+                        "vacuum, this can take a while for large databases")
+        try:
+            # The pragma only applies to the connection that vacuums
+            with self.engine.connect() as connection:
+                connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                connection.execute("VACUUM")
+        except SQLAlchemyError as err:
+            _LOGGER.error("Error enabling incremental vacuum: %s", err)
 
     def _migrate_schema(self):
         """Check if the schema needs to be upgraded."""
@@ -366,27 +648,106 @@ class Recorder(threading.Thread):
 
     def _apply_update(self, new_version):
         """Perform operations to bring schema up to date."""
-        from sqlalchemy import Table
+        from sqlalchemy import Table, text
         import homeassistant.components.recorder.models as models
 
-        if new_version == 1:
-            def create_index(table_name, column_name):
-                """Create an index for the specified table and column."""
-                table = Table(table_name, models.Base.metadata)
-                name = "_".join(("ix", table_name, column_name))
-                # Look up the index object that was created from the models
-                index = next(idx for idx in table.indexes if idx.name == name)
-                _LOGGER.debug("Creating index for table %s column %s",
-                              table_name, column_name)
-                index.create(self.engine)
-                _LOGGER.debug("Index creation done for table %s column %s",
-                              table_name, column_name)
+        def create_index(table_name, *column_names):
+            """Create an index for the specified table and columns."""
+            table = Table(table_name, models.Base.metadata)
+            name = "_".join(("ix", table_name) + column_names)
+            # Look up the index object that was created from the models
+            index = next(idx for idx in table.indexes if idx.name == name)
+            _LOGGER.debug("Creating index for table %s columns %s",
+                          table_name, column_names)
+            index.create(self.engine)
+            _LOGGER.debug("Index creation done for table %s columns %s",
+                          table_name, column_names)
 
+        if new_version == 1:
             create_index("events", "time_fired")
+        elif new_version == 2:
+            # Attributes are stored once in state_attributes, existing rows
+            # keep their attributes in the states table.
+            models.StateAttributes.__table__.create(
+                self.engine, checkfirst=True)
+            self.engine.execute(
+                text("ALTER TABLE states ADD COLUMN attributes_id INTEGER "
+                     "REFERENCES state_attributes(attributes_id)"))
+            create_index("states", "attributes_id")
+        elif new_version == 3:
+            # Entity columns on events, filled in before they are indexed
+            self.engine.execute(
+                text("ALTER TABLE events ADD COLUMN entity_id VARCHAR(255)"))
+            self.engine.execute(
+                text("ALTER TABLE events ADD COLUMN domain VARCHAR(64)"))
+            self._backfill_event_entities()
+            create_index("events", "entity_id")
+            create_index("events", "domain")
+        elif new_version == 4:
+            create_index("states", "entity_id", "last_updated")
         else:
             raise ValueError("No schema migration defined for version {}"
                              .format(new_version))
 
+    def _backfill_event_entities(self):
+        """Fill in the entity columns of existing events in chunks."""
+        from sqlalchemy import func
+        from homeassistant.components.recorder.models import Events
+
+        with session_scope() as session:
+            low, high = session.query(
+                func.min(Events.event_id), func.max(Events.event_id)).one()
+
+        if low is None:
+            return
+
+        _LOGGER.info("Filling in entity columns of events %s to %s",
+                     low, high)
+
+        while low <= high:
+            upper = low + MIGRATION_BATCH_SIZE
+            with session_scope() as session:
+                self._commit(session, partial(
+                    self._backfill_event_chunk, start=low, end=upper))
+            _LOGGER.debug("Filled in entity columns up to event %s of %s",
+                          upper - 1, high)
+            low = upper
+
+    @staticmethod
+    def _backfill_event_chunk(session, start, end):
+        """Fill in the entity columns of events with ids in [start, end)."""
+        from homeassistant.components.recorder.models import Events, States
+
+        in_range = (Events.event_id >= start) & (Events.event_id < end)
+        mappings = []
+
+        # State changes take the columns of their recorded state
+        for event_id, entity_id, domain in session.query(
+                Events.event_id, States.entity_id, States.domain).join(
+                    States, States.event_id == Events.event_id).filter(
+                        in_range &
+                        (Events.event_type == EVENT_STATE_CHANGED)):
+            mappings.append({'event_id': event_id, 'entity_id': entity_id,
+                             'domain': domain})
+
+        # Other events only mention entities in their data
+        for event_id, event_data in session.query(
+                Events.event_id, Events.event_data).filter(
+                    in_range & (Events.event_type != EVENT_STATE_CHANGED) &
+                    (Events.event_data.like('%"entity_id"%') |
+                     Events.event_data.like('%"domain"%'))):
+            try:
+                data = json.loads(event_data)
+            except ValueError:
+                continue
+            entity_id, domain = Events.entity_columns(data)
+            if entity_id is not None or domain is not None:
+                mappings.append({'event_id': event_id,
+                                 'entity_id': entity_id, 'domain': domain})
+
+        if mappings:
+            session.bulk_update_mappings(Events, mappings)
+
     def _inspect_schema_version(self):
         """Determine the schema version by inspecting the db structure.
 
@@ -448,40 +809,134 @@ class Recorder(threading.Thread):
         self._run = None
 
     def _purge_old_data(self, _=None):
-        """Purge events and states older than purge_days ago."""
-        from homeassistant.components.recorder.models import Events, States
+        """Purge events and states older than purge_days ago at once."""
+        for _ in self._purge_steps():
+            pass
+
+    def _start_purge(self):
+        """Start a purge that runs in chunks between event batches."""
+        if self._purge_task is None:
+            self._purge_task = self._purge_steps()
+
+    def _purge_step(self):
+        """Run the next chunk of the current purge."""
+        try:
+            next(self._purge_task)
+        except StopIteration:
+            self._purge_task = None
+
+    def _purge_steps(self):
+        """Purge old data by primary key range, yielding after each chunk.
+
+        Only runs on the recorder thread so the attributes cache can be kept
+        consistent with the state_attributes table.
+        """
+        from sqlalchemy import exists
+        from homeassistant.components.recorder.models import (
+            Events, States, StateAttributes)
 
         if not self.purge_days or self.purge_days < 1:
             _LOGGER.debug("purge_days set to %s, will not purge any old data.",
                           self.purge_days)
             return
 
+        start = time.monotonic()
         purge_before = dt_util.utcnow() - timedelta(days=self.purge_days)
 
-        def _purge_states(session):
-            deleted_rows = session.query(States) \
-                                  .filter((States.created < purge_before)) \
-                                  .delete(synchronize_session=False)
-            _LOGGER.debug("Deleted %s states", deleted_rows)
+        # States reference events, so they are removed first
+        deleted_states = 0
+        for deleted in self._purge_range(
+                States, States.state_id, States.created < purge_before):
+            deleted_states += deleted
+            yield
+        _LOGGER.info("Purged %s states created before %s",
+                     deleted_states, purge_before)
+
+        deleted_events = 0
+        for deleted in self._purge_range(
+                Events, Events.event_id, Events.created < purge_before):
+            deleted_events += deleted
+            yield
+        _LOGGER.info("Purged %s events created before %s",
+                     deleted_events, purge_before)
+
+        deleted_attributes = 0
+        if deleted_states:
+            unused = ~exists().where(
+                States.attributes_id == StateAttributes.attributes_id)
+            for deleted in self._purge_range(
+                    StateAttributes, StateAttributes.attributes_id, unused):
+                if deleted:
+                    # The cache may point at rows that are gone now
+                    self._attributes_ids.clear()
+                deleted_attributes += deleted
+                yield
+            _LOGGER.info("Purged %s unused state attributes",
+                         deleted_attributes)
+
+        if deleted_states or deleted_events:
+            yield from self._vacuum_steps()
+
+        _LOGGER.info("Purge done in %.1f seconds",
+                     time.monotonic() - start)
+
+    def _purge_range(self, model, id_column, criterion):
+        """Delete matching rows in chunks, yield the rows deleted per chunk."""
+        from sqlalchemy import func
 
         with session_scope() as session:
-            if self._commit(session, _purge_states):
-                _LOGGER.info("Purged states created before %s", purge_before)
+            low, high = session.query(
+                func.min(id_column), func.max(id_column)).filter(
+                    criterion).one()
 
-        def _purge_events(session):
-            deleted_rows = session.query(Events) \
-                                  .filter((Events.created < purge_before)) \
-                                  .delete(synchronize_session=False)
-            _LOGGER.debug("Deleted %s events", deleted_rows)
+        if low is None:
+            return
+
+        while low <= high:
+            upper = min(low + PURGE_BATCH_SIZE, high + 1)
+            deleted = self._purge_chunk(
+                model, (id_column >= low) & (id_column < upper) & criterion)
+            _LOGGER.debug("Deleted %s rows from %s with ids %s to %s of %s",
+                          deleted, model.__tablename__, low, upper - 1, high)
+            yield deleted
+            low = upper
+
+    def _purge_chunk(self, model, criterion):
+        """Delete the rows matching criterion in one transaction."""
+        deleted = [0]
+
+        def _delete(session):
+            """Delete the rows."""
+            deleted[0] = session.query(model).filter(criterion).delete(
+                synchronize_session=False)
 
         with session_scope() as session:
-            if self._commit(session, _purge_events):
-                _LOGGER.info("Purged events created before %s", purge_before)
+            if not self._commit(session, _delete):
+                return 0
+        return deleted[0]
 
-        # Execute sqlite vacuum command to free up space on disk
-        if self.engine.driver == 'sqlite':
-            _LOGGER.info("Vacuuming SQLite to free space")
-            self.engine.execute("VACUUM")
+    def _vacuum_steps(self):
+        """Free unused SQLite pages in steps, yielding after each one."""
+        if self.engine.dialect.name != 'sqlite':
+            return
+
+        auto_vacuum = self.engine.execute("PRAGMA auto_vacuum").scalar()
+        if auto_vacuum != SQLITE_AUTO_VACUUM_INCREMENTAL:
+            # Switching over failed at startup, a full VACUUM would block
+            _LOGGER.debug("Incremental vacuum not enabled, not vacuuming")
+            return
+
+        free_pages = self.engine.execute("PRAGMA freelist_count").scalar()
+        _LOGGER.debug("Releasing %s free SQLite pages", free_pages)
+        while free_pages:
+            self.engine.execute(
+                "PRAGMA incremental_vacuum({})".format(VACUUM_PAGES))
+            yield
+            remaining = self.engine.execute(
+                "PRAGMA freelist_count").scalar()
+            if remaining >= free_pages:
+                break
+            free_pages = remaining
 
     @staticmethod
     def _commit(session, work):
@@ -0,0 +1,336 @@
+"""Bounded event queue feeding the recorder thread."""
+import collections
+import json
+import logging
+import os
+import queue
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, EventOrigin, State
+from homeassistant.remote import JSONEncoder
+import homeassistant.util.dt as dt_util
+
+POLICY_DROP = 'drop'
+POLICY_COALESCE = 'coalesce'
+POLICY_SPILL = 'spill'
+
+OVERFLOW_POLICIES = (POLICY_DROP, POLICY_COALESCE, POLICY_SPILL)
+
+# Number of spilled events read back into memory at once
+SPILL_READ_SIZE = 1000
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _Entry(object):
+    """An item in the queue that can be removed without searching for it."""
+
+    __slots__ = ['item', 'removed']
+
+    def __init__(self, item):
+        """Initialize the entry."""
+        self.item = item
+        self.removed = False
+
+
+class EventQueue(queue.Queue):
+    """Queue that applies an overflow policy once max_size events wait.
+
+    The policy decides what happens to events that do not fit:
+
+    - drop: drop the oldest event, events other than state changes first.
+    - coalesce: replace the queued state change of an entity by a newer
+      state of the same entity, else fall back to drop.
+    - spill: append events to a file and read them back once the queue
+      has been drained. Spilled events survive a restart.
+
+    Items that are not events, like the shutdown marker, are always queued.
+    put never blocks or does file I/O, so the queue can be fed from the
+    event loop. The consuming thread calls write_spill to write the events
+    to spill and read_spill to read spilled events back. Both use the file
+    without holding the lock of the queue.
+    """
+
+    def __init__(self, max_size=0, policy=POLICY_DROP, spill_path=None):
+        """Initialize the queue."""
+        self.max_size = max_size
+        self.policy = policy
+        self.spill_path = spill_path
+        self.dropped = 0
+        self.coalesced = 0
+        self.spilled = 0
+        self._spill_pending = 0
+        self._spill_offset = 0
+        self._spill_file = None
+        self._overflowing = False
+        super().__init__()
+
+        if spill_path is not None and os.path.isfile(spill_path):
+            self._restore_spill()
+
+    @property
+    def overflowing(self):
+        """Return True if the overflow policy is in effect."""
+        return self._overflowing
+
+    def _init(self, maxsize):
+        """Initialize the queue storage."""
+        # Entries in memory in queue order, removed ones are skipped by _get
+        self.queue = collections.deque()
+        self._live = 0
+        # Entries of events other than state changes, oldest first
+        self._other_events = collections.deque()
+        # Entries of state changes, oldest first
+        self._state_events = collections.deque()
+        # entity_id -> entry of its latest queued state change
+        self._latest_states = {}
+        # Events to spill that are not written yet
+        self._unspilled = collections.deque()
+
+    def stats(self):
+        """Return the depth of the queue and what the policy did so far."""
+        with self.mutex:
+            return {
+                'depth': self._depth(),
+                'overflowing': self._overflowing,
+                'dropped': self.dropped,
+                'coalesced': self.coalesced,
+                'spilled': self.spilled,
+            }
+
+    def _depth(self):
+        """Return the number of queued items, including spilled events."""
+        return self._live + self._spill_pending + len(self._unspilled)
+
+    def _qsize(self):
+        """Return the number of items get can return without file I/O.
+
+        Spilled events only count once read_spill read them back.
+        """
+        if self._spill_pending:
+            return self._live
+        return self._live + len(self._unspilled)
+
+    def _put(self, item):
+        """Queue an item, applying the overflow policy if needed."""
+        if not isinstance(item, Event) or not self.max_size:
+            self._append(item)
+            return
+
+        if self._spill_pending or self._unspilled:
+            # Keep events in order until the spilled ones are processed
+            self._unspilled.append(item)
+            return
+
+        if self._live < self.max_size:
+            self._append(item)
+            return
+
+        if not self._overflowing:
+            self._overflowing = True
+            _LOGGER.warning("Recorder queue holds %s events, applying %s "
+                            "policy", self._live, self.policy)
+
+        if self.policy == POLICY_SPILL and self.spill_path is not None:
+            self._unspilled.append(item)
+            return
+
+        if self.policy != POLICY_COALESCE or not self._coalesce(item):
+            self._drop_oldest()
+
+        self._append(item)
+
+    def _get(self):
+        """Return the next item."""
+        if not self._live:
+            # Nothing is left in the spill file, these events are next
+            while self._unspilled:
+                self._append(self._unspilled.popleft())
+
+        entry = self.queue.popleft()
+        while entry.removed:
+            entry = self.queue.popleft()
+        self._live -= 1
+
+        item = entry.item
+        if isinstance(item, Event):
+            events = self._events_of(item)
+            # Entries removed before this one are still at the front
+            while events[0] is not entry:
+                events.popleft()
+            events.popleft()
+            self._forget_latest_state(entry)
+
+        if self._overflowing and self._depth() <= self.max_size // 2:
+            self._overflowing = False
+            _LOGGER.info("Recorder queue recovered. Dropped: %s, coalesced: "
+                         "%s, spilled: %s events", self.dropped,
+                         self.coalesced, self.spilled)
+
+        return item
+
+    def _events_of(self, event):
+        """Return the deque that holds the entries of events like event."""
+        if event.event_type == EVENT_STATE_CHANGED:
+            return self._state_events
+        return self._other_events
+
+    def _append(self, item):
+        """Add an item to the end of the queue in memory."""
+        entry = _Entry(item)
+        self.queue.append(entry)
+        self._live += 1
+
+        if isinstance(item, Event):
+            self._events_of(item).append(entry)
+            if item.event_type == EVENT_STATE_CHANGED:
+                self._latest_states[item.data.get('entity_id')] = entry
+
+    def _remove(self, entry):
+        """Remove an entry from the queue in memory."""
+        entry.removed = True
+        self._live -= 1
+        self._forget_latest_state(entry)
+        self._discard(1)
+
+    def _forget_latest_state(self, entry):
+        """Stop tracking entry as the latest state of its entity."""
+        if entry.item.event_type != EVENT_STATE_CHANGED:
+            return
+        entity_id = entry.item.data.get('entity_id')
+        if self._latest_states.get(entity_id) is entry:
+            del self._latest_states[entity_id]
+
+    def _discard(self, count):
+        """Mark discarded events as done for join."""
+        self.unfinished_tasks -= count
+        if not self.unfinished_tasks:
+            self.all_tasks_done.notify_all()
+
+    def _drop_oldest(self):
+        """Drop the oldest event, preferring events that are no state."""
+        for events in (self._other_events, self._state_events):
+            while events:
+                entry = events.popleft()
+                if not entry.removed:
+                    self._remove(entry)
+                    self.dropped += 1
+                    return
+
+    def _coalesce(self, item):
+        """Drop the state change item supersedes. Return True if any."""
+        if item.event_type != EVENT_STATE_CHANGED:
+            return False
+
+        entry = self._latest_states.get(item.data.get('entity_id'))
+        if entry is None:
+            return False
+
+        self._remove(entry)
+        self.coalesced += 1
+        return True
+
+    def write_spill(self):
+        """Append the events waiting to be spilled to the spill file.
+
+        Must be called from the thread that gets items from the queue, so
+        the file is only used by that thread.
+        """
+        with self.mutex:
+            events = list(self._unspilled)
+
+        if not events:
+            return
+
+        if self._spill_file is None:
+            self._spill_file = open(self.spill_path, 'a')
+
+        for event in events:
+            self._spill_file.write(
+                json.dumps(event.as_dict(), cls=JSONEncoder))
+            self._spill_file.write('\n')
+        self._spill_file.flush()
+
+        # Only this thread takes events from the front of the deque
+        with self.mutex:
+            for _ in events:
+                self._unspilled.popleft()
+            self._spill_pending += len(events)
+            self.spilled += len(events)
+
+    def read_spill(self):
+        """Read spilled events back once nothing else is in memory.
+
+        Reads until a valid event is found or the spill file is exhausted.
+        Must be called from the thread that gets items from the queue.
+        """
+        while True:
+            with self.mutex:
+                if self._live or not self._spill_pending:
+                    return
+                count = min(SPILL_READ_SIZE, self._spill_pending)
+
+            events = []
+            with open(self.spill_path) as fil:
+                fil.seek(self._spill_offset)
+                for _ in range(count):
+                    try:
+                        events.append(_event_from_json(fil.readline()))
+                    except (ValueError, KeyError) as err:
+                        _LOGGER.error("Skipping invalid spilled event: %s",
+                                      err)
+                self._spill_offset = fil.tell()
+
+            with self.not_empty:
+                for event in events:
+                    self._append(event)
+                self._spill_pending -= count
+                self._discard(count - len(events))
+                if events:
+                    self.not_empty.notify()
+                exhausted = not self._spill_pending
+
+            if exhausted:
+                self._remove_spill()
+
+    def _restore_spill(self):
+        """Queue events spilled before the last shutdown."""
+        lines = 0
+        complete = 0
+        with open(self.spill_path, 'rb+') as fil:
+            for line in fil:
+                if not line.endswith(b'\n'):
+                    break
+                lines += 1
+                complete += len(line)
+            # Drop a partial line written while shutting down uncleanly
+            fil.truncate(complete)
+
+        if not lines:
+            self._remove_spill()
+            return
+
+        _LOGGER.info("Restoring %s spilled events", lines)
+        self._spill_pending = lines
+        self.unfinished_tasks += lines
+
+    def _remove_spill(self):
+        """Remove the spill file once everything is read back."""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+        os.remove(self.spill_path)
+        self._spill_offset = 0
+
+
+def _event_from_json(line):
+    """Recreate an event from a spilled line."""
+    data = json.loads(line)
+    event_data = data['data']
+
+    if data['event_type'] == EVENT_STATE_CHANGED:
+        for key in ('old_state', 'new_state'):
+            event_data[key] = State.from_dict(event_data.get(key))
+
+    return Event(data['event_type'], event_data, EventOrigin(data['origin']),
+                 dt_util.parse_datetime(data['time_fired']))
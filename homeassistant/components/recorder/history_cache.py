@@ -0,0 +1,89 @@
+"""Recent states kept in memory so history can skip the database."""
+from collections import deque
+import logging
+import threading
+
+from homeassistant.core import State
+import homeassistant.util.dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class HistoryCache(object):
+    """Keep the recent states of every entity in a ring buffer.
+
+    States are added from the event loop and read from executor threads.
+    Every entity keeps its states of the last keep period, plus the state
+    it had at the start of that period.
+    """
+
+    def __init__(self, keep, max_states):
+        """Initialize the cache."""
+        self.keep = keep
+        self.max_states = max_states
+        self.hits = 0
+        self.misses = 0
+        self._states = {}
+        self._since = None
+        self._lock = threading.Lock()
+
+    def seed(self, states, now=None):
+        """Start caching with the current states."""
+        now = now or dt_util.utcnow()
+        with self._lock:
+            for state in states:
+                if state.entity_id not in self._states:
+                    self._states[state.entity_id] = deque((state,))
+            self._since = now
+
+    def add(self, event):
+        """Add the new state of a state_changed event."""
+        state = event.data.get('new_state')
+        if state is None:
+            # Recorded as an empty state when the entity is removed
+            state = State(event.data['entity_id'], '', None,
+                          event.time_fired, event.time_fired)
+
+        with self._lock:
+            states = self._states.get(state.entity_id)
+            if states is None:
+                states = self._states[state.entity_id] = deque()
+            states.append(state)
+
+            if len(states) > self.max_states:
+                states.popleft()
+                # States of this entity before the oldest one are gone
+                self._since = max(self._since, states[0].last_updated)
+
+            expired = state.last_updated - self.keep
+            while len(states) > 1 and states[1].last_updated <= expired:
+                states.popleft()
+
+    def covers(self, start_time):
+        """Return True if the history after start_time is cached."""
+        with self._lock:
+            covered = (self._since is not None and
+                       start_time >= self._since and
+                       start_time >= dt_util.utcnow() - self.keep)
+            if covered:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        _LOGGER.debug("History cache %s for %s (%s hits, %s misses)",
+                      'hit' if covered else 'miss', start_time, self.hits,
+                      self.misses)
+        return covered
+
+    def snapshot(self, entity_id=None):
+        """Return the cached states of entities, oldest first.
+
+        Only returns the states of entity_id if given.
+        """
+        with self._lock:
+            if entity_id is not None:
+                states = self._states.get(entity_id)
+                return {entity_id: tuple(states)} if states else {}
+
+            return {entity_id: tuple(states)
+                    for entity_id, states in self._states.items()}
@@ -1,12 +1,14 @@
 """Models for SQLAlchemy."""
 
+import hashlib
 import json
 from datetime import datetime
 import logging
 
-from sqlalchemy import (Boolean, Column, DateTime, ForeignKey, Index, Integer,
-                        String, Text, distinct)
+from sqlalchemy import (BigInteger, Boolean, Column, DateTime, ForeignKey,
+                        Index, Integer, String, Text, distinct)
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 
 import homeassistant.util.dt as dt_util
 from homeassistant.core import Event, EventOrigin, State, split_entity_id
@@ -16,7 +18,7 @@ from homeassistant.remote import JSONEncoder
 # pylint: disable=invalid-name
 Base = declarative_base()
 
-SCHEMA_VERSION = 1
+SCHEMA_VERSION = 4
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -31,14 +33,38 @@ class Events(Base):  # type: ignore
     origin = Column(String(32))
     time_fired = Column(DateTime(timezone=True), index=True)
     created = Column(DateTime(timezone=True), default=datetime.utcnow)
+    # Copied from event_data so events can be looked up per entity
+    entity_id = Column(String(255), index=True)
+    domain = Column(String(64), index=True)
 
     @staticmethod
     def from_event(event):
         """Create an event database object from a native event."""
+        entity_id, domain = Events.entity_columns(event.data)
         return Events(event_type=event.event_type,
                       event_data=json.dumps(event.data, cls=JSONEncoder),
                       origin=str(event.origin),
-                      time_fired=event.time_fired)
+                      time_fired=event.time_fired,
+                      entity_id=entity_id,
+                      domain=domain)
+
+    @staticmethod
+    def entity_columns(data):
+        """Return the entity_id and domain columns for event data.
+
+        Only a single entity_id is stored. The domain is taken from the data
+        if present, otherwise from the entity_id.
+        """
+        entity_id = data.get('entity_id')
+        if not isinstance(entity_id, str) or '.' not in entity_id:
+            entity_id = None
+
+        domain = data.get('domain')
+        if not isinstance(domain, str):
+            domain = None if entity_id is None else \
+                split_entity_id(entity_id)[0]
+
+        return entity_id, domain
 
     def to_native(self):
         """Convert to a natve HA Event."""
@@ -55,6 +81,30 @@ class Events(Base):  # type: ignore
             return None
 
 
+class StateAttributes(Base):   # type: ignore
+    """State attributes, shared by all states with the same attributes."""
+
+    __tablename__ = 'state_attributes'
+    attributes_id = Column(Integer, primary_key=True)
+    hash = Column(BigInteger, index=True)
+    shared_attrs = Column(Text)
+
+    @staticmethod
+    def shared_attrs_from_event(event):
+        """Return the serialized attributes of a state_changed event."""
+        state = event.data.get('new_state')
+        if state is None:
+            return '{}'
+        return json.dumps(dict(state.attributes), cls=JSONEncoder,
+                          sort_keys=True)
+
+    @staticmethod
+    def hash_shared_attrs(shared_attrs):
+        """Return a 64 bit signed hash of serialized attributes."""
+        digest = hashlib.sha1(shared_attrs.encode('utf-8')).digest()
+        return int.from_bytes(digest[:8], 'big', signed=True)
+
+
 class States(Base):   # type: ignore
     """State change history."""
 
@@ -63,7 +113,11 @@ class States(Base):   # type: ignore
     domain = Column(String(64))
     entity_id = Column(String(255))
     state = Column(String(255))
+    # Only set for rows recorded before attributes were shared
     attributes = Column(Text)
+    attributes_id = Column(Integer,
+                           ForeignKey('state_attributes.attributes_id'),
+                           index=True)
     event_id = Column(Integer, ForeignKey('events.event_id'))
     last_changed = Column(DateTime(timezone=True), default=datetime.utcnow)
     last_updated = Column(DateTime(timezone=True), default=datetime.utcnow)
@@ -72,11 +126,19 @@ class States(Base):   # type: ignore
     __table_args__ = (Index('states__state_changes',
                             'last_changed', 'last_updated', 'entity_id'),
                       Index('states__significant_changes',
-                            'domain', 'last_updated', 'entity_id'), )
+                            'domain', 'last_updated', 'entity_id'),
+                      # Latest state of an entity before a point in time
+                      Index('ix_states_entity_id_last_updated',
+                            'entity_id', 'last_updated'), )
+
+    state_attributes = relationship(StateAttributes, lazy='joined')
 
     @staticmethod
     def from_event(event):
-        """Create object from a state_changed event."""
+        """Create object from a state_changed event.
+
+        The attributes are stored separately, see StateAttributes.
+        """
         entity_id = event.data['entity_id']
         state = event.data.get('new_state')
 
@@ -86,14 +148,11 @@ class States(Base):   # type: ignore
         if state is None:
             dbstate.state = ''
             dbstate.domain = split_entity_id(entity_id)[0]
-            dbstate.attributes = '{}'
             dbstate.last_changed = event.time_fired
             dbstate.last_updated = event.time_fired
         else:
             dbstate.domain = state.domain
             dbstate.state = state.state
-            dbstate.attributes = json.dumps(dict(state.attributes),
-                                            cls=JSONEncoder)
             dbstate.last_changed = state.last_changed
             dbstate.last_updated = state.last_updated
 
@@ -101,10 +160,17 @@ class States(Base):   # type: ignore
 
     def to_native(self):
         """Convert to an HA state object."""
+        if self.attributes is not None:
+            attributes = self.attributes
+        elif self.state_attributes is not None:
+            attributes = self.state_attributes.shared_attrs
+        else:
+            attributes = '{}'
+
         try:
             return State(
                 self.entity_id, self.state,
-                json.loads(self.attributes),
+                json.loads(attributes),
                 _process_timestamp(self.last_changed),
                 _process_timestamp(self.last_updated)
             )
@@ -5,9 +5,11 @@ For more details about this platform, please refer to the documentation at
 https://home-assistant.io/components/sensor.history_stats/
 """
 
+from collections import deque
 import datetime
 import logging
 import math
+import threading
 
 import voluptuous as vol
 
@@ -17,6 +19,7 @@ import homeassistant.util.dt as dt_util
 from homeassistant.components.sensor import PLATFORM_SCHEMA
 from homeassistant.const import (
     CONF_NAME, CONF_ENTITY_ID, CONF_STATE, EVENT_HOMEASSISTANT_START)
+from homeassistant.core import callback
 from homeassistant.exceptions import TemplateError
 from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.event import track_state_change
@@ -105,15 +108,33 @@ class HistoryStatsSensor(Entity):
         self._period = (datetime.datetime.now(), datetime.datetime.now())
         self.value = 0
 
+        # Running totals, see update. Changes are added from the event loop.
+        self._lock = threading.Lock()
+        # [timestamp, in entity_state] of the changes since the start of the
+        # period, the first one being the state at the start.
+        self._changes = deque()
+        # Seconds spent in entity_state between the changes
+        self._elapsed = 0
+        self._counted_period = None
+
         def force_refresh(*args):
             """Force the component to refresh."""
             self.schedule_update_ha_state(True)
 
+        @callback
+        def state_changed(entity_id, old_state, new_state):
+            """Count the change and refresh."""
+            if new_state is not None:
+                self._add_change(dt_util.as_timestamp(new_state.last_changed),
+                                 new_state.state == self._entity_state)
+            if self.hass is not None:
+                self.hass.async_add_job(self.async_update_ha_state(True))
+
         # Update value when home assistant starts
         hass.bus.listen_once(EVENT_HOMEASSISTANT_START, force_refresh)
 
         # Update value when tracked entity changes its state
-        track_state_change(hass, entity_id, force_refresh)
+        track_state_change(hass, entity_id, state_changed)
 
     @property
     def name(self):
@@ -153,42 +174,117 @@ class HistoryStatsSensor(Entity):
         return ICON
 
     def update(self):
-        """Get the latest data and updates the states."""
+        """Get the latest data and updates the states.
+
+        The history is only queried at startup or when the period jumps.
+        Otherwise the totals are moved along with the start of the period.
+        """
         # Parse templates
         self.update_period()
         start, end = self._period
 
-        # Convert to UTC
-        start = dt_util.as_utc(start)
-        end = dt_util.as_utc(end)
+        start = dt_util.as_timestamp(start)
+        end = dt_util.as_timestamp(end)
+
+        with self._lock:
+            counted = self._counted_period
+            jumped = (counted is None or start < counted[0] or
+                      start > counted[1])
+            if not jumped:
+                self._expire_changes(start)
+                self._counted_period = start, end
+
+        if jumped and not self._load_changes(start, end):
+            return
+
+        with self._lock:
+            elapsed = self._elapsed_until(
+                min(end, dt_util.as_timestamp(dt_util.utcnow())))
+
+        # Save value in hours
+        self.value = elapsed / 3600
+
+    def _load_changes(self, start, end):
+        """Count the changes in the period from the history."""
+        utc_start = dt_util.utc_from_timestamp(start)
+        utc_end = dt_util.utc_from_timestamp(end)
 
         # Get history between start and end
         history_list = history.state_changes_during_period(
-            start, end, str(self._entity_id))
+            utc_start, utc_end, str(self._entity_id))
 
         if self._entity_id not in history_list.keys():
-            return
+            return False
 
         # Get the first state
-        last_state = history.get_state(start, self._entity_id)
-        last_state = (last_state is not None and
-                      last_state == self._entity_state)
-        last_time = dt_util.as_timestamp(start)
+        first_state = history.get_state(utc_start, self._entity_id)
+        changes = deque(([start, first_state is not None and
+                          first_state.state == self._entity_state], ))
         elapsed = 0
 
-        # Make calculations
         for item in history_list.get(self._entity_id):
-            current_state = item.state == self._entity_state
-            current_time = item.last_changed.timestamp()
-
-            if last_state:
-                elapsed += current_time - last_time
+            current_time = dt_util.as_timestamp(item.last_changed)
+            if changes[-1][1]:
+                elapsed += current_time - changes[-1][0]
+            changes.append(
+                [current_time, item.state == self._entity_state])
+
+        with self._lock:
+            # Keep changes that were added while the history was read
+            for change in self._changes:
+                if change[0] > changes[-1][0]:
+                    if changes[-1][1]:
+                        elapsed += change[0] - changes[-1][0]
+                    changes.append(change)
+            self._changes = changes
+            self._elapsed = elapsed
+            self._counted_period = start, end
 
-            last_state = current_state
-            last_time = current_time
+        return True
 
-        # Save value in hours
-        self.value = elapsed / 3600
+    def _add_change(self, timestamp, active):
+        """Add a change of the tracked entity to the totals."""
+        with self._lock:
+            if self._changes:
+                last = self._changes[-1]
+                if timestamp <= last[0]:
+                    return
+                if last[1]:
+                    self._elapsed += timestamp - last[0]
+            self._changes.append([timestamp, active])
+
+    def _expire_changes(self, start):
+        """Subtract the time before start from the totals."""
+        changes = self._changes
+        while len(changes) > 1 and changes[1][0] <= start:
+            if changes[0][1]:
+                self._elapsed -= changes[1][0] - changes[0][0]
+            changes.popleft()
+
+        if changes and changes[0][0] < start:
+            if changes[0][1] and len(changes) > 1:
+                self._elapsed -= start - changes[0][0]
+            changes[0][0] = start
+
+    def _elapsed_until(self, end):
+        """Return the seconds spent in entity_state until end."""
+        elapsed = self._elapsed
+        changes = self._changes
+        if not changes:
+            return 0
+
+        # The current state counts up to the end of the period
+        if changes[-1][1] and changes[-1][0] < end:
+            elapsed += end - changes[-1][0]
+
+        # Changes after the end of the period do not count
+        idx = len(changes) - 1
+        while idx > 0 and changes[idx][0] > end:
+            if changes[idx - 1][1]:
+                elapsed -= changes[idx][0] - max(changes[idx - 1][0], end)
+            idx -= 1
+
+        return elapsed
 
     def update_period(self):
         """Parse the templates and store a datetime tuple in _period."""
@@ -37,6 +37,8 @@ def async_setup_platform(hass, config, async_add_devices, discovery_info=None):
     value_template = config.get(CONF_VALUE_TEMPLATE)
     if value_template is not None:
         value_template.hass = hass
+        # Sensors often receive the same payload over and over
+        value_template.memoize = True
 
     yield from async_add_devices([MqttSensor(
         config.get(CONF_NAME),
@@ -5,9 +5,10 @@ For more details about this platform, please refer to the documentation at
 https://home-assistant.io/components/sensor.statistics/
 """
 import asyncio
+import bisect
+import heapq
 import logging
-import statistics
-from collections import deque
+from collections import Counter, deque
 
 import voluptuous as vol
 
@@ -17,7 +18,9 @@ from homeassistant.const import (
     CONF_NAME, CONF_ENTITY_ID, STATE_UNKNOWN, ATTR_UNIT_OF_MEASUREMENT)
 from homeassistant.core import callback
 from homeassistant.helpers.entity import Entity
-from homeassistant.helpers.event import async_track_state_change
+from homeassistant.helpers.event import (
+    async_track_point_in_utc_time, async_track_state_change)
+import homeassistant.util.dt as dt_util
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -32,14 +35,20 @@ ATTR_SAMPLING_SIZE = 'sampling_size'
 ATTR_TOTAL = 'total'
 
 CONF_SAMPLING_SIZE = 'sampling_size'
+CONF_MAX_AGE = 'max_age'
 DEFAULT_NAME = 'Stats'
 DEFAULT_SIZE = 20
 ICON = 'mdi:calculator'
 
+# Values kept for an exact median before it is estimated
+STREAM_BUFFER_SIZE = 1000
+
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend({
     vol.Required(CONF_ENTITY_ID): cv.entity_id,
     vol.Optional(CONF_NAME, default=DEFAULT_NAME): cv.string,
     vol.Optional(CONF_SAMPLING_SIZE, default=DEFAULT_SIZE): cv.positive_int,
+    vol.Optional(CONF_MAX_AGE):
+        vol.All(cv.time_period, cv.positive_timedelta),
 })
 
 
@@ -49,16 +58,18 @@ def async_setup_platform(hass, config, async_add_devices, discovery_info=None):
     entity_id = config.get(CONF_ENTITY_ID)
     name = config.get(CONF_NAME)
     sampling_size = config.get(CONF_SAMPLING_SIZE)
+    max_age = config.get(CONF_MAX_AGE)
 
     yield from async_add_devices(
-        [StatisticsSensor(hass, entity_id, name, sampling_size)], True)
+        [StatisticsSensor(hass, entity_id, name, sampling_size, max_age)],
+        True)
     return True
 
 
 class StatisticsSensor(Entity):
     """Representation of a Statistics sensor."""
 
-    def __init__(self, hass, entity_id, name, sampling_size):
+    def __init__(self, hass, entity_id, name, sampling_size, max_age=None):
         """Initialize the Statistics sensor."""
         self._hass = hass
         self._entity_id = entity_id
@@ -69,11 +80,13 @@ class StatisticsSensor(Entity):
         else:
             self._name = '{} {}'.format(name, ATTR_COUNT)
         self._sampling_size = sampling_size
+        self._max_age = max_age
         self._unit_of_measurement = None
-        if self._sampling_size == 0:
-            self.states = deque()
+        self._remove_expiry_listener = None
+        if self._sampling_size == 0 and self._max_age is None:
+            self.states = StreamStatistics()
         else:
-            self.states = deque(maxlen=self._sampling_size)
+            self.states = WindowStatistics(self._sampling_size, self._max_age)
         self.median = self.mean = self.variance = self.stdev = 0
         self.min = self.max = self.total = self.count = 0
 
@@ -85,7 +98,8 @@ class StatisticsSensor(Entity):
                 ATTR_UNIT_OF_MEASUREMENT)
 
             try:
-                self.states.append(float(new_state.state))
+                self.states.add(float(new_state.state),
+                                new_state.last_updated)
                 self.count = self.count + 1
             except ValueError:
                 self.count = self.count + 1
@@ -125,7 +139,7 @@ class StatisticsSensor(Entity):
                 ATTR_MAX_VALUE: self.max,
                 ATTR_MEDIAN: self.median,
                 ATTR_MIN_VALUE: self.min,
-                ATTR_SAMPLING_SIZE: 'unlimited' if self._sampling_size is
+                ATTR_SAMPLING_SIZE: 'unlimited' if self._sampling_size ==
                                     0 else self._sampling_size,
                 ATTR_STANDARD_DEVIATION: self.stdev,
                 ATTR_TOTAL: self.total,
@@ -140,19 +154,378 @@ class StatisticsSensor(Entity):
     @asyncio.coroutine
     def async_update(self):
         """Get the latest data and updates the states."""
-        if not self.is_binary:
-            try:
-                self.mean = round(statistics.mean(self.states), 2)
-                self.median = round(statistics.median(self.states), 2)
-                self.stdev = round(statistics.stdev(self.states), 2)
-                self.variance = round(statistics.variance(self.states), 2)
-            except statistics.StatisticsError as err:
-                _LOGGER.warning(err)
-                self.mean = self.median = STATE_UNKNOWN
-                self.stdev = self.variance = STATE_UNKNOWN
-            if self.states:
-                self.total = round(sum(self.states), 2)
-                self.min = min(self.states)
-                self.max = max(self.states)
-            else:
-                self.min = self.max = self.total = STATE_UNKNOWN
+        if self.is_binary:
+            return
+
+        self.states.expire(dt_util.utcnow())
+        self._async_track_expiry()
+
+        if self.states.count < 2:
+            _LOGGER.warning("Statistics need at least two data points, "
+                            "%s has %s", self._entity_id, self.states.count)
+            self.mean = self.median = STATE_UNKNOWN
+            self.stdev = self.variance = STATE_UNKNOWN
+        else:
+            self.mean = round(self.states.mean, 2)
+            self.median = round(self.states.median, 2)
+            self.stdev = round(self.states.variance ** 0.5, 2)
+            self.variance = round(self.states.variance, 2)
+
+        if self.states.count:
+            self.total = round(self.states.total, 2)
+            self.min = self.states.min
+            self.max = self.states.max
+        else:
+            self.min = self.max = self.total = STATE_UNKNOWN
+
+    @callback
+    def _async_track_expiry(self):
+        """Update the sensor when the oldest value is too old."""
+        if self._remove_expiry_listener is not None:
+            self._remove_expiry_listener()
+            self._remove_expiry_listener = None
+
+        if self._max_age is None or not self.states.count:
+            return
+
+        @callback
+        def async_expire(now):
+            """Drop the expired values."""
+            self._remove_expiry_listener = None
+            self.hass.async_add_job(self.async_update_ha_state, True)
+
+        self._remove_expiry_listener = async_track_point_in_utc_time(
+            self.hass, async_expire, self.states.oldest + self._max_age)
+
+
+class WindowStatistics(object):
+    """Statistics of the last values, updated in constant time.
+
+    The window holds at most max_size values (if set) that are not older
+    than max_age (if set). Mean and variance are kept with Welford's
+    algorithm, the median with two heaps and min and max with monotonic
+    queues. Values leave the window in the order they were added.
+    """
+
+    def __init__(self, max_size=None, max_age=None):
+        """Initialize the window."""
+        self.max_size = max_size or None
+        self.max_age = max_age
+        self._window = deque()
+        self._index = 0
+        self._removed = 0
+        self._reset()
+
+    def _reset(self):
+        """Clear the running values."""
+        self._mean = self._m2 = self.total = 0.0
+        self._median = SlidingMedian()
+        self._minimum = deque()
+        self._maximum = deque()
+
+    @property
+    def count(self):
+        """Return the number of values in the window."""
+        return len(self._window)
+
+    @property
+    def oldest(self):
+        """Return the time the oldest value was added."""
+        return self._window[0][1]
+
+    @property
+    def mean(self):
+        """Return the mean of the values."""
+        return self._mean
+
+    @property
+    def variance(self):
+        """Return the sample variance of the values."""
+        return max(self._m2, 0.0) / (len(self._window) - 1)
+
+    @property
+    def median(self):
+        """Return the median of the values."""
+        return self._median.median
+
+    @property
+    def min(self):
+        """Return the smallest value."""
+        return self._minimum[0][1]
+
+    @property
+    def max(self):
+        """Return the largest value."""
+        return self._maximum[0][1]
+
+    def add(self, value, time):
+        """Add a value to the window."""
+        self._window.append((self._index, time, value))
+        self._add(self._index, value)
+        self._index += 1
+
+        if self.max_size is not None and len(self._window) > self.max_size:
+            self._remove_oldest()
+
+    def expire(self, now):
+        """Remove the values that are older than max_age."""
+        if self.max_age is None:
+            return
+
+        expired = now - self.max_age
+        while self._window and self._window[0][1] <= expired:
+            self._remove_oldest()
+
+    def _add(self, index, value):
+        """Add a value to the running statistics."""
+        count = len(self._window)
+        delta = value - self._mean
+        self._mean += delta / count
+        self._m2 += delta * (value - self._mean)
+        self.total += value
+        self._median.add(value)
+
+        while self._minimum and self._minimum[-1][1] >= value:
+            self._minimum.pop()
+        self._minimum.append((index, value))
+        while self._maximum and self._maximum[-1][1] <= value:
+            self._maximum.pop()
+        self._maximum.append((index, value))
+
+    def _remove_oldest(self):
+        """Remove the oldest value from the window."""
+        index, _, value = self._window.popleft()
+        count = len(self._window)
+        if count:
+            delta = value - self._mean
+            self._mean -= delta / count
+            self._m2 -= delta * (value - self._mean)
+        else:
+            self._mean = self._m2 = 0.0
+        self.total -= value
+        self._median.remove(value)
+
+        if self._minimum[0][0] == index:
+            self._minimum.popleft()
+        if self._maximum[0][0] == index:
+            self._maximum.popleft()
+
+        # Removing values adds rounding errors and leaves stale heap
+        # entries. Recalculating once per window size keeps this O(1).
+        self._removed += 1
+        if self._removed > max(count, 16):
+            self._rebuild()
+
+    def _rebuild(self):
+        """Recalculate the running statistics from the window."""
+        window = self._window
+        self._window = deque()
+        self._removed = 0
+        self._reset()
+        for item in window:
+            self._window.append(item)
+            self._add(item[0], item[2])
+
+
+class StreamStatistics(object):
+    """Statistics of all values, in constant memory.
+
+    Values are never removed. After the first STREAM_BUFFER_SIZE values
+    the median is estimated with the P-square algorithm, which tracks it
+    with five markers instead of the values.
+    """
+
+    def __init__(self):
+        """Initialize the statistics."""
+        self.count = 0
+        self.total = self.mean = self._m2 = 0.0
+        self.min = self.max = None
+        self._median = P2Quantile(0.5, STREAM_BUFFER_SIZE)
+
+    @property
+    def variance(self):
+        """Return the sample variance of the values."""
+        return max(self._m2, 0.0) / (self.count - 1)
+
+    @property
+    def median(self):
+        """Return the estimated median of the values."""
+        return self._median.value
+
+    def add(self, value, time):
+        """Add a value."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self._median.add(value)
+
+    def expire(self, now):
+        """Values do not expire."""
+        pass
+
+
+class SlidingMedian(object):
+    """Median of values that can be added and removed in O(log n).
+
+    The lower half of the values is kept in a max heap and the upper half
+    in a min heap. Removed values stay in the heaps until they reach the
+    top.
+    """
+
+    def __init__(self):
+        """Initialize the heaps."""
+        self._low = []
+        self._high = []
+        self._low_size = self._high_size = 0
+        self._removed = Counter()
+
+    @property
+    def median(self):
+        """Return the median."""
+        if self._low_size > self._high_size:
+            return -self._low[0]
+        return (self._high[0] - self._low[0]) / 2
+
+    def add(self, value):
+        """Add a value."""
+        if not self._low or value <= -self._low[0]:
+            heapq.heappush(self._low, -value)
+            self._low_size += 1
+        else:
+            heapq.heappush(self._high, value)
+            self._high_size += 1
+        self._balance()
+
+    def remove(self, value):
+        """Remove a value that was added before."""
+        self._removed[value] += 1
+        if value <= -self._low[0]:
+            self._low_size -= 1
+            if value == -self._low[0]:
+                self._prune(self._low, -1)
+        else:
+            self._high_size -= 1
+            if value == self._high[0]:
+                self._prune(self._high, 1)
+        self._balance()
+
+    def _balance(self):
+        """Keep the lower half as large as or one larger than the upper."""
+        if self._low_size > self._high_size + 1:
+            heapq.heappush(self._high, -heapq.heappop(self._low))
+            self._low_size -= 1
+            self._high_size += 1
+            self._prune(self._low, -1)
+        elif self._low_size < self._high_size:
+            heapq.heappush(self._low, -heapq.heappop(self._high))
+            self._high_size -= 1
+            self._low_size += 1
+            self._prune(self._high, 1)
+
+    def _prune(self, heap, sign):
+        """Pop removed values from the top of a heap."""
+        while heap and self._removed[sign * heap[0]]:
+            value = sign * heapq.heappop(heap)
+            self._removed[value] -= 1
+            if not self._removed[value]:
+                del self._removed[value]
+
+
+class P2Quantile(object):
+    """Estimate a quantile with the P-square algorithm of Jain and Chlamtac.
+
+    The first buffer_size values are kept and give the exact quantile.
+    After that five markers track the minimum, the quantile, the maximum
+    and the points halfway between. Their heights are adjusted with a
+    parabolic formula as values come in.
+    """
+
+    def __init__(self, quantile, buffer_size=5):
+        """Initialize the markers."""
+        self._quantile = quantile
+        self._buffer = []
+        self._buffer_size = max(buffer_size, 5)
+        self._heights = None
+        self._positions = None
+        self._desired = None
+        self._increments = [0, quantile / 2, quantile, (1 + quantile) / 2, 1]
+
+    @property
+    def value(self):
+        """Return the quantile."""
+        if self._heights is not None:
+            return self._heights[2]
+
+        buffer = self._buffer
+        rank = self._quantile * (len(buffer) - 1)
+        low = int(rank)
+        high = min(low + 1, len(buffer) - 1)
+        return buffer[low] + (buffer[high] - buffer[low]) * (rank - low)
+
+    def add(self, value):
+        """Add a value."""
+        if self._heights is None:
+            bisect.insort(self._buffer, value)
+            if len(self._buffer) == self._buffer_size:
+                self._start_markers()
+            return
+
+        heights = self._heights
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = 0
+            while value >= heights[cell + 1]:
+                cell += 1
+
+        positions = self._positions
+        for idx in range(cell + 1, 5):
+            positions[idx] += 1
+        for idx in range(5):
+            self._desired[idx] += self._increments[idx]
+
+        for idx in range(1, 4):
+            offset = self._desired[idx] - positions[idx]
+            if ((offset >= 1 and positions[idx + 1] - positions[idx] > 1) or
+                    (offset <= -1 and
+                     positions[idx - 1] - positions[idx] < -1)):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(idx, step)
+                if not heights[idx - 1] < height < heights[idx + 1]:
+                    height = heights[idx] + step * (
+                        (heights[idx + step] - heights[idx]) /
+                        (positions[idx + step] - positions[idx]))
+                heights[idx] = height
+                positions[idx] += step
+
+    def _start_markers(self):
+        """Place the markers on the buffered values."""
+        buffer = self._buffer
+        last = len(buffer) - 1
+        self._desired = [1 + last * increment
+                         for increment in self._increments]
+        self._positions = [int(round(desired)) for desired in self._desired]
+        self._heights = [buffer[position - 1]
+                         for position in self._positions]
+        self._buffer = []
+
+    def _parabolic(self, idx, step):
+        """Return the adjusted height of a marker."""
+        heights = self._heights
+        positions = self._positions
+        return heights[idx] + step / (
+            positions[idx + 1] - positions[idx - 1]) * (
+                (positions[idx] - positions[idx - 1] + step) *
+                (heights[idx + 1] - heights[idx]) /
+                (positions[idx + 1] - positions[idx]) +
+                (positions[idx + 1] - positions[idx] - step) *
+                (heights[idx] - heights[idx - 1]) /
+                (positions[idx] - positions[idx - 1]))
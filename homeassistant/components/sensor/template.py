@@ -16,7 +16,8 @@ from homeassistant.const import (
     ATTR_ENTITY_ID, CONF_SENSORS)
 from homeassistant.exceptions import TemplateError
 from homeassistant.helpers.entity import Entity, async_generate_entity_id
-from homeassistant.helpers.event import async_track_state_change
+from homeassistant.helpers.event import (
+    async_track_state_change, async_track_template_states)
 import homeassistant.helpers.config_validation as cv
 
 _LOGGER = logging.getLogger(__name__)
@@ -45,8 +46,7 @@ def async_setup_platform(hass, config, async_add_devices, discovery_info=None):
     for device, device_config in config[CONF_SENSORS].items():
         state_template = device_config[CONF_VALUE_TEMPLATE]
         icon_template = device_config.get(CONF_ICON_TEMPLATE)
-        entity_ids = (device_config.get(ATTR_ENTITY_ID) or
-                      state_template.extract_entities())
+        entity_ids = device_config.get(ATTR_ENTITY_ID)
         friendly_name = device_config.get(ATTR_FRIENDLY_NAME, device)
         unit_of_measurement = device_config.get(ATTR_UNIT_OF_MEASUREMENT)
 
@@ -88,14 +88,20 @@ class SensorTemplate(Entity):
         self._state = None
         self._icon_template = icon_template
         self._icon = None
+        self._tracker = None
 
         @callback
         def template_sensor_state_listener(entity, old_state, new_state):
             """Called when the target device changes state."""
             hass.async_add_job(self.async_update_ha_state, True)
 
-        async_track_state_change(
-            hass, entity_ids, template_sensor_state_listener)
+        if entity_ids is None:
+            self._tracker = async_track_template_states(
+                hass, (state_template, icon_template),
+                template_sensor_state_listener)
+        else:
+            async_track_state_change(
+                hass, entity_ids, template_sensor_state_listener)
 
     @property
     def name(self):
@@ -125,6 +131,14 @@ class SensorTemplate(Entity):
     @asyncio.coroutine
     def async_update(self):
         """Update the state from the template."""
+        self._async_render()
+
+        if self._tracker is not None:
+            self._tracker.async_refresh()
+
+    @callback
+    def _async_render(self):
+        """Render the state and icon templates."""
         try:
             self._state = self._template.async_render()
         except TemplateError as ex:
@@ -6,14 +6,17 @@ https://home-assistant.io/components/zone/
 """
 import asyncio
 import logging
+import math
 
 import voluptuous as vol
 
 from homeassistant.const import (
     ATTR_HIDDEN, ATTR_LATITUDE, ATTR_LONGITUDE, CONF_NAME, CONF_LATITUDE,
     CONF_LONGITUDE, CONF_ICON)
+from homeassistant.core import callback
 from homeassistant.helpers import config_per_platform
 from homeassistant.helpers.entity import Entity, async_generate_entity_id
+from homeassistant.helpers.event import async_track_domain_state_change
 from homeassistant.util.async import run_callback_threadsafe
 from homeassistant.util.location import distance
 import homeassistant.helpers.config_validation as cv
@@ -31,6 +34,16 @@ DEFAULT_PASSIVE = False
 DEFAULT_RADIUS = 100
 DOMAIN = 'zone'
 
+DATA_ZONE_INDEX = 'zone_index'
+
+# Size in degrees of the cells of the zone index
+GRID_SIZE = 0.1
+# Circles covering more cells than this are checked on every lookup
+MAX_GRID_CELLS = 400
+# Lower bound of the length of a degree of latitude, a degree of longitude
+# is at least this times the cosine of the latitude
+METERS_PER_DEGREE = 110000
+
 ENTITY_ID_FORMAT = 'zone.{}'
 ENTITY_ID_HOME = ENTITY_ID_FORMAT.format('home')
 
@@ -62,32 +75,153 @@ def async_active_zone(hass, latitude, longitude, radius=0):
 
     This method must be run in the event loop.
     """
-    # Sort entity IDs so that we are deterministic if equal distance to 2 zones
-    zones = (hass.states.get(entity_id) for entity_id
-             in sorted(hass.states.async_entity_ids(DOMAIN)))
+    return _async_get_index(hass).async_active_zone(
+        latitude, longitude, radius)
+
+
+def active_zones(hass, coordinates):
+    """Find the active zones for a list of coordinates."""
+    return run_callback_threadsafe(
+        hass.loop, async_active_zones, hass, coordinates).result()
+
+
+def async_active_zones(hass, coordinates):
+    """Find the active zones for a list of coordinates.
+
+    Coordinates are (latitude, longitude) or (latitude, longitude, radius)
+    tuples. Returns the active zone or None for each of them.
+
+    This method must be run in the event loop.
+    """
+    index = _async_get_index(hass)
+    found = {}
+    zones = []
+
+    for coordinate in coordinates:
+        # Devices at the same place share the lookup
+        if coordinate not in found:
+            found[coordinate] = index.async_active_zone(*coordinate)
+        zones.append(found[coordinate])
+
+    return zones
+
 
-    min_dist = None
-    closest = None
+def _async_get_index(hass):
+    """Return the zone index, creating it if needed."""
+    index = hass.data.get(DATA_ZONE_INDEX)
+    if index is None:
+        index = hass.data[DATA_ZONE_INDEX] = ZoneIndex(hass)
+    return index
 
-    for zone in zones:
-        if zone.attributes.get(ATTR_PASSIVE):
-            continue
 
-        zone_dist = distance(
-            latitude, longitude,
-            zone.attributes[ATTR_LATITUDE], zone.attributes[ATTR_LONGITUDE])
+def _cell_ranges(latitude, longitude, radius):
+    """Return the grid cell ranges covering a circle, None if too many."""
+    lat_span = radius / METERS_PER_DEGREE
+    max_lat = abs(latitude) + lat_span
+    if max_lat >= 90:
+        return None
 
-        within_zone = zone_dist - radius < zone.attributes[ATTR_RADIUS]
-        closer_zone = closest is None or zone_dist < min_dist
-        smaller_zone = (zone_dist == min_dist and
-                        zone.attributes[ATTR_RADIUS] <
-                        closest.attributes[ATTR_RADIUS])
+    lon_span = lat_span / math.cos(math.radians(max_lat))
+    lat_cells = range(math.floor((latitude - lat_span) / GRID_SIZE),
+                      math.floor((latitude + lat_span) / GRID_SIZE) + 1)
+    lon_cells = range(math.floor((longitude - lon_span) / GRID_SIZE),
+                      math.floor((longitude + lon_span) / GRID_SIZE) + 1)
 
-        if within_zone and (closer_zone or smaller_zone):
-            min_dist = zone_dist
-            closest = zone
+    if len(lat_cells) * len(lon_cells) > MAX_GRID_CELLS:
+        return None
+    return lat_cells, lon_cells
+
+
+class ZoneIndex(object):
+    """Grid of the cells the active zones cover.
+
+    A lookup only measures the distance to the zones that share a cell
+    with the circle of the lookup. The grid is rebuilt after a zone
+    changed.
+    """
 
-    return closest
+    def __init__(self, hass):
+        """Initialize the index."""
+        self._hass = hass
+        self._zones = None
+        self._grid = None
+        self._everywhere = None
+
+        async_track_domain_state_change(hass, DOMAIN, self._async_invalidate)
+
+    @callback
+    def _async_invalidate(self, entity_id, old_state, new_state):
+        """Rebuild the grid on the next lookup."""
+        self._zones = None
+
+    @callback
+    def _async_build(self):
+        """Build the grid from the active zones."""
+        # Sorted by entity id so that we are deterministic if equal distance
+        # to 2 zones
+        self._zones = [zone for zone
+                       in self._hass.states.async_domain_states(DOMAIN)
+                       if not zone.attributes.get(ATTR_PASSIVE)]
+        self._grid = {}
+        self._everywhere = []
+        lon_cell_count = round(360 / GRID_SIZE)
+
+        for position, zone in enumerate(self._zones):
+            cells = _cell_ranges(zone.attributes[ATTR_LATITUDE],
+                                 zone.attributes[ATTR_LONGITUDE],
+                                 max(zone.attributes[ATTR_RADIUS], 0))
+            if cells is None:
+                self._everywhere.append(position)
+                continue
+
+            for lat_cell in cells[0]:
+                for lon_cell in cells[1]:
+                    self._grid.setdefault(
+                        (lat_cell, lon_cell % lon_cell_count),
+                        []).append(position)
+
+    @callback
+    def async_candidates(self, latitude, longitude, radius=0):
+        """Return the zones that may be active for a circle, in order."""
+        if self._zones is None:
+            self._async_build()
+
+        cells = _cell_ranges(latitude, longitude, max(radius, 0))
+        if cells is None:
+            return self._zones
+
+        positions = set(self._everywhere)
+        lon_cell_count = round(360 / GRID_SIZE)
+        for lat_cell in cells[0]:
+            for lon_cell in cells[1]:
+                positions.update(self._grid.get(
+                    (lat_cell, lon_cell % lon_cell_count), ()))
+
+        return [self._zones[position] for position in sorted(positions)]
+
+    @callback
+    def async_active_zone(self, latitude, longitude, radius=0):
+        """Find the active zone for given latitude, longitude."""
+        min_dist = None
+        closest = None
+
+        for zone in self.async_candidates(latitude, longitude, radius):
+            zone_dist = distance(
+                latitude, longitude,
+                zone.attributes[ATTR_LATITUDE],
+                zone.attributes[ATTR_LONGITUDE])
+
+            within_zone = zone_dist - radius < zone.attributes[ATTR_RADIUS]
+            closer_zone = closest is None or zone_dist < min_dist
+            smaller_zone = (zone_dist == min_dist and
+                            zone.attributes[ATTR_RADIUS] <
+                            closest.attributes[ATTR_RADIUS])
+
+            if within_zone and (closer_zone or smaller_zone):
+                min_dist = zone_dist
+                closest = zone
+
+        return closest
 
 
 def in_zone(zone, latitude, longitude, radius=0):
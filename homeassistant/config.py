@@ -19,7 +19,8 @@ from homeassistant.const import (
 from homeassistant.core import DOMAIN as CONF_CORE
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.loader import get_component
-from homeassistant.util.yaml import load_yaml
+from homeassistant.util.yaml import (
+    load_yaml, load_node_cache, save_node_cache)
 import homeassistant.helpers.config_validation as cv
 from homeassistant.util import dt as date_util, location as loc_util
 from homeassistant.util.unit_system import IMPERIAL_SYSTEM, METRIC_SYSTEM
@@ -29,6 +30,7 @@ _LOGGER = logging.getLogger(__name__)
 
 YAML_CONFIG_FILE = 'configuration.yaml'
 VERSION_FILE = '.HA_VERSION'
+YAML_CACHE_FILE = '.yaml_cache'
 CONFIG_DIR_NAME = '.homeassistant'
 DATA_CUSTOMIZE = 'hass_customize'
 
@@ -213,7 +215,7 @@ def async_hass_config_yaml(hass):
     """
     def _load_hass_yaml_config():
         path = find_config_file(hass.config.config_dir)
-        conf = load_yaml_config_file(path)
+        conf = load_hass_config_file(path, hass.config.config_dir)
         return conf
 
     conf = yield from hass.loop.run_in_executor(None, _load_hass_yaml_config)
@@ -230,6 +232,21 @@ def find_config_file(config_dir):
     return config_path if os.path.isfile(config_path) else None
 
 
+def load_hass_config_file(config_path, config_dir):
+    """Parse the configuration file of Home Assistant.
+
+    Files of the config dir that did not change since they were last parsed
+    are loaded from a cache stored in the config dir.
+
+    This method needs to run in an executor.
+    """
+    load_node_cache(os.path.join(config_dir, YAML_CACHE_FILE), config_dir)
+    try:
+        return load_yaml_config_file(config_path)
+    finally:
+        save_node_cache()
+
+
 def load_yaml_config_file(config_path):
     """Parse a YAML configuration file.
 
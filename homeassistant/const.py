@@ -359,6 +359,9 @@ URL_API_COMPONENTS = '/api/components'
 URL_API_ERROR_LOG = '/api/error_log'
 URL_API_LOG_OUT = '/api/log_out'
 URL_API_TEMPLATE = '/api/template'
+URL_API_TEMPLATE_STATS = '/api/template_stats'
+URL_API_STARTUP_PROFILE = '/api/startup_profile'
+URL_API_RECORDER_QUEUE = '/api/recorder_queue'
 
 HTTP_OK = 200
 HTTP_CREATED = 201
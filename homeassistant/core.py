@@ -6,6 +6,7 @@ of entities and react to changes.
 """
 # pylint: disable=unused-import, too-many-lines
 import asyncio
+import bisect
 from concurrent.futures import ThreadPoolExecutor
 import enum
 import logging
@@ -79,6 +80,21 @@ def is_callback(func: Callable[..., Any]) -> bool:
     return '_hass_callback' in func.__dict__
 
 
+# Ways a bus listener can be scheduled, resolved once per listener.
+JOB_CALLBACK = 'callback'
+JOB_COROUTINE = 'coroutine'
+JOB_EXECUTOR = 'executor'
+
+
+def classify_job(target: Callable[..., Any]) -> str:
+    """Return how target should be scheduled by the event loop."""
+    if is_callback(target):
+        return JOB_CALLBACK
+    elif asyncio.iscoroutinefunction(target):
+        return JOB_COROUTINE
+    return JOB_EXECUTOR
+
+
 @callback
 def async_loop_exception_handler(loop, context):
     """Handle all exception inside the core loop."""
@@ -355,6 +371,8 @@ class EventBus(object):
     def __init__(self, hass: HomeAssistant) -> None:
         """Initialize a new event bus."""
         self._listeners = {}
+        # event_type -> tuple of (job type, listener), built on first fire
+        self._dispatch = {}
         self._hass = hass
 
     @callback
@@ -389,22 +407,56 @@ class EventBus(object):
                 self._hass.state == CoreState.stopping:
             raise ShuttingDown("Home Assistant is shutting down")
 
-        listeners = self._listeners.get(event_type, [])
+        dispatch = self._dispatch.get(event_type)
 
-        # EVENT_HOMEASSISTANT_CLOSE should go only to his listeners
-        if event_type != EVENT_HOMEASSISTANT_CLOSE:
-            listeners = self._listeners.get(MATCH_ALL, []) + listeners
+        if dispatch is None:
+            dispatch = self._async_build_dispatch(event_type)
 
         event = Event(event_type, event_data, origin)
 
         if event_type != EVENT_TIME_CHANGED:
             _LOGGER.info("Bus:Handling %s", event)
 
-        if not listeners:
+        if not dispatch:
             return
 
-        for func in listeners:
-            self._hass.async_add_job(func, event)
+        call_soon = self._hass.loop.call_soon
+        add_job = self._hass.async_add_job
+
+        for job_type, func in dispatch:
+            if job_type is JOB_CALLBACK:
+                call_soon(func, event)
+            elif job_type is JOB_COROUTINE:
+                add_job(func(event))
+            else:
+                add_job(func, event)
+
+    @callback
+    def _async_build_dispatch(self, event_type):
+        """Build and cache the dispatch table for an event type.
+
+        This method must be run in the event loop.
+        """
+        listeners = self._listeners.get(event_type, [])
+
+        # EVENT_HOMEASSISTANT_CLOSE should go only to his listeners
+        if event_type != EVENT_HOMEASSISTANT_CLOSE:
+            listeners = self._listeners.get(MATCH_ALL, []) + listeners
+
+        dispatch = tuple((classify_job(func), func) for func in listeners)
+        self._dispatch[event_type] = dispatch
+        return dispatch
+
+    @callback
+    def _async_invalidate_dispatch(self, event_type):
+        """Drop cached dispatch tables affected by a listener change.
+
+        This method must be run in the event loop.
+        """
+        if event_type == MATCH_ALL:
+            self._dispatch.clear()
+        else:
+            self._dispatch.pop(event_type, None)
 
     def listen(self, event_type, listener):
         """Listen for all events or events of a specific type.
@@ -436,6 +488,8 @@ class EventBus(object):
         else:
             self._listeners[event_type] = [listener]
 
+        self._async_invalidate_dispatch(event_type)
+
         def remove_listener():
             """Remove the listener."""
             self._async_remove_listener(event_type, listener)
@@ -500,6 +554,8 @@ class EventBus(object):
             # delete event_type list if empty
             if not self._listeners[event_type]:
                 self._listeners.pop(event_type)
+
+            self._async_invalidate_dispatch(event_type)
         except (KeyError, ValueError):
             # KeyError is key event_type listener did not exist
             # ValueError if listener did not exist within event_type
@@ -612,6 +668,8 @@ class StateMachine(object):
     def __init__(self, bus, loop):
         """Initialize state machine."""
         self._states = {}
+        # domain -> sorted list of entity ids
+        self._domains = {}
         self._bus = bus
         self._loop = loop
 
@@ -631,10 +689,30 @@ class StateMachine(object):
         if domain_filter is None:
             return list(self._states.keys())
 
-        domain_filter = domain_filter.lower()
+        return list(self._domains.get(domain_filter.lower(), ()))
 
-        return [state.entity_id for state in self._states.values()
-                if state.domain == domain_filter]
+    def domain_states(self, domain=None):
+        """List of the states of a domain, sorted by entity id."""
+        return run_callback_threadsafe(
+            self._loop, self.async_domain_states, domain).result()
+
+    @callback
+    def async_domain_states(self, domain=None):
+        """List of the states of a domain, sorted by entity id.
+
+        Returns all states if domain is None.
+
+        This method must be run in the event loop.
+        """
+        if domain is None:
+            # Entity ids sort by domain first, so this is sorted as a whole
+            domains = sorted(self._domains)
+        else:
+            domains = (domain.lower(),)
+
+        states = self._states
+        return [states[entity_id] for domain in domains
+                for entity_id in self._domains.get(domain, ())]
 
     def all(self):
         """Create a list of all states."""
@@ -693,6 +771,8 @@ class StateMachine(object):
         if old_state is None:
             return False
 
+        self._remove_from_domain(old_state)
+
         self._bus.async_fire(EVENT_STATE_CHANGED, {
             'entity_id': entity_id,
             'old_state': old_state,
@@ -740,12 +820,28 @@ class StateMachine(object):
         last_changed = old_state.last_changed if same_state else None
         state = State(entity_id, new_state, attributes, last_changed)
         self._states[entity_id] = state
+
+        if not is_existing:
+            self._add_to_domain(state)
+
         self._bus.async_fire(EVENT_STATE_CHANGED, {
             'entity_id': entity_id,
             'old_state': old_state,
             'new_state': state,
         })
 
+    def _add_to_domain(self, state):
+        """Add the entity of a new state to the index of its domain."""
+        bisect.insort(
+            self._domains.setdefault(state.domain, []), state.entity_id)
+
+    def _remove_from_domain(self, state):
+        """Remove the entity of a removed state from its domain index."""
+        entity_ids = self._domains[state.domain]
+        del entity_ids[bisect.bisect_left(entity_ids, state.entity_id)]
+        if not entity_ids:
+            del self._domains[state.domain]
+
 
 class Service(object):
     """Represents a callable service."""
@@ -15,6 +15,7 @@ from homeassistant.helpers import config_per_platform, discovery
 from homeassistant.helpers.entity import async_generate_entity_id
 from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.service import extract_entity_ids
+from homeassistant.helpers.setup_profile import PHASE_SETUP, get_profile
 from homeassistant.util.async import (
     run_callback_threadsafe, run_coroutine_threadsafe)
 
@@ -138,21 +139,24 @@ class EntityComponent(object):
                 self, platform_type, scan_interval, entity_namespace)
         entity_platform = self._platforms[key]
 
+        platform_path = '{}.{}'.format(self.domain, platform_type)
+
         try:
-            self.logger.info("Setting up %s.%s", self.domain, platform_type)
-            if getattr(platform, 'async_setup_platform', None):
-                yield from platform.async_setup_platform(
-                    self.hass, platform_config,
-                    entity_platform.async_add_entities, discovery_info
-                )
-            else:
-                yield from self.hass.loop.run_in_executor(
-                    None, platform.setup_platform, self.hass, platform_config,
-                    entity_platform.add_entities, discovery_info
-                )
+            self.logger.info("Setting up %s", platform_path)
+            with get_profile(self.hass).timed(platform_path, PHASE_SETUP):
+                if getattr(platform, 'async_setup_platform', None):
+                    yield from platform.async_setup_platform(
+                        self.hass, platform_config,
+                        entity_platform.async_add_entities, discovery_info
+                    )
+                else:
+                    yield from self.hass.loop.run_in_executor(
+                        None, platform.setup_platform, self.hass,
+                        platform_config, entity_platform.add_entities,
+                        discovery_info
+                    )
 
-            self.hass.config.components.add(
-                '{}.{}'.format(self.domain, platform_type))
+            self.hass.config.components.add(platform_path)
         except Exception:  # pylint: disable=broad-except
             self.logger.exception(
                 'Error while setting up platform %s', platform_type)
@@ -1,13 +1,27 @@
 """Helpers for listening to events."""
 import functools as ft
-from datetime import timedelta
+import heapq
+import logging
+from datetime import datetime, timedelta
 
 from ..core import HomeAssistant, callback
 from ..const import (
     ATTR_NOW, EVENT_STATE_CHANGED, EVENT_TIME_CHANGED, MATCH_ALL)
+from ..exceptions import TemplateError
 from ..util import dt as dt_util
 from ..util.async import run_callback_threadsafe
 
+_LOGGER = logging.getLogger(__name__)
+
+DATA_STATE_CHANGE_INDEX = 'track_state_change_index'
+DATA_TIME_SCHEDULER = 'track_time_scheduler'
+
+# Give up looking for the next match of a time pattern after this many steps
+MAX_PATTERN_STEPS = 10000
+
+# Deadline of time patterns that will not match again unless the clock rewinds
+_FAR_FUTURE = dt_util.UTC.localize(datetime.max)
+
 # PyLint does not like the use of threaded_listener_factory
 # pylint: disable=invalid-name
 
@@ -60,10 +74,6 @@ def async_track_state_change(hass, entity_ids, action, from_state=None,
     @callback
     def state_change_listener(event):
         """The listener that listens for specific state changes."""
-        if entity_ids != MATCH_ALL and \
-           event.data.get('entity_id') not in entity_ids:
-            return
-
         if event.data.get('old_state') is not None:
             old_state = event.data['old_state'].state
         else:
@@ -79,12 +89,199 @@ def async_track_state_change(hass, entity_ids, action, from_state=None,
                                event.data.get('old_state'),
                                event.data.get('new_state'))
 
-    return hass.bus.async_listen(EVENT_STATE_CHANGED, state_change_listener)
+    return _async_get_state_change_index(hass).async_subscribe(
+        entity_ids, state_change_listener)
 
 
 track_state_change = threaded_listener_factory(async_track_state_change)
 
 
+@callback
+def async_track_domain_state_change(hass, domains, action):
+    """Track state changes of all entities of domains.
+
+    Returns a function that can be called to remove the listener.
+
+    Must be run within the event loop.
+    """
+    if isinstance(domains, str):
+        domains = (domains.lower(),)
+    else:
+        domains = tuple(domain.lower() for domain in domains)
+
+    @callback
+    def domain_change_listener(event):
+        """The listener that listens for state changes of the domains."""
+        hass.async_run_job(action, event.data.get('entity_id'),
+                           event.data.get('old_state'),
+                           event.data.get('new_state'))
+
+    return _async_get_state_change_index(hass).async_subscribe(
+        (), domain_change_listener, domains)
+
+
+track_domain_state_change = threaded_listener_factory(
+    async_track_domain_state_change)
+
+
+def _async_get_state_change_index(hass):
+    """Return the state change index of hass, creating it if needed."""
+    index = hass.data.get(DATA_STATE_CHANGE_INDEX)
+    if index is None:
+        index = hass.data[DATA_STATE_CHANGE_INDEX] = _StateChangeIndex(hass)
+    return index
+
+
+class _StateChangeIndex(object):
+    """Route state_changed events to the listeners of that entity_id.
+
+    A single bus listener is shared by all subscriptions, so the cost of a
+    state change grows with the listeners interested in that entity only.
+    """
+
+    def __init__(self, hass):
+        """Initialize the index."""
+        self._hass = hass
+        # entity_id or MATCH_ALL -> tuple of listeners
+        self._subscriptions = {}
+        # domain -> tuple of listeners
+        self._domain_subscriptions = {}
+        self._async_unsub = None
+
+    @callback
+    def async_subscribe(self, entity_ids, listener, domains=()):
+        """Subscribe listener to state changes of entity_ids and domains.
+
+        Returns a function that can be called to remove the subscription.
+        """
+        keys = (MATCH_ALL,) if entity_ids == MATCH_ALL else set(entity_ids)
+        domains = set(domains)
+
+        for subscriptions, subscribed in ((self._subscriptions, keys),
+                                          (self._domain_subscriptions,
+                                           domains)):
+            for key in subscribed:
+                subscriptions[key] = subscriptions.get(key, ()) + (listener,)
+
+        if self._async_unsub is None:
+            self._async_unsub = self._hass.bus.async_listen(
+                EVENT_STATE_CHANGED, self._async_dispatch)
+
+        @callback
+        def async_remove():
+            """Remove the subscription."""
+            for subscriptions, subscribed in ((self._subscriptions, keys),
+                                              (self._domain_subscriptions,
+                                               domains)):
+                for key in subscribed:
+                    remaining = tuple(
+                        func for func in subscriptions.get(key, ())
+                        if func is not listener)
+                    if remaining:
+                        subscriptions[key] = remaining
+                    else:
+                        subscriptions.pop(key, None)
+
+            if (not self._subscriptions and not self._domain_subscriptions
+                    and self._async_unsub is not None):
+                self._async_unsub()
+                self._async_unsub = None
+
+        return async_remove
+
+    @callback
+    def _async_dispatch(self, event):
+        """Call the listeners interested in the changed entity."""
+        entity_id = event.data.get('entity_id')
+        listeners = self._subscriptions.get(MATCH_ALL, ()) + \
+            self._subscriptions.get(entity_id, ())
+
+        if self._domain_subscriptions and entity_id is not None:
+            listeners += self._domain_subscriptions.get(
+                entity_id.split('.', 1)[0], ())
+
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error handling state change %s", event)
+
+
+@callback
+def async_track_template_states(hass, templates, action):
+    """Track state changes of the states that templates accessed.
+
+    Call async_refresh on the returned tracker after rendering the templates
+    to follow the states the new render accessed. Templates that did not
+    access any state are tracked on all state changes.
+
+    Must be run within the event loop.
+    """
+    tracker = _TemplateStatesTracker(hass, templates, action)
+    tracker.async_refresh()
+    return tracker
+
+
+class _TemplateStatesTracker(object):
+    """Subscription to the states accessed by the last render of templates."""
+
+    def __init__(self, hass, templates, action):
+        """Initialize the tracker."""
+        self._hass = hass
+        self._templates = [template for template in templates
+                           if template is not None]
+        self._action = action
+        self._tracked = None
+        self._async_unsub = None
+
+    @callback
+    def async_refresh(self):
+        """Subscribe to the states accessed by the last render."""
+        entity_ids = set()
+        domains = set()
+
+        for template in self._templates:
+            info = template.render_info
+            if info.all_states or info.is_static():
+                entity_ids = MATCH_ALL
+                domains = set()
+                break
+            entity_ids.update(info.entities)
+            domains.update(info.domains)
+
+        if entity_ids != MATCH_ALL:
+            # Changes of these are already seen through their domain
+            entity_ids = {entity_id for entity_id in entity_ids
+                          if entity_id.split('.', 1)[0] not in domains}
+
+        tracked = (entity_ids, domains)
+        if tracked == self._tracked:
+            return
+
+        if self._async_unsub is not None:
+            self._async_unsub()
+
+        self._tracked = tracked
+        self._async_unsub = _async_get_state_change_index(
+            self._hass).async_subscribe(
+                entity_ids, self._async_state_listener, domains)
+
+    @callback
+    def async_remove(self):
+        """Stop tracking state changes."""
+        if self._async_unsub is not None:
+            self._async_unsub()
+            self._async_unsub = None
+        self._tracked = None
+
+    @callback
+    def _async_state_listener(self, event):
+        """Run the action for a state change."""
+        self._hass.async_run_job(self._action, event.data.get('entity_id'),
+                                 event.data.get('old_state'),
+                                 event.data.get('new_state'))
+
+
 @callback
 def async_track_template(hass, template, action, variables=None):
     """Add a listener that track state changes with template condition."""
@@ -98,6 +295,7 @@ def async_track_template(hass, template, action, variables=None):
         """Check if condition is correct and run action."""
         nonlocal already_triggered
         template_result = condition.async_template(hass, template, variables)
+        tracker.async_refresh()
 
         # Check to see if template returns true
         if template_result and not already_triggered:
@@ -106,8 +304,16 @@ def async_track_template(hass, template, action, variables=None):
         elif not template_result:
             already_triggered = False
 
-    return async_track_state_change(
-        hass, template.extract_entities(), template_condition_listener)
+    # Render once to learn which states the template depends on
+    try:
+        template.async_render(variables)
+    except TemplateError:
+        pass
+
+    tracker = async_track_template_states(
+        hass, (template,), template_condition_listener)
+
+    return tracker.async_remove
 
 
 track_template = threaded_listener_factory(async_track_template)
@@ -136,28 +342,7 @@ def async_track_point_in_utc_time(hass, action, point_in_time):
     # Ensure point_in_time is UTC
     point_in_time = dt_util.as_utc(point_in_time)
 
-    @callback
-    def point_in_time_listener(event):
-        """Listen for matching time_changed events."""
-        now = event.data[ATTR_NOW]
-
-        if now < point_in_time or hasattr(point_in_time_listener, 'run'):
-            return
-
-        # Set variable so that we will never run twice.
-        # Because the event bus might have to wait till a thread comes
-        # available to execute this listener it might occur that the
-        # listener gets lined up twice to be executed. This will make
-        # sure the second time it does nothing.
-        point_in_time_listener.run = True
-        async_unsub()
-
-        hass.async_run_job(action, now)
-
-    async_unsub = hass.bus.async_listen(EVENT_TIME_CHANGED,
-                                        point_in_time_listener)
-
-    return async_unsub
+    return _async_get_scheduler(hass).async_schedule(point_in_time, action)
 
 
 track_point_in_utc_time = threaded_listener_factory(
@@ -286,16 +471,39 @@ def async_track_utc_time_change(hass, action, year=None, month=None, day=None,
     pmp = _process_time_match
     year, month, day = pmp(year), pmp(month), pmp(day)
     hour, minute, second = pmp(hour), pmp(minute), pmp(second)
+    scheduler = _async_get_scheduler(hass)
+    remove = None
 
-    @callback
-    def pattern_time_change_listener(event):
-        """Listen for matching time_changed events."""
-        now = event.data[ATTR_NOW]
+    def next_match(now, inclusive=False):
+        """Return the next UTC point in time matching the pattern."""
+        if local:
+            now = dt_util.as_local(now)
+        start = now.replace(tzinfo=None, microsecond=0)
+        if not inclusive:
+            start += timedelta(seconds=1)
+
+        nxt = _next_time_match(start, year, month, day, hour, minute, second)
+        if nxt is None:
+            return _FAR_FUTURE
+        elif local:
+            return dt_util.as_utc(nxt)
+        return dt_util.UTC.localize(nxt)
+
+    def schedule(point_in_time):
+        """Schedule the listener for the next match."""
+        nonlocal remove
+        remove = scheduler.async_schedule(
+            point_in_time, pattern_time_change_listener,
+            rewind=lambda now: next_match(now, inclusive=True))
 
+    @callback
+    def pattern_time_change_listener(now):
+        """Called when a matching time might have been reached."""
         if local:
             now = dt_util.as_local(now)
         mat = _matcher
 
+        # The clock may have skipped past the match, only fire if it matches
         # pylint: disable=too-many-boolean-expressions
         if mat(now.year, year) and \
            mat(now.month, month) and \
@@ -306,8 +514,15 @@ def async_track_utc_time_change(hass, action, year=None, month=None, day=None,
 
             hass.async_run_job(action, now)
 
-    return hass.bus.async_listen(EVENT_TIME_CHANGED,
-                                 pattern_time_change_listener)
+        schedule(next_match(now))
+
+    schedule(next_match(scheduler.last_now, inclusive=True))
+
+    def remove_listener():
+        """Remove time pattern listener."""
+        remove()
+
+    return remove_listener
 
 
 track_utc_time_change = threaded_listener_factory(async_track_utc_time_change)
@@ -324,6 +539,142 @@ def async_track_time_change(hass, action, year=None, month=None, day=None,
 track_time_change = threaded_listener_factory(async_track_time_change)
 
 
+@callback
+def _async_get_scheduler(hass):
+    """Return the time scheduler of this hass instance."""
+    scheduler = hass.data.get(DATA_TIME_SCHEDULER)
+    if scheduler is None:
+        scheduler = hass.data[DATA_TIME_SCHEDULER] = _TimeScheduler(hass)
+    return scheduler
+
+
+class _TimeScheduler(object):
+    """Run listeners at points in time using a heap of deadlines.
+
+    A single time_changed listener only looks at the earliest deadline, so
+    a tick costs the same no matter how many listeners are waiting.
+    """
+
+    def __init__(self, hass):
+        """Initialize the scheduler."""
+        self._hass = hass
+        # Heap of [point_in_time, sequence, action, rewind] entries.
+        # The action is set to None when the entry is cancelled or has run.
+        self._heap = []
+        self._sequence = 0
+        self._cancelled = 0
+        # Time of the last time_changed event, the clock of this scheduler
+        self.last_now = dt_util.utcnow()
+        hass.bus.async_listen(EVENT_TIME_CHANGED, self._async_tick)
+
+    @callback
+    def async_schedule(self, point_in_time, action, rewind=None):
+        """Run action once point_in_time has been reached.
+
+        rewind is called with the new time to get a new point in time for the
+        entry when the clock is moved backwards.
+
+        Returns a function that can be called to cancel the action.
+        """
+        self._sequence += 1
+        entry = [point_in_time, self._sequence, action, rewind]
+        heapq.heappush(self._heap, entry)
+
+        @callback
+        def async_cancel():
+            """Cancel the scheduled action."""
+            if entry[2] is None:
+                return
+            entry[2] = None
+            self._cancelled += 1
+            self._async_compact()
+
+        return async_cancel
+
+    @callback
+    def _async_compact(self):
+        """Drop cancelled entries once they make up most of the heap."""
+        if self._cancelled < 100 or self._cancelled * 2 < len(self._heap):
+            return
+        self._heap = [entry for entry in self._heap if entry[2] is not None]
+        heapq.heapify(self._heap)
+        self._cancelled = 0
+
+    @callback
+    def _async_rewind(self, now):
+        """Reschedule the entries that follow the clock."""
+        for entry in self._heap:
+            if entry[2] is not None and entry[3] is not None:
+                entry[0] = entry[3](now)
+        heapq.heapify(self._heap)
+
+    @callback
+    def _async_tick(self, event):
+        """Run the actions that are due."""
+        now = event.data[ATTR_NOW]
+        if now.tzinfo is None:
+            now = dt_util.UTC.localize(now)
+        else:
+            now = dt_util.as_utc(now)
+
+        if now < self.last_now:
+            self._async_rewind(now)
+        self.last_now = now
+
+        # Take all due entries first, so actions scheduled by the actions
+        # run in a later tick
+        heap = self._heap
+        due = []
+        while heap and heap[0][0] <= now:
+            due.append(heapq.heappop(heap))
+
+        for entry in due:
+            action = entry[2]
+            if action is None:
+                self._cancelled = max(self._cancelled - 1, 0)
+                continue
+            entry[2] = None
+            self._hass.async_run_job(action, now)
+
+
+def _next_time_match(start, year, month, day, hour, minute, second):
+    """Return the first naive datetime at or after start matching a pattern.
+
+    Returns None if no match is found.
+    """
+    mat = _matcher
+    candidate = start.replace(microsecond=0)
+    if candidate < start:
+        candidate += timedelta(seconds=1)
+
+    for _ in range(MAX_PATTERN_STEPS):
+        if not mat(candidate.year, year):
+            if candidate.year >= datetime.max.year:
+                return None
+            candidate = datetime(candidate.year + 1, 1, 1)
+        elif not mat(candidate.month, month):
+            if candidate.month == 12:
+                if candidate.year >= datetime.max.year:
+                    return None
+                candidate = datetime(candidate.year + 1, 1, 1)
+            else:
+                candidate = datetime(candidate.year, candidate.month + 1, 1)
+        elif not mat(candidate.day, day):
+            candidate = datetime(candidate.year, candidate.month,
+                                 candidate.day) + timedelta(days=1)
+        elif not mat(candidate.hour, hour):
+            candidate = candidate.replace(minute=0, second=0) + \
+                timedelta(hours=1)
+        elif not mat(candidate.minute, minute):
+            candidate = candidate.replace(second=0) + timedelta(minutes=1)
+        elif not mat(candidate.second, second):
+            candidate += timedelta(seconds=1)
+        else:
+            return candidate
+
+    return None
+
+
 def _process_state_match(parameter):
     """Wrap parameter in a tuple if it is not one and returns it."""
     if parameter is None or parameter == MATCH_ALL:
@@ -0,0 +1,100 @@
+"""Helpers to profile where the time of setting up components goes."""
+from contextlib import contextmanager
+import time
+
+import homeassistant.loader as loader
+
+DATA_SETUP_PROFILE = 'setup_profile'
+
+PHASE_VALIDATION = 'validation'
+PHASE_REQUIREMENTS = 'requirements'
+PHASE_SETUP = 'setup'
+
+
+def get_profile(hass):
+    """Return the setup profile of Home Assistant, creating it if needed."""
+    profile = hass.data.get(DATA_SETUP_PROFILE)
+    if profile is None:
+        profile = hass.data[DATA_SETUP_PROFILE] = SetupProfile()
+    return profile
+
+
+class SetupProfile(object):
+    """Wall time spent in the setup phases of components and platforms.
+
+    Phases are timed from the event loop. Times are in seconds, start and
+    end are relative to the creation of the profile. Import times are
+    kept by the loader.
+    """
+
+    def __init__(self):
+        """Initialize the profile."""
+        self._created = time.monotonic()
+        self._entries = {}
+
+    def _entry(self, name):
+        """Return the entry of a component or platform."""
+        entry = self._entries.get(name)
+        if entry is None:
+            entry = self._entries[name] = {}
+        return entry
+
+    @contextmanager
+    def timed(self, name, phase):
+        """Add the time spent in the with block to a phase."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            entry = self._entry(name)
+            entry[phase] = (entry.get(phase, 0) + time.monotonic() - start)
+
+    @contextmanager
+    def timed_setup(self, name, waiting_for=()):
+        """Record when the complete setup of a component starts and ends."""
+        entry = self._entry(name)
+        entry['start'] = time.monotonic() - self._created
+        entry['waiting_for'] = list(waiting_for)
+        try:
+            yield
+        finally:
+            entry['end'] = time.monotonic() - self._created
+
+    def setup_time(self, name):
+        """Return the wall time of the setup of a component."""
+        entry = self._entries.get(name, {})
+        if 'end' not in entry:
+            return None
+        return entry['end'] - entry['start']
+
+    def critical_path(self):
+        """Return the components that made the startup as long as it was.
+
+        Starts at the component that finished last and follows the
+        component it waited for that finished last.
+        """
+        ends = {name: entry['end'] for name, entry in self._entries.items()
+                if 'end' in entry}
+        path = []
+        name = max(ends, key=ends.get) if ends else None
+        while name is not None and name not in path:
+            path.append(name)
+            waited = [dep for dep in self._entries[name]['waiting_for']
+                      if dep in ends]
+            name = max(waited, key=ends.get) if waited else None
+        path.reverse()
+        return path
+
+    def report(self):
+        """Return the profile as a dictionary."""
+        entries = {name: dict(entry) for name, entry in self._entries.items()}
+        for name, seconds in loader.IMPORT_TIMES.items():
+            if name in entries:
+                entries[name]['import'] = seconds
+
+        ends = [entry['end'] for entry in entries.values() if 'end' in entry]
+        return {
+            'total': max(ends) if ends else 0,
+            'critical_path': self.critical_path(),
+            'components': entries,
+        }
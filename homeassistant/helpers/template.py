@@ -1,8 +1,11 @@
 """Template helper methods for rendering strings with HA data."""
+from collections import OrderedDict
 from datetime import datetime
+import functools as ft
 import json
 import logging
 import re
+import threading
 
 import jinja2
 from jinja2.sandbox import ImmutableSandboxedEnvironment
@@ -20,6 +23,20 @@ _LOGGER = logging.getLogger(__name__)
 _SENTINEL = object()
 DATE_STR_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+DATA_COMPILED_TEMPLATES = 'template_compiled'
+
+# Number of distinct template sources kept compiled
+COMPILED_CACHE_SIZE = 1000
+
+# The render info of the template being rendered in this thread
+_RENDERING = threading.local()
+
+_STATS = {
+    'compiled': 0,
+    'rendered': 0,
+    'memo_hits': 0,
+}
+
 _RE_NONE_ENTITIES = re.compile(r"distance\(|closest\(", re.I | re.M)
 _RE_GET_ENTITIES = re.compile(
     r"(?:(?:states\.|(?:is_state|is_state_attr|states)\(.)([\w]+\.[\w]+))",
@@ -50,10 +67,77 @@ def extract_entities(template):
     return MATCH_ALL
 
 
+class RenderInfo(object):
+    """The states accessed by the last render of a template."""
+
+    def __init__(self):
+        """Initialize the render info."""
+        self.entities = set()
+        self.domains = set()
+        self.all_states = False
+        self.volatile = False
+
+    def reset(self):
+        """Forget the states of the previous render."""
+        self.entities.clear()
+        self.domains.clear()
+        self.all_states = False
+        self.volatile = False
+
+    def record_entity(self, entity_id):
+        """Record that the state of an entity was accessed."""
+        self.entities.add(entity_id.lower())
+
+    def record_domain(self, domain):
+        """Record that all states of a domain were accessed."""
+        self.domains.add(domain.lower())
+
+    def record_all(self):
+        """Record that all states were accessed."""
+        self.all_states = True
+
+    def record_volatile(self):
+        """Record that the result depends on more than states and variables.
+
+        Like the current time.
+        """
+        self.volatile = True
+
+    def is_static(self):
+        """Return True if no states were accessed."""
+        return not (self.all_states or self.entities or self.domains)
+
+
+def render_stats():
+    """Return how often templates were compiled and rendered."""
+    stats = dict(_STATS)
+    stats['code_cache_hits'] = _compile.cache_info().hits
+    return stats
+
+
+def _record(method, *args):
+    """Record an access in the render info of the current render."""
+    render_info = getattr(_RENDERING, 'render_info', None)
+    if render_info is not None:
+        getattr(render_info, method)(*args)
+
+
+@ft.lru_cache(maxsize=COMPILED_CACHE_SIZE)
+def _compile(source):
+    """Compile the source of a template, shared by identical templates."""
+    _STATS['compiled'] += 1
+    return ENV.compile(source)
+
+
 class Template(object):
-    """Class to hold a template and manage caching and rendering."""
+    """Class to hold a template and manage caching and rendering.
 
-    def __init__(self, template, hass=None):
+    With memoize set, rendering returns the previous result as long as the
+    variables and the states it accessed are unchanged. Renders that
+    accessed whole domains or the current time are not memoized.
+    """
+
+    def __init__(self, template, hass=None, memoize=False):
         """Instantiate a Template."""
         if not isinstance(template, str):
             raise TypeError('Expected template to be a string')
@@ -62,6 +146,9 @@ class Template(object):
         self._compiled_code = None
         self._compiled = None
         self.hass = hass
+        self.memoize = memoize
+        self.render_info = RenderInfo()
+        self._memo = None
 
     def ensure_valid(self):
         """Return if template is valid."""
@@ -69,7 +156,7 @@ class Template(object):
             return
 
         try:
-            self._compiled_code = ENV.compile(self.template)
+            self._compiled_code = _compile(self.template)
         except jinja2.exceptions.TemplateSyntaxError as err:
             raise TemplateError(err)
 
@@ -96,7 +183,7 @@ class Template(object):
             kwargs.update(variables)
 
         try:
-            return self._compiled.render(kwargs).strip()
+            return self._async_render(kwargs)
         except jinja2.TemplateError as err:
             raise TemplateError(err)
 
@@ -129,12 +216,42 @@ class Template(object):
             pass
 
         try:
-            return self._compiled.render(variables).strip()
+            return self._async_render(variables)
         except jinja2.TemplateError as ex:
             _LOGGER.error('Error parsing value: %s (value: %s, template: %s)',
                           ex, value, self.template)
             return value if error_value is _SENTINEL else error_value
 
+    def _async_render(self, variables):
+        """Render the template and record the states it accessed."""
+        memo = self._memo
+        if memo is not None and memo[0] == variables and all(
+                self.hass.states.get(entity_id) is state
+                for entity_id, state in memo[1].items()):
+            _STATS['memo_hits'] += 1
+            return memo[2]
+
+        self._memo = None
+        render_info = self.render_info
+        render_info.reset()
+
+        previous = getattr(_RENDERING, 'render_info', None)
+        _RENDERING.render_info = render_info
+        try:
+            result = self._compiled.render(variables).strip()
+        finally:
+            _RENDERING.render_info = previous
+        _STATS['rendered'] += 1
+
+        if self.memoize and not (render_info.volatile or
+                                 render_info.domains or
+                                 render_info.all_states):
+            self._memo = (variables, {
+                entity_id: self.hass.states.get(entity_id)
+                for entity_id in render_info.entities}, result)
+
+        return result
+
     def _ensure_compiled(self):
         """Bind a template to a specific hass instance."""
         if self._compiled is not None:
@@ -144,18 +261,8 @@ class Template(object):
 
         assert self.hass is not None, 'hass variable not set on template'
 
-        location_methods = LocationMethods(self.hass)
-
-        global_vars = ENV.make_globals({
-            'closest': location_methods.closest,
-            'distance': location_methods.distance,
-            'is_state': self.hass.states.is_state,
-            'is_state_attr': self.hass.states.is_state_attr,
-            'states': AllStates(self.hass),
-        })
-
-        self._compiled = jinja2.Template.from_code(
-            ENV, self._compiled_code, global_vars, None)
+        self._compiled = _get_compiled(
+            self.hass, self.template, self._compiled_code)
 
         return self._compiled
 
@@ -166,6 +273,66 @@ class Template(object):
                 self.hass == other.hass)
 
 
+def _get_compiled(hass, source, code):
+    """Return the compiled template of source bound to hass.
+
+    Identical templates share the compiled template and its globals.
+    """
+    compiled_templates = hass.data.get(DATA_COMPILED_TEMPLATES)
+    if compiled_templates is None:
+        compiled_templates = hass.data[DATA_COMPILED_TEMPLATES] = \
+            OrderedDict()
+
+    compiled = compiled_templates.pop(source, None)
+    if compiled is None:
+        location_methods = LocationMethods(hass)
+
+        global_vars = ENV.make_globals({
+            'closest': location_methods.closest,
+            'distance': location_methods.distance,
+            'is_state': ft.partial(_is_state, hass),
+            'is_state_attr': ft.partial(_is_state_attr, hass),
+            'states': AllStates(hass),
+        })
+
+        compiled = jinja2.Template.from_code(ENV, code, global_vars, None)
+
+        if len(compiled_templates) >= COMPILED_CACHE_SIZE:
+            compiled_templates.popitem(last=False)
+
+    compiled_templates[source] = compiled
+    return compiled
+
+
+def _get_state(hass, entity_id):
+    """Return the state of an entity and record the access."""
+    _record('record_entity', entity_id)
+    return hass.states.get(entity_id)
+
+
+def _is_state(hass, entity_id, state):
+    """Test if a state is a specific value and record the access."""
+    _record('record_entity', entity_id)
+    return hass.states.is_state(entity_id, state)
+
+
+def _is_state_attr(hass, entity_id, name, value):
+    """Test if a state attribute is a specific value and record the access."""
+    _record('record_entity', entity_id)
+    return hass.states.is_state_attr(entity_id, name, value)
+
+
+def _volatile(func):
+    """Wrap a template global whose result changes without state changes."""
+    @ft.wraps(func)
+    def wrapper(*args, **kwargs):
+        """Record the call and call the function."""
+        _record('record_volatile')
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
 class AllStates(object):
     """Class to expose all HA states as attributes."""
 
@@ -179,12 +346,12 @@ class AllStates(object):
 
     def __iter__(self):
         """Return all states."""
-        return iter(sorted(self._hass.states.async_all(),
-                           key=lambda state: state.entity_id))
+        _record('record_all')
+        return iter(self._hass.states.async_domain_states())
 
     def __call__(self, entity_id):
         """Return the states."""
-        state = self._hass.states.get(entity_id)
+        state = _get_state(self._hass, entity_id)
         return STATE_UNKNOWN if state is None else state.state
 
 
@@ -198,14 +365,12 @@ class DomainStates(object):
 
     def __getattr__(self, name):
         """Return the states."""
-        return self._hass.states.get('{}.{}'.format(self._domain, name))
+        return _get_state(self._hass, '{}.{}'.format(self._domain, name))
 
     def __iter__(self):
         """Return the iteration over all the states."""
-        return iter(sorted(
-            (state for state in self._hass.states.async_all()
-             if state.domain == self._domain),
-            key=lambda state: state.entity_id))
+        _record('record_domain', self._domain)
+        return iter(self._hass.states.async_domain_states(self._domain))
 
 
 class LocationMethods(object):
@@ -273,7 +438,9 @@ class LocationMethods(object):
 
             group = get_component('group')
 
-            states = [self._hass.states.get(entity_id) for entity_id
+            _record('record_entity', gr_entity_id)
+
+            states = [_get_state(self._hass, entity_id) for entity_id
                       in group.expand_entity_ids(self._hass, [gr_entity_id])]
 
         return loc_helper.closest(latitude, longitude, states)
@@ -331,7 +498,7 @@ class LocationMethods(object):
         if isinstance(entity_id_or_state, State):
             return entity_id_or_state
         elif isinstance(entity_id_or_state, str):
-            return self._hass.states.get(entity_id_or_state)
+            return _get_state(self._hass, entity_id_or_state)
         return None
 
 
@@ -428,8 +595,9 @@ ENV.filters['is_defined'] = fail_when_undefined
 ENV.filters['max'] = max
 ENV.filters['min'] = min
 ENV.globals['float'] = forgiving_float
-ENV.globals['now'] = dt_util.now
-ENV.globals['utcnow'] = dt_util.utcnow
+ENV.filters['random'] = _volatile(ENV.filters['random'])
+ENV.globals['now'] = _volatile(dt_util.now)
+ENV.globals['utcnow'] = _volatile(dt_util.utcnow)
 ENV.globals['as_timestamp'] = dt_util.as_timestamp
-ENV.globals['relative_time'] = dt_util.get_age
+ENV.globals['relative_time'] = _volatile(dt_util.get_age)
 ENV.globals['strptime'] = strptime
@@ -10,15 +10,18 @@ call get_component('switch.your_platform'). In both cases the config directory
 is checked to see if it contains a user provided version. If not available it
 will check the built-in components and platforms.
 """
+import ast
 import importlib
+import json
 import logging
 import os
 import pkgutil
 import sys
+import time
 
 from types import ModuleType
 # pylint: disable=unused-import
-from typing import Optional, Sequence, Set, Dict  # NOQA
+from typing import Optional, Sequence, Set, Dict, List  # NOQA
 
 from homeassistant.const import PLATFORM_FORMAT
 from homeassistant.util import OrderedSet
@@ -38,6 +41,16 @@ AVAILABLE_COMPONENTS = []  # type: List[str]
 # Dict of loaded components mapped name => module
 _COMPONENT_CACHE = {}  # type: Dict[str, ModuleType]
 
+# Dict of seconds it took to import components mapped name => seconds
+IMPORT_TIMES = {}  # type: Dict[str, float]
+
+# Dict of directories to look for components mapped package => path
+_COMPONENT_PATHS = {}  # type: Dict[str, str]
+
+# Index of what components define, see ComponentIndex
+COMPONENT_INDEX_FILE = '.component_index.json'
+_COMPONENT_INDEX = None  # type: Optional[ComponentIndex]
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -46,21 +59,27 @@ def prepare(hass: 'HomeAssistant'):
 
     This method needs to run in an executor.
     """
-    global PREPARED  # pylint: disable=global-statement
+    # pylint: disable=global-statement
+    global PREPARED, _COMPONENT_INDEX
 
     # Load the built-in components
     import homeassistant.components as components
 
+    _COMPONENT_INDEX = ComponentIndex(hass.config.path(COMPONENT_INDEX_FILE))
+    _COMPONENT_PATHS.clear()
+    _COMPONENT_PATHS['homeassistant.components'] = components.__path__[0]
+
     AVAILABLE_COMPONENTS.clear()
 
-    AVAILABLE_COMPONENTS.extend(
-        item[1] for item in
-        pkgutil.iter_modules(components.__path__, 'homeassistant.components.'))
+    AVAILABLE_COMPONENTS.extend(_COMPONENT_INDEX.modules(
+        components.__path__[0], 'homeassistant.components.'))
 
     # Look for available custom components
     custom_path = hass.config.path("custom_components")
 
     if os.path.isdir(custom_path):
+        _COMPONENT_PATHS['custom_components'] = custom_path
+
         # Ensure we can load custom components using Pythons import
         sys.path.insert(0, hass.config.config_dir)
 
@@ -124,9 +143,14 @@ def get_component(comp_name) -> Optional[ModuleType]:
     # We do not want to silent the ImportErrors as they provide valuable
     # information to track down when debugging Home Assistant.
 
-    # First check custom, then built-in
-    potential_paths = ['custom_components.{}'.format(comp_name),
-                       'homeassistant.components.{}'.format(comp_name)]
+    # Import the module the loader found the file of. If there is none,
+    # first check custom, then built-in
+    path = _find_component(comp_name)[0]
+    if path is not None:
+        potential_paths = [path]
+    else:
+        potential_paths = ['custom_components.{}'.format(comp_name),
+                           'homeassistant.components.{}'.format(comp_name)]
 
     for path in potential_paths:
         # Validate here that root component exists
@@ -138,6 +162,7 @@ def get_component(comp_name) -> Optional[ModuleType]:
             continue
 
         try:
+            start = time.monotonic()
             module = importlib.import_module(path)
 
             # In Python 3 you can import files from directories that do not
@@ -154,6 +179,7 @@ def get_component(comp_name) -> Optional[ModuleType]:
             _LOGGER.info("Loaded %s from %s", comp_name, path)
 
             _COMPONENT_CACHE[comp_name] = module
+            IMPORT_TIMES[comp_name] = time.monotonic() - start
 
             return module
 
@@ -170,6 +196,157 @@ def get_component(comp_name) -> Optional[ModuleType]:
     return None
 
 
+def _find_component(comp_name: str):
+    """Return the module path and file of a component, custom ones first.
+
+    Returns (None, None) if there is no file for the component.
+
+    Async friendly.
+    """
+    for package in ('custom_components', 'homeassistant.components'):
+        base_path = _COMPONENT_PATHS.get(package)
+        path = '{}.{}'.format(package, comp_name)
+        root_comp = path.rsplit(".", 1)[0] if '.' in comp_name else path
+
+        if base_path is None or root_comp not in AVAILABLE_COMPONENTS:
+            continue
+
+        filename = os.path.join(base_path, *comp_name.split('.'))
+        for candidate in (filename + '.py',
+                          os.path.join(filename, '__init__.py')):
+            if os.path.isfile(candidate):
+                return path, candidate
+
+    return None, None
+
+
+def get_dependencies(comp_name: str) -> Optional[List[str]]:
+    """Return the dependencies of a component.
+
+    Read from the component index so the component is not imported. Falls
+    back to importing it if the dependencies are not a literal list.
+    Returns None if the component does not exist.
+
+    Async friendly.
+    """
+    if comp_name not in _COMPONENT_CACHE and _COMPONENT_INDEX is not None:
+        filename = _find_component(comp_name)[1]
+        if filename is not None:
+            dependencies = _COMPONENT_INDEX.info(filename)['dependencies']
+            if dependencies is not None:
+                return dependencies
+
+    component = get_component(comp_name)
+    if component is None:
+        return None
+    return getattr(component, 'DEPENDENCIES', [])
+
+
+def save_component_index() -> None:
+    """Store the component index if it changed.
+
+    This method needs to run in an executor.
+    """
+    if _COMPONENT_INDEX is not None and _COMPONENT_INDEX.changed:
+        _COMPONENT_INDEX.save()
+
+
+class ComponentIndex(object):
+    """Index of the modules in directories and what they define.
+
+    The dependencies and requirements of a component are read from its
+    source, without importing it. Entries are kept with the modification
+    time of their file or directory and only read again if it changed.
+    The index is stored as JSON, so it survives a restart.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize the index, loading the stored one if it exists."""
+        self.path = path
+        self.changed = False
+        self._dirs = {}  # type: Dict[str, Dict]
+        self._files = {}  # type: Dict[str, Dict]
+
+        try:
+            with open(path) as fil:
+                stored = json.load(fil)
+            self._dirs = stored['dirs']
+            self._files = stored['files']
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as err:
+            _LOGGER.warning('Ignoring invalid component index %s: %s',
+                            path, err)
+
+    def modules(self, directory: str, prefix: str) -> List[str]:
+        """Return the modules in a directory, like pkgutil.iter_modules."""
+        mtime = os.path.getmtime(directory)
+        entry = self._dirs.get(directory)
+
+        if entry is None or entry['mtime'] != mtime:
+            entry = self._dirs[directory] = {
+                'mtime': mtime,
+                'modules': [item[1] for item in
+                            pkgutil.iter_modules([directory], prefix)],
+            }
+            self.changed = True
+
+        return entry['modules']
+
+    def info(self, filename: str) -> Dict:
+        """Return the dependencies and requirements defined in a file.
+
+        A value is None if it can not be read from the source.
+        """
+        mtime = os.path.getmtime(filename)
+        entry = self._files.get(filename)
+
+        if entry is None or entry['mtime'] != mtime:
+            entry = self._files[filename] = _read_component_info(filename)
+            entry['mtime'] = mtime
+            self.changed = True
+
+        return entry
+
+    def save(self) -> None:
+        """Store the index."""
+        try:
+            with open(self.path, 'w') as fil:
+                json.dump({'dirs': self._dirs, 'files': self._files}, fil)
+            self.changed = False
+        except OSError as err:
+            _LOGGER.warning('Unable to store component index %s: %s',
+                            self.path, err)
+
+
+def _read_component_info(filename: str) -> Dict:
+    """Read DEPENDENCIES and REQUIREMENTS from the source of a component."""
+    info = {'dependencies': [], 'requirements': []}
+
+    try:
+        with open(filename, 'rb') as fil:
+            tree = ast.parse(fil.read(), filename)
+    except (OSError, SyntaxError, ValueError):
+        return {'dependencies': None, 'requirements': None}
+
+    for node in tree.body:
+        if not isinstance(node, ast.Assign):
+            continue
+
+        for target in node.targets:
+            if not isinstance(target, ast.Name) or \
+               target.id not in ('DEPENDENCIES', 'REQUIREMENTS'):
+                continue
+
+            try:
+                value = list(ast.literal_eval(node.value))
+            except (ValueError, TypeError):
+                value = None
+            info[target.id.lower()] = value
+
+    return info
+
+
 def load_order_components(components: Sequence[str]) -> OrderedSet:
     """Take in a list of components we want to load.
 
@@ -222,15 +399,15 @@ def _load_order_component(comp_name: str, load_order: OrderedSet,
 
     Async friendly.
     """
-    component = get_component(comp_name)
+    dependencies = get_dependencies(comp_name)
 
     # If None it does not exist, error already thrown by get_component.
-    if component is None:
+    if dependencies is None:
         return OrderedSet()
 
     loading.add(comp_name)
 
-    for dependency in getattr(component, 'DEPENDENCIES', []):
+    for dependency in dependencies:
         # Check not already loaded
         if dependency in load_order:
             continue
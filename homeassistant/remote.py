@@ -292,13 +292,23 @@ class StateMachine(ha.StateMachine):
         """Discard current data and mirrors the remote state machine."""
         self._states = {state.entity_id: state for state
                         in get_states(self._api)}
+        self._domains = {}
+        for state in self._states.values():
+            self._add_to_domain(state)
 
     def _state_changed_listener(self, event):
         """Listen for state changed events and applies them."""
-        if event.data['new_state'] is None:
-            self._states.pop(event.data['entity_id'], None)
+        entity_id = event.data['entity_id']
+        new_state = event.data['new_state']
+
+        if new_state is None:
+            old_state = self._states.pop(entity_id, None)
+            if old_state is not None:
+                self._remove_from_domain(old_state)
         else:
-            self._states[event.data['entity_id']] = event.data['new_state']
+            if entity_id not in self._states:
+                self._add_to_domain(new_state)
+            self._states[entity_id] = new_state
 
 
 class JSONEncoder(json.JSONEncoder):
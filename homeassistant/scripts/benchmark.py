@@ -0,0 +1,89 @@
+"""Script to run micro benchmarks of Home Assistant internals."""
+import argparse
+import random
+import timeit
+
+from homeassistant.components.mqtt import TopicTrie
+
+
+def run(args):
+    """Handle benchmark commandline script."""
+    parser = argparse.ArgumentParser(
+        description=("Run micro benchmarks of Home Assistant internals."))
+    parser.add_argument(
+        '--script', choices=['benchmark'])
+    parser.add_argument(
+        'name', choices=list(BENCHMARKS), help="Benchmark to run")
+    parser.add_argument(
+        '-n', '--messages', type=int, default=10000,
+        help="Number of messages to route per measurement")
+
+    args = parser.parse_args(args)
+
+    return BENCHMARKS[args.name](args)
+
+
+def _linear_match(subscription, topic):
+    """Match a topic against a single subscription, level by level."""
+    if subscription.endswith('#'):
+        return (subscription[:-2] == topic or
+                topic.startswith(subscription[:-1]))
+
+    sub_parts = subscription.split('/')
+    topic_parts = topic.split('/')
+
+    return (len(sub_parts) == len(topic_parts) and
+            all(a == b for a, b in zip(sub_parts, topic_parts) if a != '+'))
+
+
+def _mqtt_subscriptions(count):
+    """Return subscription topics resembling a busy installation."""
+    subscriptions = []
+    for idx in range(count):
+        kind = idx % 4
+        if kind == 0:
+            subscriptions.append('tasmota/device{}/stat/POWER'.format(idx))
+        elif kind == 1:
+            subscriptions.append('tasmota/device{}/tele/+'.format(idx))
+        elif kind == 2:
+            subscriptions.append('zigbee2mqtt/sensor{}'.format(idx))
+        else:
+            subscriptions.append('homeassistant/light/{}/#'.format(idx))
+    return subscriptions
+
+
+def mqtt_routing(args):
+    """Measure routed MQTT messages per second per subscription count."""
+    print('{:>14} {:>16} {:>16}'.format(
+        'subscriptions', 'trie msg/s', 'linear msg/s'))
+
+    for count in (10, 100, 500, 1500, 5000):
+        subscriptions = _mqtt_subscriptions(count)
+        trie = TopicTrie()
+        for subscription in subscriptions:
+            trie.add(subscription, subscription)
+
+        rnd = random.Random(count)
+        topics = [
+            rnd.choice(subscriptions).replace('+', 'SENSOR')
+            .replace('#', 'state') for _ in range(args.messages)]
+
+        trie_time = timeit.timeit(
+            lambda: [trie.match(topic) for topic in topics], number=1)
+
+        # The linear scan is slow, measure a fraction of the messages
+        sample = topics[:max(1, args.messages // 10)]
+        linear_time = timeit.timeit(
+            lambda: [[sub for sub in subscriptions
+                      if _linear_match(sub, topic)] for topic in sample],
+            number=1)
+
+        print('{:>14} {:>16.0f} {:>16.0f}'.format(
+            count, len(topics) / trie_time, len(sample) / linear_time))
+
+    return 0
+
+
+BENCHMARKS = {
+    'mqtt_routing': mqtt_routing,
+}
@@ -1,10 +1,13 @@
 """YAML utility functions."""
+import hashlib
+import io
 import logging
 import os
+import pickle
 import sys
 import fnmatch
 from collections import OrderedDict
-from typing import Union, List, Dict
+from typing import Union, List, Dict, Optional, Tuple  # NOQA
 
 import yaml
 try:
@@ -12,6 +15,12 @@ try:
 except ImportError:
     keyring = None
 
+# The C parser of libyaml composes nodes much faster if it is available
+try:
+    from yaml import CSafeLoader as _ComposeLoader
+except ImportError:
+    _ComposeLoader = None
+
 from homeassistant.exceptions import HomeAssistantError
 
 _LOGGER = logging.getLogger(__name__)
@@ -19,19 +28,26 @@ _SECRET_NAMESPACE = 'homeassistant'
 _SECRET_YAML = 'secrets.yaml'
 __SECRET_CACHE = {}  # type: Dict
 
+# Composed YAML nodes of files mapped fname => (content hash, pickled node)
+_NODE_CACHE = {}  # type: Dict[str, Tuple[str, bytes]]
+_NODE_CACHE_VERSION = 1
+_NODE_CACHE_STATE = {'path': None, 'root': None, 'changed': False}
 
-def _add_reference(obj, loader, node):
-    """Add file reference information to an object."""
-    class NodeListClass(list):
-        """Wrapper class to be able to add attributes on a list."""
 
-        pass
+class NodeListClass(list):
+    """Wrapper class to be able to add attributes on a list."""
 
-    class NodeStrClass(str):
-        """Wrapper class to be able to add attributes on a string."""
+    pass
+
+
+class NodeStrClass(str):
+    """Wrapper class to be able to add attributes on a string."""
+
+    pass
 
-        pass
 
+def _add_reference(obj, loader, node):
+    """Add file reference information to an object."""
     if isinstance(obj, list):
         obj = NodeListClass(obj)
     if isinstance(obj, str):
@@ -54,13 +70,56 @@ class SafeLineLoader(yaml.SafeLoader):
         return node
 
 
+def _named_stream(content: str, fname: str) -> io.StringIO:
+    """Return a stream of content, named like the file it was read from."""
+    stream = io.StringIO(content)
+    stream.name = fname
+    return stream
+
+
+def _compose(fname: str, content: str) -> Optional[yaml.nodes.Node]:
+    """Return the node tree of a file, parsing it if its content changed."""
+    digest = hashlib.sha1(content.encode('utf-8')).hexdigest()
+    cached = _NODE_CACHE.get(fname)
+    if cached is not None and cached[0] == digest:
+        return pickle.loads(cached[1])
+
+    loader_class = _ComposeLoader or SafeLineLoader
+    loader = loader_class(_named_stream(content, fname))
+    try:
+        node = loader.get_single_node()
+    finally:
+        loader.dispose()
+
+    _NODE_CACHE[fname] = (digest, pickle.dumps(node, pickle.HIGHEST_PROTOCOL))
+    _NODE_CACHE_STATE['changed'] = True
+    return node
+
+
+def _construct(fname: str, node: Optional[yaml.nodes.Node]):
+    """Construct the Python objects of a node tree, resolving all tags."""
+    if node is None:
+        return None
+
+    loader = SafeLineLoader(_named_stream('', fname))
+    try:
+        return loader.construct_document(node)
+    finally:
+        loader.dispose()
+
+
 def load_yaml(fname: str) -> Union[List, Dict]:
-    """Load a YAML file."""
+    """Load a YAML file.
+
+    Only the node tree of a file is cached, so includes, secrets and
+    environment variables are resolved on every load.
+    """
     try:
         with open(fname, encoding='utf-8') as conf_file:
-            # If configuration file is empty YAML returns None
-            # We convert that to an empty dict
-            return yaml.load(conf_file, Loader=SafeLineLoader) or OrderedDict()
+            content = conf_file.read()
+        # If configuration file is empty YAML returns None
+        # We convert that to an empty dict
+        return _construct(fname, _compose(fname, content)) or OrderedDict()
     except yaml.YAMLError as exc:
         _LOGGER.error(exc)
         raise HomeAssistantError(exc)
@@ -69,6 +128,58 @@ def load_yaml(fname: str) -> Union[List, Dict]:
         raise HomeAssistantError(exc)
 
 
+def load_node_cache(path: str, root: str) -> None:
+    """Use the node cache stored at path, loading it the first time.
+
+    Only the files in the root directory are stored in the cache.
+
+    This method needs to run in an executor.
+    """
+    if _NODE_CACHE_STATE['path'] == path:
+        return
+    _NODE_CACHE_STATE['path'] = path
+    _NODE_CACHE_STATE['root'] = os.path.join(os.path.abspath(root), '')
+
+    try:
+        with open(path, mode='rb') as cache_file:
+            stored = pickle.load(cache_file)
+        if stored['version'] != (_NODE_CACHE_VERSION, yaml.__version__):
+            return
+        for fname, entry in stored['files'].items():
+            _NODE_CACHE.setdefault(fname, entry)
+    except FileNotFoundError:
+        pass
+    except Exception as err:  # pylint: disable=broad-except
+        _LOGGER.warning('Ignoring invalid YAML cache %s: %s', path, err)
+
+
+def save_node_cache() -> None:
+    """Store the node cache if files were parsed since it was loaded.
+
+    This method needs to run in an executor.
+    """
+    path = _NODE_CACHE_STATE['path']
+    if path is None or not _NODE_CACHE_STATE['changed']:
+        return
+
+    root = _NODE_CACHE_STATE['root']
+    # Secrets are never written to the cache
+    files = {fname: entry for fname, entry in _NODE_CACHE.items()
+             if os.path.abspath(fname).startswith(root) and
+             os.path.basename(fname) != _SECRET_YAML and
+             os.path.isfile(fname)}
+    try:
+        with open(path, mode='wb') as cache_file:
+            pickle.dump({
+                'version': (_NODE_CACHE_VERSION, yaml.__version__),
+                'files': files,
+            }, cache_file, pickle.HIGHEST_PROTOCOL)
+        _NODE_CACHE_STATE['changed'] = False
+    except Exception as err:  # pylint: disable=broad-except
+        # A read only config dir still works, just without the cache
+        _LOGGER.debug('Unable to store YAML cache %s: %s', path, err)
+
+
 def dump(_dict: dict) -> str:
     """Dump yaml to a string and remove null."""
     return yaml.safe_dump(_dict, default_flow_style=False) \
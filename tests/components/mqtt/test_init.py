@@ -422,3 +422,39 @@ def test_mqtt_subscribes_topics_on_connect(hass):
                 if qos is not None]
 
     assert [call[1][1:] for call in hass.add_job.mock_calls] == expected
+
+
+def test_topic_trie_match():
+    """Test the topic trie routes topics to matching subscriptions."""
+    trie = mqtt.TopicTrie()
+    for subscription in ('a/#', '#', 'a/+/c', 'a/b/c', 'x/y', 'a/+'):
+        trie.add(subscription, subscription)
+
+    assert sorted(trie.match('a')) == ['#', 'a/#']
+    assert sorted(trie.match('a/b')) == ['#', 'a/#', 'a/+']
+    assert sorted(trie.match('a/b/c')) == ['#', 'a/#', 'a/+/c', 'a/b/c']
+    assert sorted(trie.match('a/z/c')) == ['#', 'a/#', 'a/+/c']
+    assert sorted(trie.match('ab')) == ['#']
+    assert sorted(trie.match('x/y/z')) == ['#']
+
+
+def test_topic_trie_remove():
+    """Test removing subscriptions from the topic trie."""
+    trie = mqtt.TopicTrie()
+    trie.add('a/+/c', 'first')
+    trie.add('a/+/c', 'second')
+    trie.add('a/b', 'third')
+
+    trie.remove('a/+/c', 'first')
+    assert trie.match('a/b/c') == ['second']
+
+    trie.remove('a/+/c', 'second')
+    assert trie.match('a/b/c') == []
+    assert trie.match('a/b') == ['third']
+
+    # Removing unknown subscriptions does nothing
+    trie.remove('a/+/c', 'second')
+    trie.remove('does/not/exist', 'first')
+
+    trie.remove('a/b', 'third')
+    assert trie.match('a/b') == []
@@ -0,0 +1,183 @@
+"""The tests for the recorder event queue."""
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+import homeassistant.core as ha
+from homeassistant.components.recorder import event_queue as \
+    event_queue_module
+from homeassistant.components.recorder.event_queue import (
+    EventQueue, POLICY_COALESCE, POLICY_DROP, POLICY_SPILL)
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.remote import JSONEncoder
+
+
+def _state_event(entity_id, state):
+    """Return a state changed event."""
+    return ha.Event(EVENT_STATE_CHANGED, {
+        'entity_id': entity_id,
+        'old_state': None,
+        'new_state': ha.State(entity_id, state),
+    })
+
+
+def _drain(event_queue):
+    """Return all queued items and mark them done, like the recorder."""
+    items = []
+    while True:
+        event_queue.read_spill()
+        if event_queue.empty():
+            return items
+        items.append(event_queue.get_nowait())
+        event_queue.task_done()
+
+
+def test_drop_prefers_events_without_state():
+    """Test the drop policy drops other events before state changes."""
+    event_queue = EventQueue(3, POLICY_DROP)
+    first = _state_event('light.kitchen', 'on')
+    noise = ha.Event('call_service')
+    event_queue.put(first)
+    event_queue.put(noise)
+    event_queue.put(None)
+    event_queue.put(_state_event('light.kitchen', 'off'))
+    event_queue.put(_state_event('light.hallway', 'on'))
+
+    assert event_queue.stats() == {
+        'depth': 3, 'overflowing': True, 'dropped': 2, 'coalesced': 0,
+        'spilled': 0}
+    items = _drain(event_queue)
+    assert noise not in items
+    assert first not in items
+    assert items[0] is None
+    assert event_queue.unfinished_tasks == 0
+    assert not event_queue.overflowing
+
+
+def test_coalesce_keeps_latest_state_per_entity():
+    """Test the coalesce policy drops superseded states."""
+    event_queue = EventQueue(2, POLICY_COALESCE)
+    event_queue.put(_state_event('light.kitchen', 'on'))
+    event_queue.put(_state_event('light.hallway', 'on'))
+    latest = _state_event('light.kitchen', 'off')
+    event_queue.put(latest)
+
+    assert event_queue.coalesced == 1
+    assert event_queue.dropped == 0
+    items = _drain(event_queue)
+    assert [item.data['new_state'].state for item in items] == ['on', 'off']
+    assert items[1] is latest
+    assert event_queue.unfinished_tasks == 0
+
+
+def test_spill_round_trip():
+    """Test spilled events come back in order and survive a restart."""
+    with tempfile.TemporaryDirectory() as tempdirname:
+        path = os.path.join(tempdirname, 'recorder.spill')
+        event_queue = EventQueue(1, POLICY_SPILL, path)
+        events = [_state_event('light.kitchen', str(idx))
+                  for idx in range(4)]
+        for event in events:
+            event_queue.put(event)
+
+        assert not os.path.isfile(path)
+        event_queue.write_spill()
+        assert event_queue.spilled == 3
+        assert event_queue.stats()['depth'] == 4
+        # Spilled events are only read back by read_spill
+        assert event_queue.qsize() == 1
+        assert _drain(event_queue) == events
+        assert not os.path.isfile(path)
+        assert event_queue.unfinished_tasks == 0
+
+        for event in events:
+            event_queue.put(event)
+        event_queue.write_spill()
+        with open(path, 'a') as fil:
+            fil.write('{"partial')
+
+        restored = EventQueue(1, POLICY_SPILL, path)
+        assert restored.stats()['depth'] == 3
+        assert _drain(restored) == events[1:]
+        assert restored.unfinished_tasks == 0
+
+
+def test_drop_and_coalesce_skip_removed_events():
+    """Test events removed by the policies are skipped when draining."""
+    event_queue = EventQueue(3, POLICY_COALESCE)
+    events = [_state_event('light.kitchen', 'on'),
+              _state_event('light.hallway', 'on'),
+              ha.Event('call_service'),
+              _state_event('light.kitchen', 'off'),
+              _state_event('light.porch', 'on'),
+              _state_event('light.hallway', 'off')]
+    for event in events:
+        event_queue.put(event)
+
+    assert event_queue.coalesced == 2
+    assert event_queue.dropped == 1
+    assert _drain(event_queue) == events[3:]
+    assert event_queue.unfinished_tasks == 0
+
+    event_queue.put(events[0])
+    assert _drain(event_queue) == events[:1]
+
+
+def test_spill_skips_invalid_lines():
+    """Test a read of only invalid spilled lines moves on to the next."""
+    with tempfile.TemporaryDirectory() as tempdirname:
+        path = os.path.join(tempdirname, 'recorder.spill')
+        event = _state_event('light.kitchen', 'on')
+        with open(path, 'w') as fil:
+            fil.write('invalid\n{}\n')
+            fil.write(json.dumps(event.as_dict(), cls=JSONEncoder))
+            fil.write('\n')
+
+        with patch('homeassistant.components.recorder.event_queue.'
+                   'SPILL_READ_SIZE', 1):
+            event_queue = EventQueue(1, POLICY_SPILL, path)
+            event_queue.read_spill()
+            assert event_queue.get_nowait().data['entity_id'] == \
+                'light.kitchen'
+            event_queue.task_done()
+
+        assert event_queue.empty()
+        assert event_queue.unfinished_tasks == 0
+        assert not os.path.isfile(path)
+
+        with open(path, 'w') as fil:
+            fil.write('invalid\n')
+
+        event_queue = EventQueue(1, POLICY_SPILL, path)
+        event_queue.read_spill()
+        assert event_queue.stats()['depth'] == 0
+        assert event_queue.unfinished_tasks == 0
+
+
+def test_spill_file_is_read_without_lock():
+    """Test put does not wait while spilled events are read back."""
+    with tempfile.TemporaryDirectory() as tempdirname:
+        path = os.path.join(tempdirname, 'recorder.spill')
+        event_queue = EventQueue(1, POLICY_SPILL, path)
+        events = [_state_event('light.kitchen', str(idx))
+                  for idx in range(3)]
+        for event in events[:2]:
+            event_queue.put(event)
+        event_queue.write_spill()
+        assert event_queue.get_nowait() is events[0]
+        event_queue.task_done()
+        event_from_json = event_queue_module._event_from_json
+
+        def read_line(line):
+            """Put an event while the spill file is being read."""
+            assert not event_queue.mutex.locked()
+            event_queue.put(events[2])
+            return event_from_json(line)
+
+        with patch.object(event_queue_module, '_event_from_json',
+                          side_effect=read_line):
+            event_queue.read_spill()
+
+        assert _drain(event_queue) == events[1:]
+        assert event_queue.unfinished_tasks == 0
@@ -0,0 +1,76 @@
+"""The tests for the recorder history cache."""
+from datetime import timedelta
+
+import homeassistant.core as ha
+from homeassistant.components.recorder.history_cache import HistoryCache
+from homeassistant.const import EVENT_STATE_CHANGED
+import homeassistant.util.dt as dt_util
+
+
+def _state_event(entity_id, state, when):
+    """Return a state changed event."""
+    new_state = ha.State(entity_id, state, None, when, when)
+    return ha.Event(EVENT_STATE_CHANGED, {
+        'entity_id': entity_id,
+        'old_state': None,
+        'new_state': new_state,
+    }, time_fired=when)
+
+
+def test_keeps_state_at_start_of_period():
+    """Test expired states are dropped except the one at the start."""
+    now = dt_util.utcnow()
+    cache = HistoryCache(timedelta(hours=1), 100)
+    cache.seed([], now - timedelta(hours=3))
+
+    for minutes, state in ((170, 'a'), (120, 'b'), (30, 'c'), (0, 'd')):
+        cache.add(_state_event('light.kitchen', state,
+                               now - timedelta(minutes=minutes)))
+
+    states = cache.snapshot()['light.kitchen']
+    assert [state.state for state in states] == ['b', 'c', 'd']
+    assert cache.covers(now - timedelta(minutes=50))
+    assert not cache.covers(now - timedelta(minutes=70))
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_full_buffer_limits_coverage():
+    """Test coverage starts at the oldest state left in a full buffer."""
+    now = dt_util.utcnow()
+    cache = HistoryCache(timedelta(hours=1), 2)
+    cache.seed([ha.State('light.kitchen', 'on')], now - timedelta(hours=1))
+
+    for minutes in (40, 20, 10):
+        cache.add(_state_event('light.kitchen', str(minutes),
+                               now - timedelta(minutes=minutes)))
+
+    assert not cache.covers(now - timedelta(minutes=30))
+    assert cache.covers(now - timedelta(minutes=20))
+
+
+def test_removed_entity_is_recorded_empty():
+    """Test removing an entity is cached as an empty state."""
+    now = dt_util.utcnow()
+    cache = HistoryCache(timedelta(hours=1), 10)
+    cache.seed([], now)
+    cache.add(ha.Event(EVENT_STATE_CHANGED, {
+        'entity_id': 'light.kitchen',
+        'old_state': ha.State('light.kitchen', 'on'),
+        'new_state': None,
+    }, time_fired=now))
+
+    state, = cache.snapshot()['light.kitchen']
+    assert state.state == ''
+    assert state.last_updated == now
+
+
+def test_snapshot_of_entity():
+    """Test a snapshot can be limited to one entity."""
+    cache = HistoryCache(timedelta(hours=1), 10)
+    cache.seed([ha.State('light.kitchen', 'on'),
+                ha.State('light.hallway', 'off')])
+
+    assert list(cache.snapshot('light.kitchen')) == ['light.kitchen']
+    assert cache.snapshot('light.missing') == {}
+    assert sorted(cache.snapshot()) == ['light.hallway', 'light.kitchen']
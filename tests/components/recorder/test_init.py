@@ -392,3 +392,160 @@ def test_recorder_bad_execute(hass_recorder):
         res = recorder.execute((mck1,))
     assert res == []
     assert e_mock.call_count == 3
+
+
+def test_saving_batch_back_fills_event_id(hass_recorder):
+    """Test a batch of state changes is linked to its events."""
+    hass = hass_recorder({'commit_interval': 0.1, 'max_batch': 10})
+    for idx in range(5):
+        hass.states.set('test.recorder{}'.format(idx), 'on')
+    hass.block_till_done()
+    recorder._INSTANCE.block_till_done()
+
+    db_states = list(recorder.query('States'))
+    assert len(db_states) == 5
+    assert recorder._INSTANCE.last_batch_size > 0
+
+    events = recorder.get_model('Events')
+    for db_state in db_states:
+        db_event = recorder.query('Events').filter(
+            events.event_id == db_state.event_id).one()
+        assert db_event.event_type == 'state_changed'
+        assert db_state.entity_id in db_event.event_data
+
+
+def test_saving_batch_respects_max_batch(hass_recorder):
+    """Test that the batch size is capped by max_batch."""
+    hass = hass_recorder({'commit_interval': 1, 'max_batch': 2})
+    for idx in range(5):
+        hass.states.set('test.recorder{}'.format(idx), 'on')
+    hass.block_till_done()
+    recorder._INSTANCE.block_till_done()
+
+    assert recorder.query('States').count() == 5
+    assert recorder._INSTANCE.last_batch_size <= 2
+
+
+def test_saving_state_shares_attributes(hass_recorder):
+    """Test states with the same attributes share one attributes row."""
+    hass = hass_recorder()
+    attributes = {'test_attr': 5, 'test_attr_10': 'nice'}
+    for idx in range(3):
+        hass.states.set('test.recorder', 'state{}'.format(idx), attributes)
+        hass.block_till_done()
+    hass.states.set('test.recorder', 'state3', {'other': True})
+    hass.block_till_done()
+    recorder._INSTANCE.block_till_done()
+
+    db_states = list(recorder.query('States'))
+    assert len(db_states) == 4
+    assert all(db_state.attributes is None for db_state in db_states)
+    assert len({db_state.attributes_id for db_state in db_states}) == 2
+    assert recorder.query('StateAttributes').count() == 2
+
+    states = recorder.execute(recorder.query('States').order_by(
+        recorder.get_model('States').state_id))
+    assert [dict(state.attributes) for state in states] == \
+        [attributes] * 3 + [{'other': True}]
+
+
+def test_saving_state_attributes_cache_evicts(hass_recorder):
+    """Test the attributes cache is bounded."""
+    hass = hass_recorder()
+    with patch('homeassistant.components.recorder.ATTRIBUTES_CACHE_SIZE', 2):
+        for idx in range(4):
+            hass.states.set('test.recorder', 'on', {'idx': idx})
+            hass.block_till_done()
+        recorder._INSTANCE.block_till_done()
+
+    assert len(recorder._INSTANCE._attributes_ids) == 2
+    assert recorder.query('StateAttributes').count() == 4
+
+
+def test_purge_in_chunks_removes_unused_attributes(hass_recorder):
+    """Test purging by id range also removes unused attributes."""
+    hass = hass_recorder()
+    states = recorder.get_model('States')
+    for idx in range(5):
+        hass.states.set('test.recorder', 'on', {'idx': idx})
+        hass.block_till_done()
+    recorder._INSTANCE.block_till_done()
+
+    old_ids = [state.state_id for state in recorder.query('States')
+               .order_by(states.state_id).limit(3)]
+    with recorder.session_scope() as session:
+        recorder.query('States', session).filter(
+            states.state_id.in_(old_ids)).update(
+                {states.created: datetime.utcnow() - timedelta(days=5)},
+                synchronize_session=False)
+
+    recorder._INSTANCE.purge_days = 4
+    with patch('homeassistant.components.recorder.PURGE_BATCH_SIZE', 2):
+        recorder._INSTANCE._purge_old_data()
+
+    assert recorder.query('States').count() == 2
+    assert recorder.query('StateAttributes').count() == 2
+    assert len(recorder._INSTANCE._attributes_ids) == 0
+
+    # Attributes of purged states are stored again when they reappear
+    hass.states.set('test.recorder', 'on', {'idx': 0})
+    hass.block_till_done()
+    recorder._INSTANCE.block_till_done()
+    assert recorder.query('StateAttributes').count() == 3
+
+
+def test_purge_runs_on_recorder_thread(hass_recorder):
+    """Test a scheduled purge is started by the recorder thread."""
+    hass = hass_recorder()
+    instance = recorder._INSTANCE
+    with patch.object(instance, '_purge_steps',
+                      return_value=iter([None, None])) as purge_steps:
+        hass.add_job(instance.async_purge)
+        hass.block_till_done()
+        instance.block_till_done()
+
+    assert len(purge_steps.mock_calls) == 1
+
+
+def test_backfill_event_entities(hass_recorder):
+    """Test the entity columns of old events are filled in."""
+    hass_recorder()
+    events = recorder.get_model('Events')
+    with recorder.session_scope() as session:
+        state_event = events(event_type='state_changed', event_data='{}')
+        entry_event = events(event_type='logbook_entry', event_data=json.dumps(
+            {'name': 'Alarm', 'entity_id': 'alarm_control_panel.home'}))
+        other_event = events(event_type='test_event', event_data='{}')
+        session.add_all([state_event, entry_event, other_event])
+        session.flush()
+        session.add(recorder.get_model('States')(
+            entity_id='light.kitchen', domain='light', state='on',
+            event_id=state_event.event_id))
+        event_ids = [state_event.event_id, entry_event.event_id,
+                     other_event.event_id]
+
+    with patch('homeassistant.components.recorder.MIGRATION_BATCH_SIZE', 2):
+        recorder._INSTANCE._backfill_event_entities()
+
+    rows = recorder.get_instance().get_session().query(
+        events.event_id, events.entity_id, events.domain).filter(
+            events.event_id.in_(event_ids)).order_by(events.event_id)
+    assert [tuple(row)[1:] for row in rows] == [
+        ('light.kitchen', 'light'),
+        ('alarm_control_panel.home', 'alarm_control_panel'),
+        (None, None)]
+
+
+def test_existing_database_switches_to_incremental_vacuum(hass_recorder):
+    """Test a database without incremental vacuum is switched at startup."""
+    hass_recorder()
+    instance = recorder.get_instance()
+    instance.engine.execute("PRAGMA auto_vacuum = NONE")
+    instance.engine.execute("VACUUM")
+    assert instance.engine.execute("PRAGMA auto_vacuum").scalar() == 0
+    assert list(instance._vacuum_steps()) == []
+
+    instance._enable_incremental_vacuum()
+
+    assert instance.engine.execute("PRAGMA auto_vacuum").scalar() == \
+        recorder.SQLITE_AUTO_VACUUM_INCREMENTAL
@@ -9,7 +9,7 @@ import homeassistant.core as ha
 from homeassistant.const import EVENT_STATE_CHANGED
 from homeassistant.util import dt
 from homeassistant.components.recorder.models import (
-    Base, Events, States, RecorderRuns)
+    Base, Events, States, StateAttributes, RecorderRuns)
 
 ENGINE = None
 SESSION = None
@@ -47,6 +47,23 @@ class TestEvents(unittest.TestCase):
         })
         assert event == Events.from_event(event).to_native()
 
+    def test_from_event_entity_columns(self):
+        """Test the entity columns are copied from the event data."""
+        dbevent = Events.from_event(ha.Event('logbook_entry', {
+            'entity_id': 'switch.kitchen'}))
+        assert dbevent.entity_id == 'switch.kitchen'
+        assert dbevent.domain == 'switch'
+
+        dbevent = Events.from_event(ha.Event('logbook_entry', {
+            'domain': 'automation'}))
+        assert dbevent.entity_id is None
+        assert dbevent.domain == 'automation'
+
+        dbevent = Events.from_event(ha.Event('call_service', {
+            'service_data': {}, 'entity_id': ['light.a', 'light.b']}))
+        assert dbevent.entity_id is None
+        assert dbevent.domain is None
+
 
 class TestStates(unittest.TestCase):
     """Test States model."""
@@ -142,3 +159,36 @@ class TestRecorderRuns(unittest.TestCase):
 
         assert sorted(run.entity_ids()) == ['sensor.humidity', 'sensor.lux']
         assert run.entity_ids(in_run2) == ['sensor.humidity']
+
+
+class TestStateAttributes(unittest.TestCase):
+    """Test StateAttributes model."""
+
+    # pylint: disable=no-self-use
+    def test_shared_attrs_from_event(self):
+        """Test attributes are serialized independent of key order."""
+        state = ha.State('sensor.temperature', '18',
+                         {'unit': 'C', 'friendly_name': 'Temp'})
+        event = ha.Event(EVENT_STATE_CHANGED, {
+            'entity_id': 'sensor.temperature',
+            'old_state': None,
+            'new_state': state,
+        })
+        shared_attrs = StateAttributes.shared_attrs_from_event(event)
+        assert shared_attrs == '{"friendly_name": "Temp", "unit": "C"}'
+        assert StateAttributes.hash_shared_attrs(shared_attrs) == \
+            StateAttributes.hash_shared_attrs(
+                '{"friendly_name": "Temp", "unit": "C"}')
+
+    def test_to_native_with_shared_attributes(self):
+        """Test converting a state that references shared attributes."""
+        state = ha.State('sensor.temperature', '18', {'unit': 'C'})
+        event = ha.Event(EVENT_STATE_CHANGED, {
+            'entity_id': 'sensor.temperature',
+            'old_state': None,
+            'new_state': state,
+        })
+        db_state = States.from_event(event)
+        db_state.state_attributes = StateAttributes(
+            shared_attrs=StateAttributes.shared_attrs_from_event(event))
+        assert state == db_state.to_native()
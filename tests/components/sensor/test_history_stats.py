@@ -102,6 +102,44 @@ class TestHistoryStatsSensor(unittest.TestCase):
         self.assertEqual(sensor2.value, 0)
         self.assertEqual(sensor1.device_state_attributes['ratio'], '50.0%')
 
+    def test_measure_incremental(self):
+        """Test changes are counted without querying the history again."""
+        now = dt_util.utcnow()
+        fake_states = {
+            'binary_sensor.test_id': [
+                ha.State('binary_sensor.test_id', 'off',
+                         last_changed=now - timedelta(minutes=30)),
+            ]
+        }
+
+        start = Template('{{ as_timestamp(now()) - 3600 }}', self.hass)
+        end = Template('{{ now() }}', self.hass)
+
+        sensor = HistoryStatsSensor(
+            self.hass, 'binary_sensor.test_id', 'on', start, end, None, 'Test')
+
+        with patch('homeassistant.components.history.'
+                   'state_changes_during_period', return_value=fake_states):
+            with patch('homeassistant.components.history.get_state',
+                       return_value=None):
+                sensor.update()
+
+        self.assertEqual(sensor.value, 0)
+
+        with patch('homeassistant.components.history.'
+                   'state_changes_during_period') as changes:
+            sensor._add_change(
+                dt_util.as_timestamp(now - timedelta(minutes=10)), True)
+            sensor.update()
+            self.assertAlmostEqual(sensor.value, 10 / 60, places=2)
+
+            sensor._add_change(
+                dt_util.as_timestamp(now - timedelta(minutes=5)), False)
+            sensor.update()
+            self.assertAlmostEqual(sensor.value, 5 / 60, places=2)
+
+        self.assertFalse(changes.called)
+
     def test_wrong_date(self):
         """Test when start or end value is not a timestamp or a date."""
         good = Template('{{ now() }}', self.hass)
@@ -1,10 +1,14 @@
 """The test for the statistics sensor platform."""
 import unittest
 import statistics
+from datetime import timedelta
+from unittest.mock import patch
 
 from homeassistant.bootstrap import setup_component
+from homeassistant.components.sensor.statistics import WindowStatistics
 from homeassistant.const import (ATTR_UNIT_OF_MEASUREMENT, TEMP_CELSIUS)
-from tests.common import get_test_home_assistant
+import homeassistant.util.dt as dt_util
+from tests.common import get_test_home_assistant, fire_time_changed
 
 
 class TestStatisticsSensor(unittest.TestCase):
@@ -95,3 +99,89 @@ class TestStatisticsSensor(unittest.TestCase):
 
         self.assertEqual(3.8, state.attributes.get('min_value'))
         self.assertEqual(14, state.attributes.get('max_value'))
+
+    def test_max_age(self):
+        """Test values older than max_age are dropped."""
+        now = dt_util.utcnow()
+        mock_data = {'return_time': now}
+
+        def mock_now():
+            return mock_data['return_time']
+
+        with patch('homeassistant.util.dt.utcnow', new=mock_now):
+            assert setup_component(self.hass, 'sensor', {
+                'sensor': {
+                    'platform': 'statistics',
+                    'name': 'test',
+                    'entity_id': 'sensor.test_monitored',
+                    'max_age': {'minutes': 3},
+                }
+            })
+
+            for value in self.values:
+                self.hass.states.set('sensor.test_monitored', value,
+                                     {ATTR_UNIT_OF_MEASUREMENT: TEMP_CELSIUS})
+                self.hass.block_till_done()
+                mock_data['return_time'] += timedelta(minutes=1)
+
+            state = self.hass.states.get('sensor.test_mean')
+
+            self.assertEqual(6, state.attributes.get('min_value'))
+            self.assertEqual(14, state.attributes.get('max_value'))
+            self.assertEqual(round(statistics.mean([6.7, 14, 6]), 2),
+                             state.attributes.get('mean'))
+
+            mock_data['return_time'] += timedelta(minutes=1)
+            fire_time_changed(self.hass, mock_data['return_time'])
+            self.hass.block_till_done()
+
+        state = self.hass.states.get('sensor.test_mean')
+
+        self.assertEqual(6, state.attributes.get('max_value'))
+        self.assertEqual('unknown', state.attributes.get('mean'))
+
+    def test_unlimited_sampling_size(self):
+        """Test all values are included when the size is unlimited."""
+        assert setup_component(self.hass, 'sensor', {
+            'sensor': {
+                'platform': 'statistics',
+                'name': 'test',
+                'entity_id': 'sensor.test_monitored',
+                'sampling_size': 0,
+            }
+        })
+
+        for value in self.values * 3:
+            self.hass.states.set('sensor.test_monitored', value,
+                                 {ATTR_UNIT_OF_MEASUREMENT: TEMP_CELSIUS})
+            self.hass.block_till_done()
+
+        state = self.hass.states.get('sensor.test_mean')
+
+        self.assertEqual(self.min, state.attributes.get('min_value'))
+        self.assertEqual(self.max, state.attributes.get('max_value'))
+        self.assertEqual(self.mean, state.attributes.get('mean'))
+        self.assertEqual('unlimited', state.attributes.get('sampling_size'))
+        self.assertEqual(self.median, state.attributes.get('median'))
+
+
+class TestWindowStatistics(unittest.TestCase):
+    """Test the running statistics of a window."""
+
+    def test_matches_statistics(self):
+        """Test the running values match the statistics module."""
+        window = WindowStatistics(5)
+        values = [17, 20, 15.2, 5, 3.8, 9.2, 6.7, 14, 6, 6, 6, 20]
+
+        for idx, value in enumerate(values):
+            window.add(value, idx)
+            last = values[max(0, idx - 4):idx + 1]
+
+            self.assertEqual(min(last), window.min)
+            self.assertEqual(max(last), window.max)
+            self.assertEqual(statistics.median(last), window.median)
+            self.assertAlmostEqual(sum(last), window.total)
+            self.assertAlmostEqual(statistics.mean(last), window.mean)
+            if len(last) > 1:
+                self.assertAlmostEqual(statistics.variance(last),
+                                       window.variance)
@@ -12,6 +12,9 @@ import requests
 from homeassistant import bootstrap, const
 import homeassistant.core as ha
 import homeassistant.components.http as http
+from homeassistant.helpers import template
+from homeassistant.components import recorder
+from homeassistant.components.recorder.event_queue import EventQueue
 
 from tests.common import get_test_instance_port, get_test_home_assistant
 
@@ -247,6 +250,29 @@ class TestAPI(unittest.TestCase):
                            headers=HA_HEADERS)
         self.assertEqual(hass.config.components, set(req.json()))
 
+    def test_api_get_startup_profile(self):
+        """Test the return of the startup profile."""
+        req = requests.get(_url(const.URL_API_STARTUP_PROFILE),
+                           headers=HA_HEADERS)
+        data = req.json()
+        self.assertIn('setup', data['components']['api'])
+        self.assertIn('critical_path', data)
+
+    def test_api_get_recorder_queue(self):
+        """Test the recorder queue is not reported without recorder."""
+        req = requests.get(_url(const.URL_API_RECORDER_QUEUE),
+                           headers=HA_HEADERS)
+        self.assertEqual(404, req.status_code)
+
+        hass.data[recorder.DATA_QUEUE] = EventQueue()
+        try:
+            req = requests.get(_url(const.URL_API_RECORDER_QUEUE),
+                               headers=HA_HEADERS)
+        finally:
+            del hass.data[recorder.DATA_QUEUE]
+        self.assertEqual({'depth': 0, 'overflowing': False, 'dropped': 0,
+                          'coalesced': 0, 'spilled': 0}, req.json())
+
     def test_api_get_error_log(self):
         """Test the return of the error log."""
         test_string = 'Test String°'
@@ -344,6 +370,17 @@ class TestAPI(unittest.TestCase):
 
         self.assertEqual('10', req.text)
 
+    def test_api_template_stats(self):
+        """Test the template render counts."""
+        rendered = template.render_stats()['rendered']
+        requests.post(
+            _url(const.URL_API_TEMPLATE), json={"template": '{{ 1 + 1 }}'},
+            headers=HA_HEADERS)
+
+        req = requests.get(_url(const.URL_API_TEMPLATE_STATS),
+                           headers=HA_HEADERS)
+        self.assertEqual(rendered + 1, req.json()['rendered'])
+
     def test_api_template_error(self):
         """Test the template API."""
         hass.states.set('sensor.temperature', 10)
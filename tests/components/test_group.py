@@ -7,8 +7,9 @@ from unittest.mock import patch
 from homeassistant.bootstrap import setup_component
 from homeassistant.const import (
     STATE_ON, STATE_OFF, STATE_HOME, STATE_UNKNOWN, ATTR_ICON, ATTR_HIDDEN,
-    ATTR_ASSUMED_STATE, STATE_NOT_HOME, )
+    ATTR_ASSUMED_STATE, STATE_NOT_HOME, ATTR_ENTITY_ID)
 import homeassistant.components.group as group
+from homeassistant.helpers.event import DATA_STATE_CHANGE_INDEX
 
 from tests.common import get_test_home_assistant
 
@@ -282,6 +283,89 @@ class TestComponentsGroup(unittest.TestCase):
             sorted(group.expand_entity_ids(self.hass,
                                            ['group.group_of_groups'])))
 
+    def test_expand_entity_ids_follows_nested_group_changes(self):
+        """Test expanding a group follows changes of nested groups."""
+        self.hass.states.set('group.inner', STATE_ON,
+                             {ATTR_ENTITY_ID: ['light.test_1']})
+        self.hass.states.set('group.outer', STATE_ON,
+                             {ATTR_ENTITY_ID: ['group.inner', 'group.outer',
+                                               'light.test_1']})
+
+        self.assertEqual(
+            ['light.test_1'],
+            group.expand_entity_ids(self.hass, ['group.outer']))
+
+        self.hass.states.set('group.inner', STATE_ON,
+                             {ATTR_ENTITY_ID: ['light.test_2',
+                                               'light.test_1']})
+
+        self.assertEqual(
+            ['light.test_2', 'light.test_1', 'switch.test'],
+            group.expand_entity_ids(self.hass,
+                                    ['Group.Outer', 'switch.test']))
+
+    def test_expand_entity_ids_cache_follows_member_changes(self):
+        """Test cached expansions are dropped when group members change."""
+        group.Group.create_group(self.hass, 'inner', ['light.test_1'])
+        group.Group.create_group(
+            self.hass, 'outer', ['group.inner', 'light.test_3'])
+
+        self.assertEqual(
+            ['light.test_1', 'light.test_3'],
+            group.expand_entity_ids(self.hass, ['group.outer']))
+        self.assertEqual(
+            ('light.test_1', 'light.test_3'),
+            self.hass.data[group.DATA_EXPANDED_GROUPS]['group.outer'])
+
+        # A change of the group state alone keeps the cache
+        self.hass.states.set('light.test_1', STATE_ON)
+        self.hass.block_till_done()
+        self.assertIn(
+            'group.outer', self.hass.data[group.DATA_EXPANDED_GROUPS])
+
+        self.hass.states.set('group.inner', STATE_ON,
+                             {ATTR_ENTITY_ID: ['light.test_2']})
+        self.hass.block_till_done()
+        self.assertEqual({}, self.hass.data[group.DATA_EXPANDED_GROUPS])
+        self.assertEqual(
+            ['light.test_2', 'light.test_3'],
+            group.expand_entity_ids(self.hass, ['group.outer']))
+
+        self.hass.states.remove('group.outer')
+        self.hass.block_till_done()
+        self.assertEqual({}, self.hass.data[group.DATA_EXPANDED_GROUPS])
+        self.assertEqual(
+            [], group.expand_entity_ids(self.hass, ['group.outer']))
+        self.assertEqual({}, self.hass.data[group.DATA_EXPANDED_GROUPS])
+
+    def test_group_state_counts_members(self):
+        """Test the group state follows changes of single members."""
+        self.hass.states.set('light.Bowl', STATE_ON)
+        self.hass.states.set('light.Ceiling', STATE_ON)
+        test_group = group.Group.create_group(
+            self.hass, 'init_group',
+            ['light.Bowl', 'light.Ceiling', 'light.Bowl'], False)
+
+        self.hass.states.set('light.Bowl', STATE_OFF)
+        self.hass.block_till_done()
+        self.assertEqual(
+            STATE_ON, self.hass.states.get(test_group.entity_id).state)
+
+        self.hass.states.set('light.Ceiling', STATE_OFF)
+        self.hass.block_till_done()
+        self.assertEqual(
+            STATE_OFF, self.hass.states.get(test_group.entity_id).state)
+
+        self.hass.states.set('light.Bowl', STATE_ON)
+        self.hass.block_till_done()
+        self.assertEqual(
+            STATE_ON, self.hass.states.get(test_group.entity_id).state)
+
+        self.hass.states.remove('light.Bowl')
+        self.hass.block_till_done()
+        self.assertEqual(
+            STATE_OFF, self.hass.states.get(test_group.entity_id).state)
+
     def test_set_assumed_state_based_on_tracked(self):
         """Test assumed state."""
         self.hass.states.set('light.Bowl', STATE_ON)
@@ -336,7 +420,14 @@ class TestComponentsGroup(unittest.TestCase):
 
         assert sorted(self.hass.states.entity_ids()) == \
             ['group.empty_group', 'group.second_group', 'group.test_group']
-        assert self.hass.bus.listeners['state_changed'] == 3
+        subscriptions = self.hass.data[DATA_STATE_CHANGE_INDEX]._subscriptions
+        assert sorted(subscriptions) == \
+            ['hello.world', 'light.bowl', 'sensor.happy']
+        assert subscriptions['hello.world'] == subscriptions['sensor.happy']
+        listeners = set(subscriptions['light.bowl'] +
+                        subscriptions['hello.world'])
+        assert len(listeners) == 2
+        assert self.hass.bus.listeners['state_changed'] == 1
 
         with patch('homeassistant.config.load_yaml_config_file', return_value={
                 'group': {
@@ -349,6 +440,9 @@ class TestComponentsGroup(unittest.TestCase):
             self.hass.block_till_done()
 
         assert self.hass.states.entity_ids() == ['group.hello']
+        assert list(subscriptions) == ['light.bowl']
+        assert len(subscriptions['light.bowl']) == 1
+        assert not listeners & set(subscriptions['light.bowl'])
         assert self.hass.bus.listeners['state_changed'] == 1
 
     def test_stopping_a_group(self):
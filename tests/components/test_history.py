@@ -1,6 +1,7 @@
 """The tests the History component."""
 # pylint: disable=protected-access,invalid-name
 from datetime import timedelta
+import json
 import unittest
 from unittest.mock import patch, sentinel
 
@@ -8,6 +9,7 @@ from homeassistant.bootstrap import setup_component
 import homeassistant.core as ha
 import homeassistant.util.dt as dt_util
 from homeassistant.components import history, recorder
+from homeassistant.remote import JSONEncoder
 
 from tests.common import (
     init_recorder_component, mock_http_component, mock_state_change_event,
@@ -25,9 +27,9 @@ class TestComponentHistory(unittest.TestCase):
         """Stop everything that was started."""
         self.hass.stop()
 
-    def init_recorder(self):
+    def init_recorder(self, config=None):
         """Initialize the recorder."""
-        init_recorder_component(self.hass)
+        init_recorder_component(self.hass, config)
         self.hass.start()
         recorder.get_instance().block_till_db_ready()
         self.wait_recording_done()
@@ -94,6 +96,43 @@ class TestComponentHistory(unittest.TestCase):
         self.assertEqual(
             states[0], history.get_state(future, states[0].entity_id))
 
+    def test_get_last_states(self):
+        """Test the last states of several entities are looked up at once."""
+        self.init_recorder()
+
+        def set_state(entity_id, state):
+            """Set the state."""
+            self.hass.states.set(entity_id, state)
+            self.wait_recording_done()
+            return self.hass.states.get(entity_id)
+
+        start = dt_util.utcnow()
+        point = start + timedelta(seconds=1)
+        end = point + timedelta(seconds=1)
+
+        with patch('homeassistant.components.recorder.dt_util.utcnow',
+                   return_value=start):
+            set_state('light.kitchen', 'on')
+            light = set_state('light.kitchen', 'off')
+            switch = set_state('switch.hall', 'on')
+
+        with patch('homeassistant.components.recorder.dt_util.utcnow',
+                   return_value=end):
+            set_state('light.kitchen', 'on')
+            set_state('sensor.new', '1')
+
+        states = history.get_last_states(
+            point, ['light.kitchen', 'switch.hall', 'sensor.new'])
+
+        self.assertEqual(
+            [light, switch], sorted(states, key=lambda state: state.entity_id))
+        self.assertEqual(switch, history.get_state(point, 'switch.hall'))
+
+        # States recorded before the start of the run are not returned
+        run = recorder.get_model('RecorderRuns')(start=point)
+        self.assertEqual(
+            [], history.get_last_states(end, ['switch.hall'], run))
+
     def test_state_changes_during_period(self):
         """Test state change during period."""
         self.init_recorder()
@@ -132,6 +171,33 @@ class TestComponentHistory(unittest.TestCase):
 
         self.assertEqual(states, hist[entity_id])
 
+    def test_state_changes_during_period_from_cache(self):
+        """Test the cache returns the same changes as the database."""
+        self.init_recorder({recorder.CONF_CACHE_HOURS: 1})
+        self.hass.states.set('light.a', 'on')
+        self.hass.states.set('light.b', 'on')
+        self.wait_recording_done()
+
+        start = dt_util.utcnow() + timedelta(seconds=1)
+        end = start + timedelta(seconds=2)
+        with patch('homeassistant.components.recorder.dt_util.utcnow',
+                   return_value=start + timedelta(seconds=1)):
+            self.hass.states.set('light.a', 'off')
+            self.hass.states.set('light.b', 'off')
+            self.wait_recording_done()
+
+        def changes():
+            """Return the states of the changes of light.a."""
+            hist = history.state_changes_during_period(start, end, 'light.a')
+            return {entity_id: [state.state for state in states]
+                    for entity_id, states in hist.items()}
+
+        cached = changes()
+        assert recorder.get_instance().history_cache.hits == 1
+
+        with patch.object(recorder.get_instance(), 'history_cache', None):
+            assert changes() == cached == {'light.a': ['on', 'off']}
+
     def test_get_significant_states(self):
         """Test that only significant states are returned.
 
@@ -144,6 +210,96 @@ class TestComponentHistory(unittest.TestCase):
             zero, four, filters=history.Filters())
         assert states == hist
 
+    def test_get_significant_states_from_cache(self):
+        """Test significant states are served by the recorder cache."""
+        zero, four, states = self.record_states({
+            recorder.CONF_CACHE_HOURS: 1})
+        cache = recorder.get_instance().history_cache
+
+        with patch('homeassistant.components.history.'
+                   '_significant_states_query') as query:
+            hist = history.get_significant_states(
+                zero, four, filters=history.Filters())
+
+        assert not query.called
+        assert states == hist
+        assert cache.hits == 1
+        assert cache.misses == 0
+
+    def test_get_significant_states_cache_miss(self):
+        """Test periods the cache does not cover are read from the db."""
+        zero, four, states = self.record_states({
+            recorder.CONF_CACHE_HOURS: 1})
+        cache = recorder.get_instance().history_cache
+
+        hist = history.get_significant_states(
+            zero - timedelta(hours=2), four, filters=history.Filters())
+
+        assert states == hist
+        assert cache.hits == 0
+        assert cache.misses == 1
+
+    def test_stream_significant_states(self):
+        """Test that streamed states match the significant states."""
+        zero, four, states = self.record_states()
+
+        with patch('homeassistant.components.history.STREAM_CHUNK_STATES',
+                   2):
+            chunks = list(history.stream_significant_states(
+                zero, four, filters=history.Filters()))
+
+        assert len(chunks) > 2
+        hist = json.loads(''.join(chunks))
+        expected = json.loads(json.dumps(
+            list(states.values()), cls=JSONEncoder))
+        assert sorted(hist, key=lambda states: states[0]['entity_id']) == \
+            sorted(expected, key=lambda states: states[0]['entity_id'])
+
+    def test_get_aggregated_states(self):
+        """Test numeric states are aggregated per bucket."""
+        self.init_recorder()
+        entity_id = 'sensor.temperature'
+        zero = dt_util.utcnow()
+
+        for offset, value in ((1, 10), (2, 20), (3, 'unknown'), (11, 5),
+                              (12, 7)):
+            with patch('homeassistant.components.recorder.dt_util.utcnow',
+                       return_value=zero + timedelta(seconds=offset)):
+                self.hass.states.set(entity_id, value)
+                self.hass.states.set('sensor.text', 'text{}'.format(offset))
+                self.wait_recording_done()
+
+        hist = history.get_aggregated_states(
+            zero, zero + timedelta(seconds=20), timedelta(seconds=10))
+
+        assert list(hist) == [entity_id]
+        first, second = hist[entity_id]
+        assert first['start'] == zero
+        assert (first['min'], first['mean'], first['max'], first['count']) \
+            == (10, 15, 20, 2)
+        assert second['start'] == zero + timedelta(seconds=10)
+        assert (second['min'], second['mean'], second['max'],
+                second['count']) == (5, 6, 7, 2)
+
+    def test_get_aggregated_states_not_finite(self):
+        """Test aggregates that are not finite are None."""
+        self.init_recorder()
+        entity_id = 'sensor.power'
+        zero = dt_util.utcnow()
+
+        for offset, value in ((1, 5), (2, 'inf')):
+            with patch('homeassistant.components.recorder.dt_util.utcnow',
+                       return_value=zero + timedelta(seconds=offset)):
+                self.hass.states.set(entity_id, value)
+                self.wait_recording_done()
+
+        hist = history.get_aggregated_states(
+            zero, zero + timedelta(seconds=10), timedelta(seconds=10))
+
+        bucket, = hist[entity_id]
+        assert (bucket['min'], bucket['mean'], bucket['max'],
+                bucket['count']) == (5, None, None, 2)
+
     def test_get_significant_states_entity_id(self):
         """Test that only significant states are returned for one entity."""
         zero, four, states = self.record_states()
@@ -358,13 +514,13 @@ class TestComponentHistory(unittest.TestCase):
         hist = history.get_significant_states(zero, four, filters=filters)
         assert states == hist
 
-    def record_states(self):
+    def record_states(self, recorder_config=None):
         """Record some test states.
 
         We inject a bunch of state updates from media player, zone and
         thermostat.
         """
-        self.init_recorder()
+        self.init_recorder(recorder_config)
         mp = 'media_player.test'
         mp2 = 'media_player.test2'
         therm = 'thermostat.test'
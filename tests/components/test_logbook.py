@@ -1,11 +1,12 @@
 """The tests for the logbook component."""
 # pylint: disable=protected-access,invalid-name
+import json
 import logging
 from datetime import timedelta
 import unittest
 from unittest.mock import patch
 
-from homeassistant.components import sun
+from homeassistant.components import recorder, sun
 import homeassistant.core as ha
 from homeassistant.const import (
     EVENT_STATE_CHANGED, EVENT_HOMEASSISTANT_START, EVENT_HOMEASSISTANT_STOP,
@@ -93,6 +94,106 @@ class TestComponentLogbook(unittest.TestCase):
 
         self.assertEqual(0, len(calls))
 
+    def test_stream_logbook_pages(self):
+        """Test the streamed logbook continues after an event_id."""
+        for state in ('on', 'off', 'on', 'off'):
+            self.hass.states.set('switch.test', state)
+            self.hass.states.set('light.test', state)
+            self.hass.block_till_done()
+        recorder.get_instance().block_till_done()
+
+        start = dt_util.utcnow() - timedelta(hours=1)
+        end = start + timedelta(days=1)
+        entries = json.loads(''.join(
+            logbook.stream_logbook(start, end, self.EMPTY_CONFIG)))
+        self.assertEqual(
+            6, len([entry for entry in entries if entry['entity_id']]))
+
+        first = json.loads(''.join(
+            logbook.stream_logbook(start, end, self.EMPTY_CONFIG, limit=2)))
+        rest = json.loads(''.join(logbook.stream_logbook(
+            start, end, self.EMPTY_CONFIG, after=first[-1]['event_id'])))
+        self.assertEqual(2, len(first))
+        self.assertEqual(entries, first + rest)
+
+    def test_stream_logbook_filters_in_query(self):
+        """Test the include and exclude config filters recorded states."""
+        for state in ('on', 'off'):
+            self.hass.states.set('switch.test', state)
+            self.hass.states.set('switch.other', state)
+            self.hass.states.set('light.test', state)
+            self.hass.block_till_done()
+        recorder.get_instance().block_till_done()
+
+        config = logbook.CONFIG_SCHEMA({
+            ha.DOMAIN: {},
+            logbook.DOMAIN: {
+                logbook.CONF_EXCLUDE: {
+                    logbook.CONF_DOMAINS: ['switch', ]},
+                logbook.CONF_INCLUDE: {
+                    logbook.CONF_ENTITIES: ['switch.test', ]}}})
+        start = dt_util.utcnow() - timedelta(hours=1)
+        end = start + timedelta(days=1)
+
+        with patch('homeassistant.components.logbook._exclude_events',
+                   side_effect=lambda events, config: events):
+            entries = json.loads(''.join(
+                logbook.stream_logbook(start, end, config)))
+
+        self.assertEqual(
+            ['light.test', 'switch.test'],
+            sorted({entry['entity_id'] for entry in entries
+                    if entry['entity_id']}))
+
+    def test_exclude_entry_domain_of_entity(self):
+        """Test entries without domain are filtered by their entity_id."""
+        logbook.log_entry(self.hass, 'Alarm', 'triggered',
+                          entity_id='switch.test')
+        logbook.log_entry(self.hass, 'Alarm', 'triggered',
+                          entity_id='light.test')
+        self.hass.block_till_done()
+        recorder.get_instance().block_till_done()
+
+        config = logbook.CONFIG_SCHEMA({
+            ha.DOMAIN: {},
+            logbook.DOMAIN: {
+                logbook.CONF_EXCLUDE: {
+                    logbook.CONF_DOMAINS: ['switch', ]}}})
+        start = dt_util.utcnow() - timedelta(hours=1)
+        end = start + timedelta(days=1)
+
+        entries = json.loads(''.join(
+            logbook.stream_logbook(start, end, config)))
+        with patch('homeassistant.components.logbook._entity_filter',
+                   return_value=None):
+            unfiltered = json.loads(''.join(
+                logbook.stream_logbook(start, end, config)))
+
+        for result in (entries, unfiltered):
+            self.assertEqual(
+                ['light.test'],
+                [entry['entity_id'] for entry in result
+                 if entry['name'] == 'Alarm'])
+
+    def test_stream_logbook_entity(self):
+        """Test the streamed logbook of a single entity."""
+        for state in ('on', 'off', 'on'):
+            self.hass.states.set('switch.test', state)
+            self.hass.states.set('light.test', state)
+            self.hass.block_till_done()
+        logbook.log_entry(self.hass, 'Alarm', 'triggered',
+                          entity_id='light.test')
+        self.hass.block_till_done()
+        recorder.get_instance().block_till_done()
+
+        start = dt_util.utcnow() - timedelta(hours=1)
+        end = start + timedelta(days=1)
+        entries = json.loads(''.join(logbook.stream_logbook(
+            start, end, self.EMPTY_CONFIG, entity_id='light.test')))
+
+        self.assertEqual(['turned off', 'turned on', 'triggered'],
+                         [entry['message'] for entry in entries])
+
     def test_humanify_filter_sensor(self):
         """Test humanify filter too frequent sensor values."""
         entity_id = 'sensor.bla'
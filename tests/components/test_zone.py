@@ -139,3 +139,57 @@ class TestComponentZone(unittest.TestCase):
 
         assert zone.in_zone(self.hass.states.get('zone.passive_zone'),
                             latitude, longitude)
+
+    def test_active_zones(self):
+        """Test looking up the active zones of many coordinates."""
+        assert bootstrap.setup_component(self.hass, zone.DOMAIN, {
+            'zone': [
+                {
+                    'name': 'Office',
+                    'latitude': 32.880600,
+                    'longitude': -117.237561,
+                    'radius': 250,
+                },
+                {
+                    'name': 'Date line',
+                    'latitude': 0,
+                    'longitude': 179.9999,
+                    'radius': 100,
+                },
+            ]
+        })
+
+        zones = zone.active_zones(self.hass, [
+            (32.880600, -117.237561),
+            (32.880600, -117.237561, 10),
+            (32.9, -117.237561),
+            (32.9, -117.237561, 3000),
+            (0, -179.9999),
+            (self.hass.config.latitude, self.hass.config.longitude),
+        ])
+        assert [state and state.entity_id for state in zones] == [
+            'zone.office', 'zone.office', None, 'zone.office',
+            'zone.date_line', 'zone.home']
+
+    def test_active_zone_follows_zone_changes(self):
+        """Test the zone index is rebuilt when a zone changes."""
+        assert bootstrap.setup_component(self.hass, zone.DOMAIN, {
+            'zone': None})
+        assert zone.active_zone(self.hass, 10, 10) is None
+
+        self.hass.states.set('zone.moved', zone.STATE, {
+            'latitude': 10,
+            'longitude': 10,
+            'radius': 100,
+        })
+        self.hass.block_till_done()
+        assert zone.active_zone(self.hass, 10, 10).entity_id == 'zone.moved'
+
+        self.hass.states.set('zone.moved', zone.STATE, {
+            'latitude': 10,
+            'longitude': 10,
+            'radius': 100,
+            'passive': True,
+        })
+        self.hass.block_till_done()
+        assert zone.active_zone(self.hass, 10, 10) is None
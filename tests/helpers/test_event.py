@@ -8,7 +8,8 @@ from astral import Astral
 
 from homeassistant.bootstrap import setup_component
 import homeassistant.core as ha
-from homeassistant.const import MATCH_ALL
+from homeassistant.const import (
+    MATCH_ALL, EVENT_STATE_CHANGED, EVENT_TIME_CHANGED)
 from homeassistant.helpers.event import (
     track_point_in_utc_time,
     track_point_in_time,
@@ -17,12 +18,14 @@ from homeassistant.helpers.event import (
     track_state_change,
     track_time_interval,
     track_template,
+    async_track_template_states,
     track_sunrise,
     track_sunset,
 )
 from homeassistant.helpers.template import Template
 from homeassistant.components import sun
 import homeassistant.util.dt as dt_util
+from homeassistant.util.async import run_callback_threadsafe
 
 from tests.common import get_test_home_assistant
 
@@ -79,6 +82,32 @@ class TestEventHelpers(unittest.TestCase):
         self.hass.block_till_done()
         self.assertEqual(2, len(runs))
 
+    def test_track_point_in_time_shares_bus_listener(self):
+        """Test point in time listeners share one time_changed listener."""
+        now = dt_util.utcnow()
+        runs = []
+
+        track_point_in_utc_time(
+            self.hass, lambda x: runs.append(1), now)
+        old_count = self.hass.bus.listeners[EVENT_TIME_CHANGED]
+
+        unsubs = [
+            track_point_in_utc_time(
+                self.hass, lambda x: runs.append(1),
+                now + timedelta(seconds=idx))
+            for idx in range(1, 50)]
+        track_utc_time_change(
+            self.hass, lambda x: runs.append(1), year=2000)
+        self.assertEqual(old_count, self.hass.bus.listeners[
+            EVENT_TIME_CHANGED])
+
+        for unsub in unsubs[::2]:
+            unsub()
+
+        self._send_time_changed(now + timedelta(seconds=49))
+        self.hass.block_till_done()
+        self.assertEqual(25, len(runs))
+
     def test_track_time_change(self):
         """Test tracking time change."""
         wildcard_runs = []
@@ -190,6 +219,38 @@ class TestEventHelpers(unittest.TestCase):
         self.assertEqual(5, len(wildcard_runs))
         self.assertEqual(6, len(wildercard_runs))
 
+    def test_track_state_change_shares_bus_listener(self):
+        """Test state change tracking uses one bus listener."""
+        runs = []
+
+        def run_callback(entity_id, old_state, new_state):
+            runs.append(entity_id)
+
+        old_count = self.hass.bus.listeners.get(EVENT_STATE_CHANGED, 0)
+
+        unsub_bowl = track_state_change(
+            self.hass, ['light.Bowl', 'light.bowl'], run_callback)
+        unsub_ceiling = track_state_change(
+            self.hass, 'light.ceiling', run_callback)
+
+        self.assertEqual(old_count + 1,
+                         self.hass.bus.listeners[EVENT_STATE_CHANGED])
+
+        self.hass.states.set('light.bowl', 'on')
+        self.hass.states.set('light.ceiling', 'on')
+        self.hass.states.set('light.kitchen', 'on')
+        self.hass.block_till_done()
+        self.assertEqual(['light.bowl', 'light.ceiling'], sorted(runs))
+
+        unsub_bowl()
+        self.hass.states.set('light.bowl', 'off')
+        self.hass.block_till_done()
+        self.assertEqual(2, len(runs))
+
+        unsub_ceiling()
+        self.assertEqual(old_count, self.hass.bus.listeners.get(
+            EVENT_STATE_CHANGED, 0))
+
     def test_track_template(self):
         """Test tracking template."""
         specific_runs = []
@@ -261,6 +322,45 @@ class TestEventHelpers(unittest.TestCase):
         self.assertEqual(2, len(wildcard_runs))
         self.assertEqual(2, len(wildercard_runs))
 
+    def test_track_template_states(self):
+        """Test tracking the states accessed by the last render."""
+        runs = []
+        tpl = Template(
+            "{% if is_state('switch.test', 'on') %}"
+            "{{ states.sensor | list | count }}{% endif %}", self.hass)
+
+        self.hass.states.set('switch.test', 'off')
+        tpl.render()
+
+        @ha.callback
+        def run_callback(entity_id, old_state, new_state):
+            runs.append(entity_id)
+
+        tracker = run_callback_threadsafe(
+            self.hass.loop, async_track_template_states, self.hass, (tpl,),
+            run_callback).result()
+
+        self.hass.states.set('sensor.temperature', 20)
+        self.hass.block_till_done()
+        self.assertEqual([], runs)
+
+        self.hass.states.set('switch.test', 'on')
+        self.hass.block_till_done()
+        self.assertEqual(['switch.test'], runs)
+
+        tpl.render()
+        run_callback_threadsafe(self.hass.loop, tracker.async_refresh).result()
+
+        self.hass.states.set('sensor.temperature', 21)
+        self.hass.states.set('light.kitchen', 'on')
+        self.hass.block_till_done()
+        self.assertEqual(['switch.test', 'sensor.temperature'], runs)
+
+        run_callback_threadsafe(self.hass.loop, tracker.async_remove).result()
+        self.hass.states.set('switch.test', 'off')
+        self.hass.block_till_done()
+        self.assertEqual(['switch.test', 'sensor.temperature'], runs)
+
     def test_track_time_interval(self):
         """Test tracking time interval."""
         specific_runs = []
@@ -289,6 +389,26 @@ class TestEventHelpers(unittest.TestCase):
         self.hass.block_till_done()
         self.assertEqual(2, len(specific_runs))
 
+    def test_track_time_interval_shorter_than_tick(self):
+        """Test an interval rescheduled during a tick waits for the next."""
+        specific_runs = []
+
+        utc_now = dt_util.utcnow()
+        unsub = track_time_interval(
+            self.hass, lambda x: specific_runs.append(1),
+            timedelta(seconds=1)
+        )
+
+        self._send_time_changed(utc_now + timedelta(hours=1))
+        self.hass.block_till_done()
+        self.assertEqual(1, len(specific_runs))
+
+        self._send_time_changed(utc_now + timedelta(hours=2))
+        self.hass.block_till_done()
+        self.assertEqual(2, len(specific_runs))
+
+        unsub()
+
     def test_track_sunrise(self):
         """Test track the sunrise."""
         latitude = 32.87336
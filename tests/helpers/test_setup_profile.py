@@ -0,0 +1,36 @@
+"""Test the setup profile helpers."""
+from unittest.mock import patch
+
+from homeassistant import loader
+from homeassistant.helpers.setup_profile import (
+    PHASE_SETUP, PHASE_VALIDATION, SetupProfile)
+
+
+def test_report():
+    """Test phases and the critical path end up in the report."""
+    clock = [0]
+    with patch('homeassistant.helpers.setup_profile.time.monotonic',
+               side_effect=lambda: clock[0]):
+        profile = SetupProfile()
+
+        with profile.timed_setup('http'):
+            with profile.timed('http', PHASE_VALIDATION):
+                clock[0] = 1
+            with profile.timed('http', PHASE_SETUP):
+                clock[0] = 3
+        with profile.timed_setup('sun'):
+            clock[0] = 4
+        with profile.timed_setup('api', ['http', 'sun']):
+            clock[0] = 6
+        with profile.timed_setup('frontend', ['api']):
+            clock[0] = 7
+
+    with patch.dict(loader.IMPORT_TIMES, {'http': 0.5}):
+        report = profile.report()
+
+    assert report['total'] == 7
+    assert report['critical_path'] == ['sun', 'api', 'frontend']
+    assert report['components']['http'] == {
+        'start': 0, 'end': 3, 'waiting_for': [], 'import': 0.5,
+        PHASE_VALIDATION: 1, PHASE_SETUP: 2}
+    assert profile.setup_time('api') == 2
@@ -713,3 +713,79 @@ is_state_attr('device_tracker.phone_2', 'battery', 40)
                 " > (states('input_slider.luftfeuchtigkeit') | int +1.5)"
                 " %}true{% endif %}"
             )))
+
+    def test_render_info(self):
+        """Test the states accessed by a render are recorded."""
+        self.hass.states.set('sensor.temperature', 20)
+        self.hass.states.set('light.kitchen', 'on')
+
+        tpl = template.Template(
+            "{% if is_state('light.kitchen', 'on') %}"
+            "{{ states.sensor | map(attribute='state') | join(',') }}"
+            "{% else %}{{ states('Sensor.Missing') }}{% endif %}",
+            self.hass)
+        self.assertEqual('20', tpl.render())
+        self.assertEqual({'light.kitchen'}, tpl.render_info.entities)
+        self.assertEqual({'sensor'}, tpl.render_info.domains)
+        self.assertFalse(tpl.render_info.all_states)
+
+        self.hass.states.set('light.kitchen', 'off')
+        self.assertEqual('unknown', tpl.render())
+        self.assertEqual({'light.kitchen', 'sensor.missing'},
+                         tpl.render_info.entities)
+        self.assertEqual(set(), tpl.render_info.domains)
+
+        tpl = template.Template('{{ states | list | count }}', self.hass)
+        self.assertEqual('2', tpl.render())
+        self.assertTrue(tpl.render_info.all_states)
+
+        tpl = template.Template('{{ 1 + 1 }}', self.hass)
+        self.assertEqual('2', tpl.render())
+        self.assertTrue(tpl.render_info.is_static())
+
+    def test_identical_templates_share_compiled(self):
+        """Test identical templates are compiled once."""
+        source = '{{ value_json.temperature }} shared'
+        first = template.Template(source, self.hass)
+        second = template.Template(source, self.hass)
+        compiled = template.render_stats()['compiled']
+
+        self.assertEqual(
+            '21 shared',
+            first.render_with_possible_json_value('{"temperature": 21}'))
+        self.assertEqual(
+            '22 shared',
+            second.render_with_possible_json_value('{"temperature": 22}'))
+        self.assertEqual(
+            compiled + 1, template.render_stats()['compiled'])
+        self.assertIs(first._compiled, second._compiled)
+
+    def test_memoize(self):
+        """Test memoized templates only render when their states change."""
+        self.hass.states.set('sensor.temperature', 20)
+        tpl = template.Template(
+            '{{ states.sensor.temperature.state }} {{ value }}', self.hass,
+            memoize=True)
+
+        def render(value='a'):
+            """Render the template and return the render counts."""
+            result = tpl.render(value=value)
+            stats = template.render_stats()
+            return result, stats['rendered'], stats['memo_hits']
+
+        result, rendered, memo_hits = render()
+        self.assertEqual('20 a', result)
+
+        self.assertEqual(('20 a', rendered, memo_hits + 1), render())
+
+        self.hass.states.set('sensor.temperature', 21)
+        self.assertEqual(('21 a', rendered + 1, memo_hits + 1), render())
+        self.assertEqual(('21 b', rendered + 2, memo_hits + 1), render('b'))
+
+        tpl = template.Template(
+            '{{ states.sensor.temperature.state }} {{ now().year }}',
+            self.hass, memoize=True)
+        tpl.render()
+        rendered = template.render_stats()['rendered']
+        tpl.render()
+        self.assertEqual(rendered + 1, template.render_stats()['rendered'])
@@ -17,6 +17,7 @@ from homeassistant import bootstrap, loader
 import homeassistant.util.dt as dt_util
 from homeassistant.helpers.config_validation import PLATFORM_SCHEMA
 from homeassistant.helpers import discovery
+from homeassistant.helpers.setup_profile import get_profile
 
 from tests.common import \
     get_test_home_assistant, MockModule, MockPlatform, \
@@ -24,6 +25,7 @@ from tests.common import \
 
 ORIG_TIMEZONE = dt_util.DEFAULT_TIME_ZONE
 VERSION_PATH = os.path.join(get_test_config_dir(), config_util.VERSION_FILE)
+INDEX_PATH = os.path.join(get_test_config_dir(), loader.COMPONENT_INDEX_FILE)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -54,6 +56,8 @@ class TestBootstrap:
         loader._COMPONENT_CACHE = self.backup_cache
         if os.path.isfile(VERSION_PATH):
             os.remove(VERSION_PATH)
+        if os.path.isfile(INDEX_PATH):
+            os.remove(INDEX_PATH)
 
     @mock.patch(
         # prevent .HA_VERISON file from being written
@@ -467,3 +471,134 @@ def test_platform_cannot_depend_config():
     with pytest.raises(HomeAssistantError):
         yield from bootstrap.async_prepare_setup_platform(
             mock.MagicMock(), {}, 'test_component1', 'test')
+
+
+@asyncio.coroutine
+def test_setup_components_concurrently(hass):
+    """Test components do not wait for unrelated components."""
+    release = asyncio.Event(loop=hass.loop)
+    order = []
+
+    @asyncio.coroutine
+    def async_setup_slow(hass, config):
+        """Wait until the fast component is set up."""
+        yield from asyncio.wait_for(release.wait(), 5, loop=hass.loop)
+        order.append('slow')
+        return True
+
+    @asyncio.coroutine
+    def async_setup_fast(hass, config):
+        """Let the slow component finish."""
+        order.append('fast')
+        release.set()
+        return True
+
+    @asyncio.coroutine
+    def async_setup_dependent(hass, config):
+        """Track the setup."""
+        order.append('dependent')
+        return True
+
+    loader.set_component('comp_slow', MockModule(
+        'comp_slow', async_setup=async_setup_slow))
+    loader.set_component('comp_fast', MockModule(
+        'comp_fast', async_setup=async_setup_fast))
+    loader.set_component('comp_dependent', MockModule(
+        'comp_dependent', dependencies=['comp_slow'],
+        async_setup=async_setup_dependent))
+
+    with mock.patch('homeassistant.bootstrap.async_register_signal_handling'):
+        yield from bootstrap.async_from_config_dict(
+            {'comp_dependent': None, 'comp_slow': None, 'comp_fast': None},
+            hass, enable_log=False)
+
+    assert order == ['fast', 'slow', 'dependent']
+    profile = get_profile(hass)
+    for domain in ('comp_slow', 'comp_fast', 'comp_dependent'):
+        assert profile.setup_time(domain) is not None
+    assert profile.critical_path() == ['comp_slow', 'comp_dependent']
+
+
+@asyncio.coroutine
+def test_setup_component_timeout(hass):
+    """Test a component that takes too long is given up on."""
+    @asyncio.coroutine
+    def async_setup_hanging(hass, config):
+        """Never finish the setup."""
+        yield from asyncio.Event(loop=hass.loop).wait()
+
+    loader.set_component('comp_hanging', MockModule(
+        'comp_hanging', async_setup=async_setup_hanging))
+    loader.set_component('comp_dependent', MockModule(
+        'comp_dependent', dependencies=['comp_hanging']))
+
+    with mock.patch('homeassistant.bootstrap.SETUP_TIMEOUT', 0.01), \
+            mock.patch('homeassistant.bootstrap.'
+                       'async_register_signal_handling'):
+        yield from bootstrap.async_from_config_dict(
+            {'comp_dependent': None}, hass, enable_log=False)
+
+    assert 'comp_hanging' not in hass.config.components
+    assert 'comp_dependent' not in hass.config.components
+
+
+@asyncio.coroutine
+def test_setup_component_timeout_in_executor(hass):
+    """Test a timed out setup in the executor stays in progress."""
+    release = threading.Event()
+
+    def setup_blocking(hass, config):
+        """Block until released."""
+        release.wait(5)
+        return True
+
+    loader.set_component('comp_blocking', MockModule(
+        'comp_blocking', setup=setup_blocking))
+
+    with mock.patch('homeassistant.bootstrap.SETUP_TIMEOUT', 0.01), \
+            mock.patch('homeassistant.bootstrap.'
+                       'async_register_signal_handling'):
+        yield from bootstrap.async_from_config_dict(
+            {'comp_blocking': None}, hass, enable_log=False)
+
+    progress = hass.data['setup_progress']['comp_blocking']
+    assert not (yield from bootstrap.async_setup_component(
+        hass, 'comp_blocking', {}))
+
+    release.set()
+    yield from asyncio.wait_for(progress, 5, loop=hass.loop)
+
+    assert 'comp_blocking' not in hass.data['setup_progress']
+    assert 'comp_blocking' not in hass.config.components
+
+
+@asyncio.coroutine
+def test_setup_component_reentry_during_startup(hass):
+    """Test a setup that sets up its own domain fails instead of waiting."""
+    reentered = []
+
+    @asyncio.coroutine
+    def async_setup_reentrant(hass, config):
+        """Set up the own domain again."""
+        reentered.append((yield from bootstrap.async_setup_component(
+            hass, 'comp_async', {})))
+        return True
+
+    def setup_reentrant(hass, config):
+        """Set up the own domain again from the executor."""
+        reentered.append(bootstrap.setup_component(hass, 'comp_sync', {}))
+        return True
+
+    loader.set_component('comp_async', MockModule(
+        'comp_async', async_setup=async_setup_reentrant))
+    loader.set_component('comp_sync', MockModule(
+        'comp_sync', setup=setup_reentrant))
+
+    with mock.patch('homeassistant.bootstrap.async_register_signal_handling'):
+        yield from asyncio.wait_for(bootstrap.async_from_config_dict(
+            {'comp_async': None, 'comp_sync': None}, hass,
+            enable_log=False), 5, loop=hass.loop)
+
+    assert reentered == [False, False]
+    assert 'comp_async' in hass.config.components
+    assert 'comp_sync' in hass.config.components
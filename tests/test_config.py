@@ -25,6 +25,7 @@ from tests.common import (
 CONFIG_DIR = get_test_config_dir()
 YAML_PATH = os.path.join(CONFIG_DIR, config_util.YAML_CONFIG_FILE)
 VERSION_PATH = os.path.join(CONFIG_DIR, config_util.VERSION_FILE)
+YAML_CACHE_PATH = os.path.join(CONFIG_DIR, config_util.YAML_CACHE_FILE)
 GROUP_PATH = os.path.join(CONFIG_DIR, GROUP_CONFIG_PATH)
 ORIG_TIMEZONE = dt_util.DEFAULT_TIME_ZONE
 
@@ -54,6 +55,9 @@ class TestConfig(unittest.TestCase):
         if os.path.isfile(VERSION_PATH):
             os.remove(VERSION_PATH)
 
+        if os.path.isfile(YAML_CACHE_PATH):
+            os.remove(YAML_CACHE_PATH)
+
         if os.path.isfile(GROUP_PATH):
             os.remove(GROUP_PATH)
 
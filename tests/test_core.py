@@ -16,7 +16,7 @@ from homeassistant.util.unit_system import (METRIC_SYSTEM)
 from homeassistant.const import (
     __version__, EVENT_STATE_CHANGED, ATTR_FRIENDLY_NAME, CONF_UNIT_SYSTEM,
     ATTR_NOW, EVENT_TIME_CHANGED, EVENT_HOMEASSISTANT_STOP,
-    EVENT_HOMEASSISTANT_CLOSE, EVENT_HOMEASSISTANT_START)
+    EVENT_HOMEASSISTANT_CLOSE, EVENT_HOMEASSISTANT_START, MATCH_ALL)
 
 from tests.common import get_test_home_assistant
 
@@ -408,6 +408,53 @@ class TestEventBus(unittest.TestCase):
         self.hass.block_till_done()
         assert len(coroutine_calls) == 1
 
+    def test_dispatch_table_updates_on_listen(self):
+        """Test cached dispatch tables pick up new and removed listeners."""
+        calls = []
+
+        @ha.callback
+        def listener(event):
+            calls.append(('type', event.event_type))
+
+        @ha.callback
+        def match_all_listener(event):
+            calls.append(('all', event.event_type))
+
+        unsub = self.bus.listen('test_dispatch', listener)
+        self.bus.fire('test_dispatch')
+        self.hass.block_till_done()
+        assert calls == [('type', 'test_dispatch')]
+
+        unsub_all = self.bus.listen(MATCH_ALL, match_all_listener)
+        self.bus.fire('test_dispatch')
+        self.hass.block_till_done()
+        assert calls[1:] == [('all', 'test_dispatch'),
+                             ('type', 'test_dispatch')]
+
+        unsub()
+        unsub_all()
+        self.bus.fire('test_dispatch')
+        self.hass.block_till_done()
+        assert len(calls) == 3
+
+
+def test_classify_job():
+    """Test listeners are classified by how they are scheduled."""
+    @ha.callback
+    def callback_job():
+        pass
+
+    @asyncio.coroutine
+    def coroutine_job():
+        pass
+
+    def executor_job():
+        pass
+
+    assert ha.classify_job(callback_job) == ha.JOB_CALLBACK
+    assert ha.classify_job(coroutine_job) == ha.JOB_COROUTINE
+    assert ha.classify_job(executor_job) == ha.JOB_EXECUTOR
+
 
 class TestState(unittest.TestCase):
     """Test State methods."""
@@ -510,6 +557,31 @@ class TestStateMachine(unittest.TestCase):
         self.assertEqual(1, len(ent_ids))
         self.assertTrue('light.bowl' in ent_ids)
 
+    def test_domain_states(self):
+        """Test the states of a domain are sorted by entity id."""
+        self.states.set('light.Attic', 'off')
+        self.states.set('light.Cellar', 'on')
+        self.states.set('light_group.Bowl', 'on')
+
+        self.assertEqual(
+            ['light.attic', 'light.bowl', 'light.cellar'],
+            [state.entity_id for state in self.states.domain_states('Light')])
+        self.assertEqual(
+            ['light.attic', 'light.bowl', 'light.cellar', 'light_group.bowl',
+             'switch.ac'],
+            [state.entity_id for state in self.states.domain_states()])
+
+        self.states.set('light.Attic', 'on')
+        self.assertEqual(
+            ['on', 'on', 'on'],
+            [state.state for state in self.states.domain_states('light')])
+
+        self.states.remove('light.bowl')
+        self.states.remove('switch.ac')
+        self.assertEqual(['light.attic', 'light.cellar'],
+                         self.states.entity_ids('light'))
+        self.assertEqual([], self.states.domain_states('switch'))
+
     def test_all(self):
         """Test everything."""
         states = sorted(state.entity_id for state in self.states.all())
@@ -1,6 +1,8 @@
 """Test to verify that we can load components."""
 # pylint: disable=protected-access
+import os
 import unittest
+from unittest.mock import patch
 
 import homeassistant.loader as loader
 import homeassistant.components.http as http
@@ -84,3 +86,37 @@ class TestLoader(unittest.TestCase):
         self.assertEqual(
             ['group', 'mod2'],
             loader.load_order_components(['mod2', 'mod1']))
+
+    def test_get_dependencies_without_import(self):
+        """Test dependencies are read from the source of a component."""
+        with patch.dict(loader._COMPONENT_CACHE, clear=True), \
+                patch('homeassistant.loader.get_component') as mock_get:
+            self.assertEqual(
+                [], loader.get_dependencies('image_processing.test'))
+            self.assertFalse(mock_get.called)
+
+
+def test_component_index(tmpdir):
+    """Test the component index is stored and follows file changes."""
+    component = tmpdir.join('comp.py')
+    component.write("DEPENDENCIES = ['http']\nREQUIREMENTS = find()\n")
+    path = str(tmpdir.join(loader.COMPONENT_INDEX_FILE))
+
+    index = loader.ComponentIndex(path)
+    info = index.info(str(component))
+    assert info['dependencies'] == ['http']
+    assert info['requirements'] is None
+    assert index.changed
+    index.save()
+
+    with patch('homeassistant.loader._read_component_info') as mock_read:
+        stored = loader.ComponentIndex(path)
+        assert stored.info(str(component))['dependencies'] == ['http']
+        assert not mock_read.called
+        assert not stored.changed
+
+    component.write("DEPENDENCIES = ('http', 'api')\n")
+    os.utime(str(component), (0, 0))
+    assert stored.info(str(component))['dependencies'] == ['http', 'api']
+    assert stored.changed
+    assert stored.modules(str(tmpdir), 'test.') == ['test.comp']
@@ -1,12 +1,16 @@
 """Test Home Assistant yaml loader."""
 import io
 import os
+import pickle
+import tempfile
 import unittest
 from unittest.mock import patch
 
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.util import yaml
-from homeassistant.config import YAML_CONFIG_FILE, load_yaml_config_file
+from homeassistant.config import (
+    YAML_CACHE_FILE, YAML_CONFIG_FILE, load_hass_config_file,
+    load_yaml_config_file)
 from tests.common import get_test_config_dir, patch_yaml_files
 
 
@@ -252,6 +256,62 @@ class TestYaml(unittest.TestCase):
         mock_open.side_effect = UnicodeDecodeError('', b'', 1, 0, '')
         self.assertRaises(HomeAssistantError, yaml.load_yaml, 'test')
 
+    def test_unchanged_file_not_parsed_again(self):
+        """Test the nodes of a file are reused while it does not change."""
+        files = {'test.yaml': 'key: !env_var PASSWORD'}
+        with patch.dict(yaml._NODE_CACHE, clear=True), \
+                patch.dict(os.environ, {'PASSWORD': 'secret'}), \
+                patch_yaml_files(files):
+            assert yaml.load_yaml('test.yaml') == {'key': 'secret'}
+
+            os.environ['PASSWORD'] = 'changed'
+            with patch.object(yaml, '_ComposeLoader',
+                              side_effect=AssertionError):
+                assert yaml.load_yaml('test.yaml') == {'key': 'changed'}
+
+            files['test.yaml'] = 'key: value'
+            assert yaml.load_yaml('test.yaml') == {'key': 'value'}
+
+    def test_node_cache_stored(self):
+        """Test the node cache is stored in the config dir."""
+        with tempfile.TemporaryDirectory() as tempdirname, \
+                patch.dict(yaml._NODE_CACHE, clear=True), \
+                patch.dict(yaml._NODE_CACHE_STATE, {'path': None}):
+            path = os.path.join(tempdirname, YAML_CONFIG_FILE)
+            with open(path, 'w') as fil:
+                fil.write('key:\n  - value\npassword: !secret pwd\n')
+            with open(os.path.join(tempdirname, 'secrets.yaml'), 'w') as fil:
+                fil.write('pwd: secret\n')
+
+            assert load_hass_config_file(path, tempdirname) == {
+                'key': ['value'], 'password': 'secret'}
+            cache_path = os.path.join(tempdirname, YAML_CACHE_FILE)
+            with open(cache_path, 'rb') as fil:
+                assert list(pickle.load(fil)['files']) == [path]
+
+            yaml._NODE_CACHE.clear()
+            yaml._NODE_CACHE_STATE['path'] = None
+            with patch.object(yaml, '_ComposeLoader',
+                              side_effect=AssertionError):
+                conf = load_hass_config_file(path, tempdirname)
+
+            assert conf == {'key': ['value'], 'password': 'secret'}
+            assert conf['key'].__line__ == 1
+            assert conf['key'].__config_file__ == path
+
+    def test_node_cache_not_stored_outside_config_dir(self):
+        """Test loading other YAML files does not store the cache."""
+        with tempfile.TemporaryDirectory() as tempdirname, \
+                patch.dict(yaml._NODE_CACHE, clear=True), \
+                patch.dict(yaml._NODE_CACHE_STATE, {'path': None}):
+            path = os.path.join(tempdirname, 'services.yaml')
+            with open(path, 'w') as fil:
+                fil.write('key: value\n')
+
+            assert load_yaml_config_file(path) == {'key': 'value'}
+            assert not os.path.isfile(os.path.join(
+                tempdirname, YAML_CACHE_FILE))
+
     def test_dump(self):
         """The that the dump method returns empty None values."""
         assert yaml.dump({'a': None, 'b': 'b'}) == 'a:\nb: b\n'